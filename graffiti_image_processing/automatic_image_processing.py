@@ -1,18 +1,63 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+import logging
 import os
 import json
+import pickle
+import cv2
 import numpy as np
 import pandas as pd
 
 import coolpi.auxiliary.common_operations as cop
+from coolpi.auxiliary.errors import ClassMethodError, ColourCheckerError, PatchError
 import coolpi.auxiliary.export_data as ed
+import coolpi.auxiliary.load_data as ld
 from coolpi.colour.cie_colour_spectral import MeasuredIlluminant
 import coolpi.image.colourchecker_detection as ccd
 from coolpi.image.image_objects import RawImage
-import coolpi.image.white_balance as wb
 
-def get_spd_dict_data(path_spd, spd_extension=["csv", "CSV"]):
+_CHECKER_DESCRIPTOR_CACHE = {} # {(checker_name, opencv_descriptor): (keypoints, descriptors)}
+
+logger = logging.getLogger(__name__)
+
+SPD_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".coolpi_spd_cache.pkl") # {(path_csv, mtime): spd_array}
+SPD_CACHE_FORMAT = 2 # plain arrays only: caches of another format (e.g. pickled class instances) are discarded
+
+# Errors that skip a processing step of an image (the workflow continues with the next step/image)
+CHECKER_ERRORS = (cv2.error, OSError, ValueError, TypeError, KeyError, IndexError, ColourCheckerError, PatchError)
+WB_ERRORS = (ValueError, TypeError, KeyError, ColourCheckerError, PatchError, ClassMethodError)
+CORRECTION_ERRORS = (np.linalg.LinAlgError, cv2.error, OSError, ValueError, TypeError, KeyError, ClassMethodError)
+ASSESSMENT_ERRORS = (OSError, ValueError, TypeError, KeyError, ColourCheckerError, PatchError, ClassMethodError)
+
+# each worker process holds full size float64 copies of its image: keep the default pool small
+DEFAULT_MAX_WORKERS = min(2, os.cpu_count() or 1)
+
+def load_spd_cache(path_cache=SPD_CACHE_PATH):
+    if not os.path.exists(path_cache):
+        return {}
+    try:
+        with open(path_cache, "rb") as file_cache:
+            spd_cache = pickle.load(file_cache)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+        logger.warning("SPD cache could not be read (ignored): %s", path_cache)
+        return {}
+    if not isinstance(spd_cache, dict) or spd_cache.get("format") != SPD_CACHE_FORMAT:
+        logger.warning("SPD cache format not supported (ignored): %s", path_cache)
+        return {}
+    return spd_cache["spd_arrays"]
+
+def save_spd_cache(spd_cache, path_cache=SPD_CACHE_PATH):
+    try:
+        with open(path_cache, "wb") as file_cache:
+            pickle.dump({"format": SPD_CACHE_FORMAT, "spd_arrays": spd_cache}, file_cache, protocol=pickle.HIGHEST_PROTOCOL)
+    except OSError:
+        logger.warning("SPD cache could not be saved: %s", path_cache)
+
+def get_spd_dict_data(path_spd, spd_extension=["csv", "CSV"], path_cache=SPD_CACHE_PATH):
     spd_folders = cop.get_dir_folders(path_spd)  
     spd_dict_data = {}
+    spd_cache = load_spd_cache(path_cache) if path_cache is not None else {}
+    current_cache = {} # only the SPDs found in this run are kept
     for folder in spd_folders:
         spd_dict_data[folder] = {} # measurement date
         path_dir = os.path.join(path_spd, folder)
@@ -21,10 +66,18 @@ def get_spd_dict_data(path_spd, spd_extension=["csv", "CSV"]):
         for spd in csv_list:
             spd_name = spd.split("_")[1]
             path_csv = os.path.join(path_spd, *[folder, spd]) # path to csv
-            meas_spd = MeasuredIlluminant(illuminant_name=spd_name, path_file = path_csv)
+            key = (path_csv, os.path.getmtime(path_csv))
+            if key in spd_cache:
+                spd_array = spd_cache[key] # unchanged file
+            else:
+                spd_array = ld.load_spd_array_from_sekonic_csv(path_csv) # SPD only (5 nm)
+            current_cache[key] = spd_array
+            meas_spd = MeasuredIlluminant(illuminant_name=spd_name, data=spd_array.copy())
             spd_dict_data[folder][spd_name] = {}
             spd_dict_data[folder][spd_name]["spd"]  = meas_spd
             spd_dict_data[folder][spd_name]["path"] = path_csv
+    if path_cache is not None and current_cache.keys() != spd_cache.keys():
+        save_spd_cache(current_cache, path_cache)
     return spd_dict_data
 
 def show_spd_dict_data(spd_dict_data):
@@ -98,8 +151,22 @@ def get_graffito_illuminant(date, graffito, spd_dict_data):
             return has_illuminant, illum_spd
     return False, None     
 
-def get_colourchecker_corners(rgb_data, opencv_descriptor= "SIFT", checker_name="XRCCPP"):
-    corners = ccd.colourchecker_patch_detection(rgb_data, opencv_descriptor, checker_name)
+def get_checker_descriptors(checker_name, opencv_descriptor="SIFT"):
+    # template keypoints/descriptors, computed once per process
+    key = (checker_name, opencv_descriptor)
+    if key not in _CHECKER_DESCRIPTOR_CACHE:
+        _CHECKER_DESCRIPTOR_CACHE[key] = ccd.build_checker_descriptors(checker_name, opencv_descriptor)
+    return _CHECKER_DESCRIPTOR_CACHE[key]
+
+def get_checker_name_to_extract(checker_name):
+    return "XRCCPP_24" if "XRCCPP" in checker_name else checker_name
+
+def init_worker(checker_name, opencv_descriptor):
+    # cv2.KeyPoint objects can not be pickled: each worker builds its own cache
+    get_checker_descriptors(get_checker_name_to_extract(checker_name), opencv_descriptor)
+
+def get_colourchecker_corners(rgb_data, opencv_descriptor= "SIFT", checker_name="XRCCPP", template_desc=None):
+    corners = ccd.colourchecker_patch_detection(rgb_data, opencv_descriptor, checker_name, template_descriptors=template_desc)
     if corners is not None:
         has_colourchecker = True
         return has_colourchecker, corners
@@ -109,43 +176,327 @@ def get_rgb_to_xyz_matrix(path_rgb_to_xyz):
     # RGB to XYZ
     if path_rgb_to_xyz is not None:
         try:
-            rgb_to_xyz = np.genfromtxt(path_rgb_to_xyz, delimiter=';')
+            rgb_to_xyz = np.loadtxt(path_rgb_to_xyz, delimiter=';')
             computed_rgb_to_xyz = True
             return computed_rgb_to_xyz, rgb_to_xyz
-        except:
+        except (OSError, ValueError):
+            logger.exception("RGB to XYZ matrix could not be read (using the camera matrix): %s", path_rgb_to_xyz)
             return False, "camera" # embedded
     return False, "camera" # embedded
 
 def compute_wb_patches(raw_image, checker_name, patches_id):
-    wb_computed = []
-    for patch in patches_id:
-        params = dict(checker_name=checker_name, patch_id=patch)
-        wb_patch = raw_image.compute_wb_multipliers(**params)
-        wb_computed.append(wb_patch)
+    wb_computed = raw_image.compute_wb_multipliers_batch(checker_name, patches_id) # (N,4)
     return wb_computed
 
-def automatic_image_processing(path_graffiti_images, path_graffiti_spd, path_sRGB, path_rgb_to_xyz, checker_name="XRCCPP", opencv_descriptor="SIFT", wb_algorithm= "GreyWorld", output_bits=16):
+def load_raw_image(path_raw, use_memmap=False):
+    if not os.path.exists(path_raw):
+        return None
+    return RawImage(path_raw, use_memmap=use_memmap)
+
+def prefetch_raw_images(tasks, max_prefetch=2, use_memmap=False):
+    # decode the next RAW images on background threads while the current one is processed
+    tasks = iter(tasks)
+    with ThreadPoolExecutor(max_workers=max_prefetch) as executor:
+        pending = deque()
+        for task in tasks:
+            pending.append((task, executor.submit(load_raw_image, task[6], use_memmap))) # task[6] = path_raw
+            if len(pending) == max_prefetch:
+                break
+        while pending:
+            task, future = pending.popleft()
+            next_task = next(tasks, None)
+            if next_task is not None:
+                pending.append((next_task, executor.submit(load_raw_image, next_task[6], use_memmap)))
+            try:
+                raw_image = future.result()
+            except Exception: # the image is skipped, the workflow continues with the next one
+                logger.exception("RAW image could not be loaded: %s", task[6])
+                raw_image = None
+            yield task, raw_image
+
+def wait_for_saves(pending_saves, image):
+    # wait for the background writes of an image: returns the outputs that could not be saved
+    failed_outputs = set()
+    for output_key, future in pending_saves:
+        try:
+            future.result()
+        except Exception: # any write error: the image output is not reported, the workflow continues
+            logger.exception("Output image could not be saved: %s", image)
+            failed_outputs.add(output_key)
+    return failed_outputs
+
+def process_single_image(date, graffito, image, folder, has_illuminant, illum_spd, path_raw, path_sRGB, path_rgb_to_xyz, computed_rgb_to_xyz, rgb_to_xyz, checker_name, opencv_descriptor, wb_algorithm, output_bits, raw_image=None, save_executor=None, use_memmap=False):
+    # Create RawImage instance
+    if raw_image is None:
+        raw_image = load_raw_image(path_raw, use_memmap)
+    if raw_image is None:
+        return None
+    #raw_image.show(data="raw", method="matplotlib")
+
+    # set init variables to False
+    colourchecker_extracted = False
+    wb_average_computed = False
+    colour_corrected = False
+    AE_computed = False
+    computed_wb_algorithm = False
+    computed_wb_from_illuminant = False
+    patch_slices = None # colour checker patch windows, shared by the quality assessments
+    
+    print("Image            : ", image)
+    folder_path = os.path.join(path_sRGB, folder) # output folder (date-graffito)
+    # TIF files are written in the background while the image is processed
+    own_save_executor = save_executor is None
+    if own_save_executor:
+        save_executor = ThreadPoolExecutor(max_workers=2)
+    pending_saves = []
+    image_processing_information = {} # dict with the process details (to JSON)
+    image_processing_information["date"] = date
+    image_processing_information["graffito"] = graffito # id
+    image_processing_information["image"] = image # name
+    image_processing_information["path"] = path_raw # full path
+    # RGB to XYZ
+    raw_image.set_RGB_to_XYZ_matrix(rgb_to_xyz) # set RGB to XYZ
+    # set illuminant
+    if has_illuminant:
+        raw_image.set_image_illuminant(illum_spd["spd"]) # Set illuminant
+    
+    image_processing_information["rgb_to_xyz"] = path_rgb_to_xyz if computed_rgb_to_xyz else rgb_to_xyz
+    image_processing_information["Illuminant"] = illum_spd["path"] if has_illuminant else illum_spd # None
+    image_processing_information["white_balance_multipliers"] = {} # empty
+
+    # A) If image has a colour checker
+    checker_name_to_extract = get_checker_name_to_extract(checker_name)
+    template_desc = get_checker_descriptors(checker_name_to_extract, opencv_descriptor)
+    has_colourchecker, corners, size_rect = raw_image.automatic_colourchecker_extraction(checker_name_to_extract, opencv_descriptor, template_desc)
+    # full patches
+    #checker_name_to_extract = "XRCCPP_26" if "XRCCPP" in checker_name else checker_name
+    #has_colourchecker, corners, size_rect = raw_image.automatic_colourchecker_extraction(checker_name_to_extract, opencv_descriptor)
+
+    if has_colourchecker:           
+        # extract colourchecker                 
+        try:
+            # save image with colourchecker
+            output_name = image[:-4] + "_colourchecker.tif"
+            output_path_checker = os.path.join(folder_path, output_name)     
+            raw_image.show_colourchecker(checker_name=checker_name, show_image=False, save_image=True, output_path=output_path_checker, bits=output_bits)
+            # update
+            image_processing_information["colourchecker"] = {}
+            image_processing_information["colourchecker"]["corners"] = corners
+            image_processing_information["colourchecker"]["size_rect"] = size_rect                        
+            patch_slices = raw_image.compute_patch_slices(checker_name)
+            colourchecker_extracted = True
+        except CHECKER_ERRORS:
+            logger.exception("Colour checker could not be extracted: %s", image)
+            colourchecker_extracted = False
+        
+        if colourchecker_extracted:
+            # compute average wb
+            try:
+                patches_id = ["D2", "D3", "D4"]
+                wb_computed = compute_wb_patches(raw_image, checker_name, patches_id)
+                # compute average 
+                wb_average = wb_computed.mean(axis=0).tolist()
+                raw_image.set_whitebalance_multipliers(wb_average)
+                # update
+                image_processing_information["white_balance_multipliers"]["D2-D3-D4"] = wb_computed.tolist()
+                image_processing_information["white_balance_multipliers"]["wb_average"] = wb_average
+                wb_average_computed = True
+            except WB_ERRORS:
+                logger.exception("White balance from the colour checker could not be computed: %s", image)
+                wb_average_computed = False
+    
+        if wb_average_computed:
+            try:
+                # compute colour corrected
+                raw_image.apply_colour_correction()
+                # save
+                output_name = image[:-4] + "_sRGB.tif"
+                output_path_sRGB = os.path.join(folder_path, output_name)               
+                pending_saves.append(("output_sRGB", raw_image.save_async(save_executor, output_path=output_path_sRGB, data="sRGB", bits=output_bits)))
+                colour_corrected = True
+            except CORRECTION_ERRORS:
+                logger.exception("Colour correction failed: %s", image)
+                colour_corrected = False
+
+        if colour_corrected and has_illuminant:
+            # update
+            image_processing_information["output_sRGB"] ={}
+            image_processing_information["output_sRGB"]["path"] = output_path_sRGB
+            image_processing_information["output_sRGB"]["bits"] = output_bits
+            try:
+                # AE00
+                colourchecker_metrics = raw_image.compute_image_colour_quality_assessment(checker_name, patch_slices=patch_slices)
+                colourchecker_metrics["illuminant_x"] = "D65" # as str, avoid utf-8 error
+                colourchecker_metrics["illuminant_y"] = illum_spd["path"] # as str, avoid utf-8 error    
+                # DataFrame to dict
+                colourchecker_metrics_dict = ed.df_to_index_dict(colourchecker_metrics)
+                # export dict as JSON
+                name_json_mtr = image[:-4] + "_colourchecker_metrics.json"
+                path_json_mtr = os.path.join(folder_path, name_json_mtr)    
+                ed.export_dict_as_json(colourchecker_metrics_dict, path_json_mtr)
+                AE_computed = True
+            except ASSESSMENT_ERRORS:
+                logger.exception("Colour quality assessment failed: %s", image)
+                AE_computed = False
+
+        if AE_computed:
+            image_processing_information["CIEDE2000"] = colourchecker_metrics["CIEDE2000"].mean()
+            print("Average CIEDE2000 (from colour checker) = ", colourchecker_metrics["CIEDE2000"].mean())
+
+        # using different options for wb
+        # wb algorithm
+        if wb_algorithm is not None:
+            try:
+                if colourchecker_extracted:
+                    params = dict(algorithm=wb_algorithm, remove_colourckecker=True, corners_colourchecker=corners)
+                else:
+                    params = dict(algorithm=wb_algorithm, remove_colourckecker=False, corners_colourchecker=None)
+                
+                wb_multipliers_algorithm = raw_image.estimate_wb_multipliers(method="wb_algorithm", **params)
+                raw_image.set_whitebalance_multipliers(wb_multipliers_algorithm)
+                raw_image.apply_colour_correction()
+                output_name = image[:-4] + "_sRGB_wb_algorithm.tif"
+                output_path_wb_algorithm = os.path.join(folder_path, output_name)               
+                pending_saves.append(("output_sRGB_wb_algorithm", raw_image.save_async(save_executor, output_path=output_path_wb_algorithm, data="sRGB", bits=output_bits)))
+
+                image_processing_information["output_sRGB_wb_algorithm"] ={}
+                image_processing_information["output_sRGB_wb_algorithm"]["path"] = output_path_wb_algorithm
+                image_processing_information["output_sRGB_wb_algorithm"]["bits"] = output_bits
+                
+                if has_illuminant:
+                    colourchecker_metrics_wb_algorithm = raw_image.compute_image_colour_quality_assessment(checker_name, patch_slices=patch_slices)
+                    colourchecker_metrics_wb_algorithm["illuminant_x"] = "D65" # as str, avoid utf-8 error
+                    colourchecker_metrics_wb_algorithm["illuminant_y"] = illum_spd["path"] # as str, avoid utf-8 error
+                    # DataFrame to dict
+                    colourchecker_metrics_alg_dict = ed.df_to_index_dict(colourchecker_metrics_wb_algorithm)
+                    # export dict as JSON
+                    name_json_mtr_alg = image[:-4] + "_colourchecker_metrics_algorithm.json"
+                    path_json_mtr_alg = os.path.join(folder_path, name_json_mtr_alg)    
+                    ed.export_dict_as_json(colourchecker_metrics_alg_dict, path_json_mtr_alg)
+                    computed_wb_algorithm = True
+            except WB_ERRORS + CORRECTION_ERRORS + ASSESSMENT_ERRORS:
+                logger.exception("White balance using %s failed: %s", wb_algorithm, image)
+                computed_wb_algorithm = False
+
+        if computed_wb_algorithm:
+            image_processing_information["white_balance_multipliers"]["wb_algorithm"] = wb_multipliers_algorithm
+            print("Average CIEDE2000 (wb using algorithm) = ", colourchecker_metrics_wb_algorithm["CIEDE2000"].mean())
+            
+        # from illuminant
+        if has_illuminant:
+            try:
+                wb_from_illuminant = raw_image.estimate_wb_multipliers(method="illuminant")
+                raw_image.set_whitebalance_multipliers(wb_from_illuminant)
+                raw_image.apply_colour_correction()
+                output_name = image[:-4] + "_sRGB_wb_from_illuminant.tif"
+                output_path = os.path.join(folder_path, output_name)               
+
+                image_processing_information["output_sRGB_wb_from_illuminant"] ={}
+                image_processing_information["output_sRGB_wb_from_illuminant"]["path"] = output_path
+                image_processing_information["output_sRGB_wb_from_illuminant"]["bits"] = output_bits
+
+                pending_saves.append(("output_sRGB_wb_from_illuminant", raw_image.save_async(save_executor, output_path=output_path, data="sRGB", bits=output_bits)))
+                colourchecker_metrics_from_illuminant = raw_image.compute_image_colour_quality_assessment(checker_name, patch_slices=patch_slices)
+                colourchecker_metrics_from_illuminant["illuminant_x"] = "D65" # as str, avoid utf-8 error
+                colourchecker_metrics_from_illuminant["illuminant_y"] = illum_spd["path"] # as str, avoid utf-8 error
+                # DataFrame to dict
+                colourchecker_metrics_illum_dict = ed.df_to_index_dict(colourchecker_metrics_from_illuminant)
+                # export dict as JSON
+                name_json_mtr_illum = image[:-4] + "_colourchecker_metrics_illuminant.json"
+                path_json_mtr_illum = os.path.join(folder_path, name_json_mtr_illum)    
+                ed.export_dict_as_json(colourchecker_metrics_illum_dict, path_json_mtr_illum)
+                computed_wb_from_illuminant = True
+            except WB_ERRORS + CORRECTION_ERRORS + ASSESSMENT_ERRORS:
+                logger.exception("White balance from the illuminant failed: %s", image)
+                computed_wb_from_illuminant = False
+
+        if computed_wb_from_illuminant:
+            image_processing_information["white_balance_multipliers"]["wb_from_illuminant"] = wb_from_illuminant
+            print("Average CIEDE2000 (wb from illuminant) = ", colourchecker_metrics_from_illuminant["CIEDE2000"].mean())
+
+    else:
+        # options for wb
+        if wb_algorithm is not None:
+            try:
+                params = dict(algorithm="GreyWorld", remove_colourckecker=False, corners_colourchecker=None)
+                wb_algorithm = raw_image.estimate_wb_multipliers(method="wb_algorithm", **params)
+                image_processing_information["white_balance_multipliers"]["wb_algorithm"] = wb_algorithm
+                raw_image.set_whitebalance_multipliers(wb_algorithm)
+                raw_image.apply_colour_correction()
+                output_name = image[:-4] + "_sRGB_wb_algorithm.tif"
+                output_path = os.path.join(folder_path, output_name)               
+                pending_saves.append(("output_sRGB_wb_algorithm", raw_image.save_async(save_executor, output_path=output_path, data="sRGB", bits=output_bits)))
+                computed_wb_algorithm = True
+            except WB_ERRORS + CORRECTION_ERRORS + ASSESSMENT_ERRORS:
+                logger.exception("White balance using %s failed: %s", wb_algorithm, image)
+                computed_wb_algorithm = False
+
+        if has_illuminant:
+            try:
+                wb_from_illuminant = raw_image.estimate_wb_multipliers(method="illuminant")
+                image_processing_information["white_balance_multipliers"]["wb_from_illuminant"] = wb_from_illuminant
+                raw_image.set_whitebalance_multipliers(wb_from_illuminant)
+                raw_image.apply_colour_correction()
+                output_name = image[:-4] + "_sRGB_wb_from_illuminant.tif"
+                output_path = os.path.join(folder_path, output_name)               
+                pending_saves.append(("output_sRGB_wb_from_illuminant", raw_image.save_async(save_executor, output_path=output_path, data="sRGB", bits=output_bits)))
+                computed_wb_from_illuminant = True
+            except WB_ERRORS + CORRECTION_ERRORS + ASSESSMENT_ERRORS:
+                logger.exception("White balance from the illuminant failed: %s", image)
+                computed_wb_from_illuminant = False
+    
+    # the outputs are reported (JSON) only once their files are written
+    failed_outputs = wait_for_saves(pending_saves, image)
+    for output_key in failed_outputs:
+        image_processing_information.pop(output_key, None)
+    colour_corrected = colour_corrected and "output_sRGB" not in failed_outputs
+    computed_wb_algorithm = computed_wb_algorithm and "output_sRGB_wb_algorithm" not in failed_outputs
+    computed_wb_from_illuminant = computed_wb_from_illuminant and "output_sRGB_wb_from_illuminant" not in failed_outputs
+
+    if has_colourchecker:
+        image_processed = colour_corrected
+    else:
+        image_processed = computed_wb_algorithm or computed_wb_from_illuminant
+
+    if image_processed:
+        # export dict as JSON
+        name_json = image[:-4] + ".json"
+        path_json = os.path.join(folder_path, name_json)    
+        ed.export_dict_as_json(image_processing_information, path_json)
+    else:
+        print(f"The image {image} could not be processed. Path: {path_raw}")
+
+    if own_save_executor:
+        save_executor.shutdown(wait=True)
+    del raw_image # reset
+    return image_processing_information
+
+def automatic_image_processing(path_graffiti_images, path_graffiti_spd, path_sRGB, path_rgb_to_xyz, checker_name="XRCCPP", opencv_descriptor="SIFT", wb_algorithm= "GreyWorld", output_bits=16, max_workers=None, use_memmap=False):
     
     # 0) Prepare data information as dict: image, spd, sRGB
     image_dict_data = get_image_dict_data(path_graffiti_images)
     #show_image_dict_data(image_dict_data)
     spd_dict_data = get_spd_dict_data(path_graffiti_spd)
     #show_spd_dict_data(spd_dict_data)
-    check_sRGB_folder() # Create sRGB folder if it does not exists
+    check_sRGB_folder() # Create sRGB folder if it does not exists
+    computed_rgb_to_xyz, rgb_to_xyz = get_rgb_to_xyz_matrix(path_rgb_to_xyz) # read once for all the images
     sRGB_dict_data = get_sRGB_dict_data(path_sRGB)
     #show_sRGB_dict_data(sRGB_dict_data)
 
+    tasks = [] # images to process
     for date in image_dict_data.keys():
         print("Measurement Date : ", date)
         for graffito in image_dict_data[date].keys():
             print("Graffito ID      : ", graffito)
             # 1) Project structure
             folder = date + "_" + graffito
+            folder_path = os.path.join(path_sRGB, folder)           # sRGB folder
+            folder_raw = os.path.join(path_graffiti_images, folder) # raw images folder
             # check if sRGB folder exist       
             if date not in sRGB_dict_data.keys():
                 sRGB_dict_data[date] = {}
             if graffito not in sRGB_dict_data[date].keys():
-                os.mkdir(os.path.join(path_sRGB, folder)) # folder sRGB -> date-graffito
+                os.mkdir(folder_path) # folder sRGB -> date-graffito
                 #update
                 sRGB_dict_data[date][graffito] = {}
                             
@@ -154,232 +505,48 @@ def automatic_image_processing(path_graffiti_images, path_graffiti_spd, path_sRG
 
             # 3) Image Processing
             total_images = image_dict_data[date][graffito] # raw images in graffito folder  
+            processed_set = {item.split("_sRGB")[0] for item in sRGB_dict_data[date][graffito]} # processed images to be removed from the process
             for image in total_images:
                 #image_processed = cop.get_dir_list_file_for_extension(os.path.join(path_sRGB, folder), ["tif","TIF"])   
-                name_images = [item.split("_sRGB")[0] for item in sRGB_dict_data[date][graffito]] # get list of processed images to be removed from the process
-                if image[:-4] not in name_images:
-                    # Create RawImage instance
-                    path_raw = os.path.join(path_graffiti_images, *[folder, image]) # root dir (graffiti images)
-                    if os.path.exists(path_raw):                
-                        raw_image = RawImage(path_raw)
-                        #raw_image.show(data="raw", method="matplotlib")
-                    else:
-                        raw_image = None
-                    
-                    if raw_image is not None:
-                        # set init variables to False
-                        colourchecker_extracted = False
-                        wb_average_computed = False
-                        colour_corrected = False
-                        AE_computed = False
-                        computed_wb_algorithm = False
-                        computed_wb_from_illuminant = False
-                        
-                        print("Image            : ", image)
-                        image_processing_information = {} # dict with the process details (to JSON)
-                        image_processing_information["date"] = date
-                        image_processing_information["graffito"] = graffito # id
-                        image_processing_information["image"] = image # name
-                        image_processing_information["path"] = path_raw # full path
-                        # RGB to XYZ
-                        computed_rgb_to_xyz, rgb_to_xyz = get_rgb_to_xyz_matrix(path_rgb_to_xyz) 
-                        raw_image.set_RGB_to_XYZ_matrix(rgb_to_xyz) # set RGB to XYZ
-                        # set illuminant
-                        if has_illuminant:
-                            raw_image.set_image_illuminant(illum_spd["spd"]) # Set illuminant
-                        
-                        image_processing_information["rgb_to_xyz"] = path_rgb_to_xyz if computed_rgb_to_xyz else rgb_to_xyz
-                        image_processing_information["Illuminant"] = illum_spd["path"] if has_illuminant else illum_spd # None
-                        image_processing_information["white_balance_multipliers"] = {} # empty
-        
-                        # A) If image has a colour checker
-                        checker_name_to_extract = "XRCCPP_24" if "XRCCPP" in checker_name else checker_name
-                        has_colourchecker, corners, size_rect = raw_image.automatic_colourchecker_extraction(checker_name_to_extract, opencv_descriptor)
-                        # full patches
-                        #checker_name_to_extract = "XRCCPP_26" if "XRCCPP" in checker_name else checker_name
-                        #has_colourchecker, corners, size_rect = raw_image.automatic_colourchecker_extraction(checker_name_to_extract, opencv_descriptor)
-
-                        if has_colourchecker:           
-                            # extract colourchecker                 
-                            try:
-                                # save image with colourchecker
-                                output_name = image[:-4] + "_colourchecker.tif"
-                                output_path_checker = os.path.join(path_sRGB, *[folder, output_name])     
-                                raw_image.show_colourchecker(checker_name=checker_name, show_image=False, save_image=True, output_path=output_path_checker, bits=output_bits)
-                                # update
-                                image_processing_information["colourchecker"] = {}
-                                image_processing_information["colourchecker"]["corners"] = corners
-                                image_processing_information["colourchecker"]["size_rect"] = size_rect                        
-                                colourchecker_extracted = True
-                            except:
-                                colourchecker_extracted = False
-                            
-                            if colourchecker_extracted:
-                                # compute average wb
-                                try:
-                                    patches_id = ["D2", "D3", "D4"]
-                                    wb_computed = compute_wb_patches(raw_image, checker_name, patches_id)
-                                    # compute average 
-                                    wb_average = wb.compute_wb_average(wb_computed)
-                                    raw_image.set_whitebalance_multipliers(wb_average)
-                                    # update
-                                    image_processing_information["white_balance_multipliers"]["D2-D3-D4"] = wb_computed
-                                    image_processing_information["white_balance_multipliers"]["wb_average"] = wb_average
-                                    wb_average_computed = True
-                                except:
-                                    wb_average_computed = False
-                        
-                            if wb_average_computed:
-                                try:
-                                    # compute colour corrected
-                                    raw_image.apply_colour_correction()
-                                    # save
-                                    output_name = image[:-4] + "_sRGB.tif"
-                                    output_path_sRGB = os.path.join(path_sRGB, *[folder,output_name])               
-                                    raw_image.save(output_path=output_path_sRGB, data="sRGB", bits=output_bits)
-                                    colour_corrected = True
-                                except:
-                                    colour_corrected = False
-
-                            if colour_corrected and has_illuminant:
-                                # update
-                                image_processing_information["output_sRGB"] ={}
-                                image_processing_information["output_sRGB"]["path"] = output_path_sRGB
-                                image_processing_information["output_sRGB"]["bits"] = output_bits
-                                try:
-                                    # AE00
-                                    colourchecker_metrics = raw_image.compute_image_colour_quality_assessment(checker_name)
-                                    colourchecker_metrics["illuminant_x"] = "D65" # as str, avoid utf-8 error
-                                    colourchecker_metrics["illuminant_y"] = illum_spd["path"] # as str, avoid utf-8 error    
-                                    # DataFrame to dict
-                                    colourchecker_metrics_dict = colourchecker_metrics.to_dict("index")
-                                    # export dict as JSON
-                                    name_json_mtr = image[:-4] + "_colourchecker_metrics.json"
-                                    path_json_mtr = os.path.join(path_sRGB, *[folder, name_json_mtr])    
-                                    ed.export_dict_as_json(colourchecker_metrics_dict, path_json_mtr)
-                                    AE_computed = True
-                                except:
-                                    AE_computed = False
-
-                            if AE_computed:
-                                image_processing_information["CIEDE2000"] = colourchecker_metrics["CIEDE2000"].mean()
-                                print("Average CIEDE2000 (from colour checker) = ", colourchecker_metrics["CIEDE2000"].mean())
-
-                            # using different options for wb
-                            # wb algorithm
-                            if wb_algorithm is not None:
-                                try:
-                                    if colourchecker_extracted:
-                                        params = dict(algorithm=wb_algorithm, remove_colourckecker=True, corners_colourchecker=corners)
-                                    else:
-                                        params = dict(algorithm=wb_algorithm, remove_colourckecker=False, corners_colourchecker=None)
-                                    
-                                    wb_multipliers_algorithm = raw_image.estimate_wb_multipliers(method="wb_algorithm", **params)
-                                    raw_image.set_whitebalance_multipliers(wb_multipliers_algorithm)
-                                    raw_image.apply_colour_correction()
-                                    output_name = image[:-4] + "_sRGB_wb_algorithm.tif"
-                                    output_path_wb_algorithm = os.path.join(path_sRGB, *[folder, output_name])               
-                                    raw_image.save(output_path=output_path_wb_algorithm, data="sRGB", bits=output_bits)
-
-                                    image_processing_information["output_sRGB_wb_algorithm"] ={}
-                                    image_processing_information["output_sRGB_wb_algorithm"]["path"] = output_path_wb_algorithm
-                                    image_processing_information["output_sRGB_wb_algorithm"]["bits"] = output_bits
-                                    
-                                    if has_illuminant:
-                                        colourchecker_metrics_wb_algorithm = raw_image.compute_image_colour_quality_assessment(checker_name)
-                                        colourchecker_metrics_wb_algorithm["illuminant_x"] = "D65" # as str, avoid utf-8 error
-                                        colourchecker_metrics_wb_algorithm["illuminant_y"] = illum_spd["path"] # as str, avoid utf-8 error
-                                        # DataFrame to dict
-                                        colourchecker_metrics_alg_dict = colourchecker_metrics_wb_algorithm.to_dict("index")
-                                        # export dict as JSON
-                                        name_json_mtr_alg = image[:-4] + "_colourchecker_metrics_algorithm.json"
-                                        path_json_mtr_alg = os.path.join(path_sRGB, *[folder, name_json_mtr_alg])    
-                                        ed.export_dict_as_json(colourchecker_metrics_alg_dict, path_json_mtr_alg)
-                                        computed_wb_algorithm = True
-                                except:
-                                    computed_wb_algorithm = False
-
-                            if computed_wb_algorithm:
-                                image_processing_information["white_balance_multipliers"]["wb_algorithm"] = wb_multipliers_algorithm
-                                print("Average CIEDE2000 (wb using algorithm) = ", colourchecker_metrics_wb_algorithm["CIEDE2000"].mean())
-                                
-                            # from illuminant
-                            if has_illuminant:
-                                try:
-                                    wb_from_illuminant = raw_image.estimate_wb_multipliers(method="illuminant")
-                                    raw_image.set_whitebalance_multipliers(wb_from_illuminant)
-                                    raw_image.apply_colour_correction()
-                                    output_name = image[:-4] + "_sRGB_wb_from_illuminant.tif"
-
-                                    image_processing_information["output_sRGB_wb_from_illuminant"] ={}
-                                    image_processing_information["output_sRGB_wb_from_illuminant"]["path"] = output_path_wb_algorithm
-                                    image_processing_information["output_sRGB_wb_from_illuminant"]["bits"] = output_bits
-
-                                    output_path = os.path.join(path_sRGB, *[folder,output_name])               
-                                    raw_image.save(output_path=output_path, data="sRGB", bits=output_bits)
-                                    colourchecker_metrics_from_illuminant = raw_image.compute_image_colour_quality_assessment(checker_name)
-                                    colourchecker_metrics_from_illuminant["illuminant_x"] = "D65" # as str, avoid utf-8 error
-                                    colourchecker_metrics_from_illuminant["illuminant_y"] = illum_spd["path"] # as str, avoid utf-8 error
-                                    # DataFrame to dict
-                                    colourchecker_metrics_illum_dict = colourchecker_metrics_from_illuminant.to_dict('index')
-                                    # export dict as JSON
-                                    name_json_mtr_illum = image[:-4] + "_colourchecker_metrics_illuminant.json"
-                                    path_json_mtr_illum = os.path.join(path_sRGB, *[folder, name_json_mtr_illum])    
-                                    ed.export_dict_as_json(colourchecker_metrics_illum_dict, path_json_mtr_illum)
-                                    computed_wb_from_illuminant = True
-                                except:
-                                    computed_wb_from_illuminant = False
-
-                            if computed_wb_from_illuminant:
-                                image_processing_information["white_balance_multipliers"]["wb_from_illuminant"] = wb_from_illuminant
-                                print("Average CIEDE2000 (wb from illuminant) = ", colourchecker_metrics_from_illuminant["CIEDE2000"].mean())
-
-                            if colour_corrected:
-                                # export dict as JSON
-                                name_json = image[:-4] + ".json"
-                                path_json = os.path.join(path_sRGB, *[folder, name_json])    
-                                ed.export_dict_as_json(image_processing_information, path_json)
-                            else:
-                                print(f"The image {image} could not be processed. Path: {path_raw}")
-
-                        else:
-                            # options for wb
-                            if wb_algorithm is not None:
-                                try:
-                                    params = dict(algorithm="GreyWorld", remove_colourckecker=False, corners_colourchecker=None)
-                                    wb_algorithm = raw_image.estimate_wb_multipliers(method="wb_algorithm", **params)
-                                    image_processing_information["white_balance_multipliers"]["wb_algorithm"] = wb_algorithm
-                                    raw_image.set_whitebalance_multipliers(wb_algorithm)
-                                    raw_image.apply_colour_correction()
-                                    output_name = image[:-4] + "_sRGB_wb_algorithm.tif"
-                                    output_path = os.path.join(path_sRGB, *[folder,output_name])               
-                                    raw_image.save(output_path=output_path, data="sRGB", bits=output_bits)
-                                    computed_wb_algorithm = True
-                                except:
-                                    computed_wb_algorithm = False
-
-                            if has_illuminant:
-                                try:
-                                    wb_from_illuminant = raw_image.estimate_wb_multipliers(method="illuminant")
-                                    image_processing_information["white_balance_multipliers"]["wb_from_illuminant"] = wb_from_illuminant
-                                    raw_image.set_whitebalance_multipliers(wb_from_illuminant)
-                                    raw_image.apply_colour_correction()
-                                    output_name = image[:-4] + "_sRGB_wb_from_illuminant.tif"
-                                    output_path = os.path.join(path_sRGB, *[folder,output_name])               
-                                    raw_image.save(output_path=output_path, data="sRGB", bits=output_bits)
-                                    computed_wb_from_illuminant = True
-                                except:
-                                    computed_wb_from_illuminant = False
-                        
-                            if computed_wb_algorithm or computed_wb_from_illuminant:                
-                                # export dict as JSON
-                                name_json = image[:-4] + ".json"
-                                path_json = os.path.join(path_sRGB, *[folder, name_json])    
-                                ed.export_dict_as_json(image_processing_information, path_json)
-
-                            if computed_wb_algorithm==False and computed_wb_from_illuminant==False:
-                                print(f"The image {image} could not be processed. Path: {path_raw}")
-                    del raw_image # reset
+                if image[:-4] in processed_set:
+                    continue
+                processed_set.add(image[:-4])
+                path_raw = os.path.join(folder_raw, image) # root dir (graffiti images)
+                tasks.append((date, graffito, image, folder, has_illuminant, illum_spd, path_raw, path_sRGB, path_rgb_to_xyz, computed_rgb_to_xyz, rgb_to_xyz, checker_name, opencv_descriptor, wb_algorithm, output_bits))
+
+    # 4) Process the images
+    processed_images = []
+    if max_workers == 1:
+        # serial: overlap the RAW decoding with the processing of the previous image
+        init_worker(checker_name, opencv_descriptor)
+        with ThreadPoolExecutor(max_workers=2) as save_executor:
+            for task, raw_image in prefetch_raw_images(tasks, use_memmap=use_memmap):
+                if raw_image is None:
+                    continue
+                try:
+                    image_processing_information = process_single_image(*task, raw_image=raw_image, save_executor=save_executor)
+                except Exception: # the image is skipped, the workflow continues with the next one
+                    logger.exception("Image could not be processed: %s", task[6])
+                    continue
+                finally:
+                    del raw_image
+                processed_images.append(image_processing_information)
+        return processed_images
+
+    # parallel (one process per image)
+    if max_workers is None:
+        max_workers = DEFAULT_MAX_WORKERS
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=init_worker, initargs=(checker_name, opencv_descriptor)) as executor:
+        futures = {executor.submit(process_single_image, *task, use_memmap=use_memmap): task for task in tasks}
+        for future in as_completed(futures):
+            try:
+                image_processing_information = future.result()
+            except Exception: # the image is skipped, the workflow continues with the next one
+                logger.exception("Image could not be processed: %s", futures[future][6])
+                continue
+            if image_processing_information is not None:
+                processed_images.append(image_processing_information)
+    return processed_images
 
 if __name__ == '__main__':
     # General options
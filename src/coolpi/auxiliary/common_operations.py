@@ -2,6 +2,27 @@ import os
 
 import math
 import numpy as np
+import tempfile
+
+try: # optional: JIT compiled kernels
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+if NUMBA_AVAILABLE:
+    @njit("float64[:,::1](float64[:,::1], float64[:,::1])", cache=True, fastmath=True, parallel=True)
+    def _dot_product_rows(array_1, array_2):
+        # out[k,i] = sum_j array_1[i,j]*array_2[k,j]
+        n_rows, n_out, n_in = array_2.shape[0], array_1.shape[0], array_1.shape[1]
+        dot_product = np.empty((n_rows, n_out))
+        for k in prange(n_rows):
+            for i in range(n_out):
+                acc = 0.0
+                for j in range(n_in):
+                    acc += array_1[i,j]*array_2[k,j]
+                dot_product[k,i] = acc
+        return dot_product
 
 def get_file_extension(path_file):
     filename, file_extension = os.path.splitext(path_file)
@@ -12,27 +33,44 @@ def get_file_extension(path_file):
     return extension
 
 def get_dir_folders(path_dir):
-    list_dir = []
-    current_dir_list = os.listdir(path_dir)
-    for element in current_dir_list:
-        if not element.startswith('.'): # pass hidden files
-            path = os.path.join(path_dir, element)
-            if os.path.isdir(path):
-                list_dir.append(element)
+    # os.scandir: the entry type comes from the directory read (no stat per entry)
+    with os.scandir(path_dir) as it:
+        list_dir = [entry.name for entry in it if not entry.name.startswith('.') and entry.is_dir()] # pass hidden files
     return list_dir
 
 def get_dir_list_file_for_extension(path_dir, list_extension):
     list_file = []
-    current_dir_list = os.listdir(path_dir)
-    for element in current_dir_list:
-        if not element.startswith('.'): # pass hidden files
-            path = os.path.join(path_dir, element)
-            if os.path.isfile(path):
-                ext = get_file_extension(path)
-                if ext in list_extension:
+    ext_set = frozenset(ext.lower().lstrip('.') for ext in list_extension)
+    with os.scandir(path_dir) as it:
+        for entry in it:
+            element = entry.name
+            dot = element.rfind('.')
+            if not element.startswith('.') and dot != -1: # pass hidden files
+                if element[dot+1:].lower() in ext_set and entry.is_file():
                     list_file.append(element)
     return list_file
 
+def create_memmap_array(shape, dtype=np.double, dir=None):
+    '''
+    Function to create an array backed by an anonymous temporary file (np.memmap)
+
+    The OS can page the data out under memory pressure. The file has no name on disk 
+    and its space is released when the array is deleted.
+
+    Parameters:    
+        shape           tuple        Array shape
+        dtype           np.dtype     Array data type. Default: np.double
+        dir             os           Folder for the temporary file. Default: None (system temp folder)
+    
+    Returns:       
+        array           np.memmap    Array (uninitialised)
+
+    '''
+
+    with tempfile.TemporaryFile(dir=dir) as file_tmp:
+        array = np.memmap(file_tmp, dtype=dtype, mode="w+", shape=shape)
+    return array
+
 def euclidean_distance(Ax, Ay, Az):
     '''
     Function to compute the Euclidean distance between two points
@@ -45,7 +83,23 @@ def euclidean_distance(Ax, Ay, Az):
 
     '''
     
-    dist = np.sqrt(math.pow(Ax, 2) + math.pow(Ay, 2) + math.pow(Az, 2))
+    dist = math.sqrt(Ax*Ax + Ay*Ay + Az*Az)
+    return dist
+
+def euclidean_distance_vec(A):
+    '''
+    Function to compute the Euclidean distance for an array of differences (vectorised)
+
+    Parameters:    
+        A              np.array     (N,3) array with the Ax, Ay and Az differences per row
+    
+    Returns:       
+        dist           np.array     (N,) Euclidean distances
+
+    '''
+
+    A = np.asarray(A, dtype=np.double)
+    dist = np.sqrt(np.einsum('ij,ij->i', A, A))
     return dist
 
 def euclidean_distance_between_2D_points(x1, y1, x2, y2):
@@ -63,7 +117,7 @@ def euclidean_distance_between_2D_points(x1, y1, x2, y2):
 
     Ax = x2-x1
     Ay = y2-y1
-    dist = np.sqrt(math.pow(Ax, 2) + math.pow(Ay, 2))
+    dist = math.sqrt(Ax*Ax + Ay*Ay)
     return dist
 
 def compute_inverse_array(M):
@@ -77,7 +131,35 @@ def compute_inverse_array(M):
 
     '''
 
-    M_inverse = np.linalg.pinv(M) if np.linalg.det(M) == 0 else np.linalg.inv(M) # if M is a singular array, compute pseudo-inverse
+    if isinstance(M, np.ndarray) and M.shape == (3, 3):
+        M_inverse = compute_inverse_3x3_array(M)
+        if M_inverse is not None:
+            return np.asmatrix(M_inverse) if isinstance(M, np.matrix) else M_inverse
+    try:
+        M_inverse = np.linalg.inv(M)
+    except np.linalg.LinAlgError:
+        M_inverse = np.linalg.pinv(M) # if M is a singular array, compute pseudo-inverse
+    return M_inverse
+
+def compute_inverse_3x3_array(M):
+    '''
+    Function to compute the inverse of a 3x3 matrix using the adjugate (closed form)
+
+    Parameters:    
+        M              np.array     Input 3x3 array
+    Returns:       
+        M_inverse      np.array     Inverse. None for a singular array
+
+    '''
+
+    a, b, c, d, e, f, g, h, i = np.asarray(M, dtype=np.double).ravel().tolist()
+    A, B, C = e*i - f*h, f*g - d*i, d*h - e*g # cofactors of the first row
+    det = a*A + b*B + c*C
+    if det == 0:
+        return None
+    M_inverse = np.array([[A, c*h - b*i, b*f - c*e],
+                          [B, a*i - c*g, c*d - a*f],
+                          [C, b*g - a*h, a*e - b*d]]) / det
     return M_inverse
 
 def apply_optimised_dot_product(array_1, array_2):
@@ -93,6 +175,13 @@ def apply_optimised_dot_product(array_1, array_2):
     
     '''
 
+    array_2 = np.asarray(array_2)
+    # kernel only for float64 data (other dtypes: einsum, no full size float64 copies)
+    if NUMBA_AVAILABLE and np.ndim(array_1) == 2 and array_2.ndim >= 2 and array_2.dtype == np.double and array_2.shape[-1] == np.shape(array_1)[1]:
+        array_1 = np.ascontiguousarray(array_1, dtype=np.double)
+        rows = np.ascontiguousarray(array_2.reshape(-1, array_2.shape[-1]))
+        dot_product = _dot_product_rows(array_1, rows)
+        return dot_product.reshape(array_2.shape[:-1] + (array_1.shape[0],))
     dot_product = np.einsum('ij,...j', array_1, array_2)
     return dot_product
 
@@ -110,6 +199,5 @@ def apply_norm_to_matrix(array):
 
     '''
     
-    norm = np.tile(np.sum(array, 1), (3, 1)).transpose()
-    matrix_norm = array / norm
+    matrix_norm = array / array.sum(axis=1, keepdims=True) # row sums broadcast over the columns
     return matrix_norm
\ No newline at end of file
@@ -1,15 +1,69 @@
 import json
+import math
 import os
 
+import numpy as np
+
+try: # optional: faster JSON serialisation
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+def convert_numpy_to_json(obj):
+    # NumPy arrays and scalars as Python objects (json.dump fallback)
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def convert_non_finite_to_null(obj):
+    # NaN/inf as null, as orjson writes them (json.dump fallback): same files with or without orjson
+    if isinstance(obj, dict):
+        return {key: convert_non_finite_to_null(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [convert_non_finite_to_null(value) for value in obj]
+    if isinstance(obj, (np.ndarray, np.generic)):
+        return convert_non_finite_to_null(convert_numpy_to_json(obj))
+    if isinstance(obj, float) and not math.isfinite(obj):
+        return None
+    return obj
+
 def export_dict_as_json(data_as_dict, path_json):
     '''
     Function to export data as `dict` to a JSON file
 
+    NumPy arrays and scalars are allowed. orjson is used if available. NaN and infinite values
+    are written as null (valid JSON).
+
     Parameters:
         data_as_dict    dict    Data to export
         path_json       os      Output JSON file
         
     '''
 
-    with open(path_json, 'w') as fp:
-        json.dump(data_as_dict, fp)
+    if ORJSON_AVAILABLE:
+        with open(path_json, 'wb') as fp:
+            fp.write(orjson.dumps(data_as_dict, default=convert_numpy_to_json, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS))
+    else:
+        with open(path_json, 'w', encoding='utf-8') as fp: # same (compact, UTF-8) output as orjson
+            json.dump(convert_non_finite_to_null(data_as_dict), fp, default=convert_numpy_to_json, allow_nan=False, separators=(',', ':'), ensure_ascii=False)
+
+def df_to_index_dict(df):
+    '''
+    Function to convert a pandas DataFrame to a `dict` as {index: {column: value}}
+
+    Equivalent to df.to_dict("index"), but built directly from the NumPy values (faster for small tables).
+
+    Parameters:
+        df              pd.DataFrame    Data to convert
+
+    Returns:
+        data_as_dict    dict            Data as dict (one dict per row)
+        
+    '''
+
+    columns = df.columns.tolist()
+    data_as_dict = {index: dict(zip(columns, values)) for index, values in zip(df.index.tolist(), df.to_numpy(dtype=object).tolist())}
+    return data_as_dict
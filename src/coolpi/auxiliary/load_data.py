@@ -1,11 +1,49 @@
+import copy
+import csv
+import functools
 from importlib import resources
 import json
-import os
 
 import numpy as np
 
 from coolpi.auxiliary.errors import ClassTypeError, InvalidType, PathError
 
+try: # optional: faster JSON parsing
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+def _loads_json(data):
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass # e.g. NaN/Infinity literals, only accepted by json
+    return json.loads(data)
+
+# Packaged JSON resources are read-only: parse each file once per process.
+# The loaders return copies, so callers can modify the data they receive.
+@functools.lru_cache(maxsize=None)
+def _load_json_resource(package, name):
+    return _loads_json(resources.files(package).joinpath(name).read_bytes())
+
+@functools.lru_cache(maxsize=None)
+def _load_cie_arrays(name, key, labels):
+    # float64 arrays of one entry of a packaged CIE table, built once (read-only: the loaders copy them)
+    entry = _load_json_resource("coolpi.data.cie", name)[key]
+    arrays = tuple(np.array(entry[label], dtype=np.float64) for label in labels)
+    for array in arrays:
+        array.setflags(write=False)
+    return arrays
+
+def _copy_cie_arrays(name, key, labels):
+    return [array.copy() for array in _load_cie_arrays(name, key, labels)]
+
+@functools.lru_cache(maxsize=None)
+def _cie_illuminant_names():
+    return frozenset(name.upper() for name in _load_json_resource("coolpi.data.cie", "cie_spd.json"))
+
 def illuminant_is_cie(illuminant_name):
     ''''
     Function to check if the input illuminant is a valid CIE standard illuminant
@@ -18,14 +56,10 @@ def illuminant_is_cie(illuminant_name):
 
     '''
 
-    with resources.path("coolpi.data.cie", "cie_spd.json") as spd_json_path:
-        spd_json = open(spd_json_path, "r")
-        cie_spd   = json.loads(spd_json.read())
-    
-    if illuminant_name.upper() in cie_spd.keys():
-        return True
-    else:
-        return False
+    return illuminant_name.upper() in _cie_illuminant_names()
+
+# CIE observer: key in the CIE JSON tables
+_CIE_OBSERVER_KEYS = {2: "2 observer", 10: "10 observer"}
 
 def observer_is_cie(observer):
     ''''
@@ -38,17 +72,11 @@ def observer_is_cie(observer):
         bool                      Returns True if the observer is CIE. False on the contrary
 
     '''
-    observer_implemented = [2, 10]
     try:
-        observer = int(observer)
-    except:
-        raise ClassTypeError("The input observer its not a valid type argument")
-
-    if observer not in observer_implemented:
-        return False
+        return int(observer) in _CIE_OBSERVER_KEYS
         #raise CIEObserverError("The observer should be a CIE standard 1931 or 1964 observer (2º or 10º)")
-    else:
-        return True
+    except (TypeError, ValueError):
+        raise ClassTypeError("The input observer its not a valid type argument")
 
 def load_cie_illuminant(illuminant_name):
     '''
@@ -67,19 +95,17 @@ def load_cie_illuminant(illuminant_name):
     
     '''
     
-    if illuminant_is_cie(illuminant_name):    
-        with resources.path("coolpi.data.cie", "cie_spd.json") as spd_json_path:
-            spd_json = open(spd_json_path, "r")
-            cie_spd   = json.loads(spd_json.read())
-    
-        spd = cie_spd[illuminant_name]["lambda_values"]
-        spd_nm_range = cie_spd[illuminant_name]["lambda_nm_range"]
-        spd_nm_interval = cie_spd[illuminant_name]["lambda_nm_interval"]
-        cie_illuminant = {"lambda_values":spd, "lambda_nm_range": spd_nm_range, "lambda_nm_interval": spd_nm_interval}
-        return cie_illuminant
-    else:
+    cie_spd = _load_json_resource("coolpi.data.cie", "cie_spd.json")
+    entry = cie_spd.get(illuminant_name.upper())
+    if entry is None:
         #raise CIEIlluminantError("The input illuminant name is not a valid CIE standard illuminant")
         return None
+
+    spd, = _copy_cie_arrays("cie_spd.json", illuminant_name.upper(), ("lambda_values",))
+    spd_nm_range = list(entry["lambda_nm_range"])
+    spd_nm_interval = entry["lambda_nm_interval"]
+    cie_illuminant = {"lambda_values":spd, "lambda_nm_range": spd_nm_range, "lambda_nm_interval": spd_nm_interval}
+    return cie_illuminant
         
 def load_cie_cmf(observer):
     '''
@@ -100,22 +126,37 @@ def load_cie_cmf(observer):
     '''
     
     if observer_is_cie(observer):
-        with resources.path("coolpi.data.cie", "cie_cmf.json") as cie_json_path:
-            cie_json = open(cie_json_path, "r")
-            cie_cmf   = json.loads(cie_json.read())    
+        cie_cmf = _load_json_resource("coolpi.data.cie", "cie_cmf.json")
     else:
         return None
         #raise CIEObserverError("The observer should be a CIE standard 1931 or 1964 observer (2º or 10º)")
             
-    obs = "2 observer" if int(observer) == 2 else "10 observer"
+    obs = _CIE_OBSERVER_KEYS[int(observer)]
         
-    x_cmf, y_cmf, z_cmf = cie_cmf[obs]["x_cmf"], cie_cmf[obs]["y_cmf"], cie_cmf[obs]["z_cmf"]
-    cmf_nm_range    = cie_cmf[obs]["lambda_nm_range"]
+    x_cmf, y_cmf, z_cmf = _copy_cie_arrays("cie_cmf.json", obs, ("x_cmf", "y_cmf", "z_cmf"))
+    cmf_nm_range    = list(cie_cmf[obs]["lambda_nm_range"])
     cmf_nm_interval = cie_cmf[obs]["lambda_nm_interval"]
 
     cmf = {"x_cmf": x_cmf, "y_cmf": y_cmf, "z_cmf": z_cmf, "lambda_nm_range": cmf_nm_range, "lambda_nm_interval": cmf_nm_interval}
     return cmf
 
+def load_cie_cmf_arrays(observer):
+    '''
+    Function to load the CMF of the input CIE observer as plain arrays (no dict), e.g. for JIT compiled code
+
+    Parameter:   
+        observer    str, int    CIE observer
+
+    Returns:     
+        x_cmf, y_cmf, z_cmf, nm_range, nm_interval    np.darray, np.darray, np.darray, tuple, int
+
+    '''
+
+    cmf = load_cie_cmf(observer)
+    if cmf is None:
+        return None
+    return cmf["x_cmf"], cmf["y_cmf"], cmf["z_cmf"], tuple(cmf["lambda_nm_range"]), cmf["lambda_nm_interval"]
+
 def load_cie_cfb(observer):
     '''
     Function to load the CFB (cone-fundamental-based) CMFs related to the input CIE observer
@@ -135,17 +176,15 @@ def load_cie_cfb(observer):
     '''
     
     if observer_is_cie(observer):
-        with resources.path("coolpi.data.cie", "cie_cfb.json") as cie_json_path:
-            cie_json = open(cie_json_path, "r")
-            cie_cfb   = json.loads(cie_json.read())    
+        cie_cfb = _load_json_resource("coolpi.data.cie", "cie_cfb.json")
     else:
         return None
         #raise CIEObserverError("The observer should be a CIE standard 1931 or 1964 observer (2º or 10º)")
    
-    obs = "2 observer" if int(observer) == 2 else "10 observer"
+    obs = _CIE_OBSERVER_KEYS[int(observer)]
         
-    x_cfb, y_cfb, z_cfb = cie_cfb[obs]["xf_cmf"], cie_cfb[obs]["yf_cmf"], cie_cfb[obs]["zf_cmf"]
-    cfb_nm_range    = cie_cfb[obs]["lambda_nm_range"]
+    x_cfb, y_cfb, z_cfb = _copy_cie_arrays("cie_cfb.json", obs, ("xf_cmf", "yf_cmf", "zf_cmf"))
+    cfb_nm_range    = list(cie_cfb[obs]["lambda_nm_range"])
     cfb_nm_interval = cie_cfb[obs]["lambda_nm_interval"]
 
     cfb = {"xf_cmf": x_cfb, "yf_cmf": y_cfb, "zf_cmf": z_cfb, "lambda_nm_range": cfb_nm_range, "lambda_nm_interval": cfb_nm_interval}
@@ -170,17 +209,15 @@ def load_cie_rgbcmf(observer):
     '''  
 
     if observer_is_cie(observer):
-        with resources.path("coolpi.data.cie", "cie_rgbcmf.json") as cie_json_path:
-            cie_json = open(cie_json_path, "r")
-            cie_rgbcmf   = json.loads(cie_json.read())    
+        cie_rgbcmf = _load_json_resource("coolpi.data.cie", "cie_rgbcmf.json")
     else:
         return None
         #raise CIEObserverError("The observer should be a CIE standard 1931 or 1964 observer (2º or 10º)")
 
-    obs = "2 observer" if int(observer) == 2 else "10 observer"
+    obs = _CIE_OBSERVER_KEYS[int(observer)]
         
-    r_cmf, g_cmf, b_cmf = cie_rgbcmf[obs]["r_cmf"], cie_rgbcmf[obs]["g_cmf"], cie_rgbcmf[obs]["b_cmf"]
-    rgbcmf_nm_range    = cie_rgbcmf[obs]["lambda_nm_range"]
+    r_cmf, g_cmf, b_cmf = _copy_cie_arrays("cie_rgbcmf.json", obs, ("r_cmf", "g_cmf", "b_cmf"))
+    rgbcmf_nm_range    = list(cie_rgbcmf[obs]["lambda_nm_range"])
     rgbcmf_nm_interval = cie_rgbcmf[obs]["lambda_nm_interval"]
 
     rgbcmf = {"r_cmf": r_cmf, "g_cmf": g_cmf, "b_cmf": b_cmf, "lambda_nm_range": rgbcmf_nm_range, "lambda_nm_interval": rgbcmf_nm_interval}
@@ -198,10 +235,8 @@ def load_cie_s_ctt_components():
         S0, S1, S2    list    S components to compute the SPD from a CCT
 
     '''      
-    with resources.path("coolpi.data.cie", "cie_s_ctt.json") as wp_json_path:
-        cie_json = open(wp_json_path, "r")
-        cie_s_ctt  = json.loads(cie_json.read())
-        S0, S1, S2 = cie_s_ctt["S0"], cie_s_ctt["S1"], cie_s_ctt["S2"] 
+    cie_s_ctt = _load_json_resource("coolpi.data.cie", "cie_s_ctt.json")
+    S0, S1, S2 = [dict(cie_s_ctt[s], lambda_nm_range=list(cie_s_ctt[s]["lambda_nm_range"]), lambda_values=_copy_cie_arrays("cie_s_ctt.json", s, ("lambda_values",))[0]) for s in ("S0", "S1", "S2")]
     
     return S0, S1, S2
     
@@ -225,21 +260,19 @@ def load_cie_white_point(illuminant_name, observer):
     
     '''   
 
-    if illuminant_is_cie(illuminant_name):
-        with resources.path("coolpi.data.cie", "cie_white_point.json") as wp_json_path:
-            cie_json = open(wp_json_path, "r")
-            cie_wp  = json.loads(cie_json.read())
-    else:
-        return None, None, None
-        #raise CIEIlluminantError("The input illuminant name is not a valid CIE standard illuminant")
-
     if observer_is_cie(observer):
-        obs = "2 observer" if int(observer) == 2 else "10 observer"
+        obs = _CIE_OBSERVER_KEYS[int(observer)]
     else:
         return None, None, None
         #raise CIEObserverError("The observer should be a CIE standard 1931 or 1964 observer (2º or 10º)")
+
+    cie_wp = _load_json_resource("coolpi.data.cie", "cie_white_point.json")
+    entry = cie_wp[obs].get(illuminant_name.upper())
+    if entry is None:
+        return None, None, None
+        #raise CIEIlluminantError("The input illuminant name is not a valid CIE standard illuminant")
     
-    Xn, Yn, Zn = cie_wp[obs][illuminant_name]["XYZ"]
+    Xn, Yn, Zn = entry["XYZ"]
     return float(Xn), float(Yn), float(Zn)
 
 
@@ -247,6 +280,29 @@ def load_cie_white_point(illuminant_name, observer):
 
 # CSV Sekonic
 
+# label (first csv field): (measured_data key, parser)
+_SEKONIC_FIELDS = {
+    "Date Saved": ("Date", lambda value: tuple(value.split())),
+    "Measuring Mode": ("Measuring Mode", str),
+    "Viewing Angle [°]": ("Viewing Angle [º]", int),
+    "Viewing Angle [º]": ("Viewing Angle [º]", int),
+    "CCT [K]": ("CCT", int),
+    "Tcp [K]": ("CCT", int), # C-7000 exports
+    "⊿uv": ("Delta_uv", float),
+    "Δuv": ("Delta_uv", float),
+    "Illuminance [lx]": ("Illuminance [lx]", float)}
+
+# label: (measured_data key, component index, scale)
+_SEKONIC_COMPONENTS = {
+    "Tristimulus Value X": ("XYZ", 0, 10),
+    "Tristimulus Value Y": ("XYZ", 1, 10),
+    "Tristimulus Value Z": ("XYZ", 2, 10),
+    "CIE1931 x": ("xyz", 0, 1),
+    "CIE1931 y": ("xyz", 1, 1),
+    "CIE1931 z": ("xyz", 2, 1),
+    "CIE1976 u'": ("u'v'", 0, 1),
+    "CIE1976 v'": ("u'v'", 1, 1)}
+
 def load_metadata_sekonic_from_csv(path_sekonic_file):
     '''
     Function to load the measured illuminant data from a csv sekonic file 
@@ -262,82 +318,73 @@ def load_metadata_sekonic_from_csv(path_sekonic_file):
 
     '''    
 
-    if not os.path.exists(path_sekonic_file):
+    measured_data = {}
+    measured_data["nm_range"] = [380,780]
+    components = {"XYZ": [None]*3, "xyz": [None]*3, "u'v'": [None]*2}
+    lambda_values = []
+
+    try:
+        with open(path_sekonic_file, "r", encoding="utf-8-sig", newline="") as file_data:
+            file_lines = file_data.read().splitlines() # small file: one read
+    except FileNotFoundError:
         raise PathError("File not found")
 
-    measured_data = {}
+    for row in csv.reader(file_lines):
+        if len(row) < 2:
+            continue
+        label = row[0]
+        if label.startswith("Spectral Data"):
+            lambda_values.append(row[1])
+        elif label in _SEKONIC_FIELDS:
+            key, parse = _SEKONIC_FIELDS[label]
+            measured_data[key] = parse(row[1])
+        elif label in _SEKONIC_COMPONENTS:
+            key, index, scale = _SEKONIC_COMPONENTS[label]
+            components[key][index] = float(row[1])/scale
+
+    for key, values in components.items():
+        if None not in values:
+            measured_data[key] = tuple(values)
+
+    lambda_values = np.array(lambda_values, dtype=np.float64)
+    measured_data["lambda_values_5nm"] = lambda_values[:81]
+    measured_data["lambda_values_1nm"] = lambda_values[81:]
+    return measured_data
 
-    XYZ = []
-    xyz = []
-    uv = []
+def load_spd_array_from_sekonic_csv(path_sekonic_file, nm_range=[380,780], nm_interval=5):
+    '''
+    Function to load only the SPD (5 nm) from a csv sekonic file as a numeric array
+    
+    Parameter:   
+        path_sekonic_file   path       Path for the sekonic measurement csv data file
+        nm_range            list       lambda nm range of the 5 nm spectral data. Default: [380,780]
+        nm_interval         int        lambda nm interval. Default: 5
 
-    measured_data["nm_range"] = [380,780]
+    Returns:     
+        spd_array           np.array   (N,2) SPD data as [nm, value] per row (ready for MeasuredIlluminant)
 
-    lambda_values = []
+    '''    
 
-    with open(path_sekonic_file, "r", encoding="utf-8") as file_data:
-        for line in file_data:
-            line = line.rstrip("\n")
-            #fila = fila.translate(str.maketrans("", "", string.punctuation))
-            info = line.split(",")
-            if "Date Saved" in line:
-                measured_data["Date"] = tuple(info[1].split())
-            if "Measuring Mode" in line:
-                measured_data["Measuring Mode"] = info[1]
-            if "Viewing Angle" in line:
-                measured_data["Viewing Angle [º]"] = int(info[1])
-            if "[K]" in line:
-                measured_data["CCT"] = int(info[1])
-            if "uv" in line:
-                measured_data["Delta_uv"] = float(info[1])
-            if "[lx]" in line:
-                measured_data["Illuminance [lx]"] = float(info[1])
-            if "Value X" in line:
-                X = float(info[1])/10
-                XYZ.append(X)
-            if "Value Y" in line:
-                Y = float(info[1])/10
-                XYZ.append(Y)
-            if "Value Z" in line:
-                Z = float(info[1])/10
-                XYZ.append(Z)
-                measured_data["XYZ"]= tuple(XYZ)
-            if "CIE1931 x" in line:
-                x = float(info[1])
-                xyz.append(x)
-            if "CIE1931 y" in line:
-                y = float(info[1])
-                xyz.append(y)
-            if "CIE1931 z" in line:
-                z = float(info[1])
-                xyz.append(z)
-                measured_data["xyz"]= tuple(xyz)
-            if "u'" in line:
-                u = float(info[1])
-                uv.append(u)
-            if "v'" in line:
-                v = float(info[1])
-                uv.append(v)
-                measured_data["u'v'"]= tuple(uv)
-            if "Spectral Data" in line:
-                lambda_values.append(float(info[1]))
-
-        measured_data["lambda_values_5nm"] = np.array(lambda_values[:81])
-        measured_data["lambda_values_1nm"] = np.array(lambda_values[81:])
-        
-    return measured_data
+    nm_values = np.arange(nm_range[0], nm_range[1]+nm_interval, nm_interval)
+    try:
+        with open(path_sekonic_file, "r", encoding="utf-8") as file_data:
+            file_lines = file_data.read().splitlines() # small file: one read
+    except FileNotFoundError:
+        raise PathError("File not found")
+    spectral_rows = [line for line in file_lines if line.startswith("Spectral Data")]
+    lambda_values = np.loadtxt(spectral_rows[:len(nm_values)], delimiter=",", usecols=1)
+    spd_array = np.column_stack((nm_values, lambda_values))
+    return spd_array
 
 def load_spd_from_json(path_json):
-    with open(path_json) as json_file:
-        measured_data = json.load(json_file)
+    with open(path_json, "rb") as json_file:
+        measured_data = _loads_json(json_file.read())
     return measured_data
 
+_SPD_REQUIRED_LABELS = frozenset(["nm_range", "nm_interval", "lambda_values"])
+
 def is_valid_spd_data_dict(data_as_dict):
-    required_label = set(["nm_range", "nm_interval", "lambda_values"])
-    label_data = set(data_as_dict.keys())
-    set_intersect = required_label.intersection(label_data)
-    valid = True if len(set_intersect) == len(required_label) else False
-    return valid
+    return _SPD_REQUIRED_LABELS.issubset(data_as_dict)
 
 def rgb_dict_to_array(rgb_dict):
     '''
@@ -351,10 +398,7 @@ def rgb_dict_to_array(rgb_dict):
 
     '''  
 
-    rgb = []
-    for patch_id, rgb_data in rgb_dict.items():
-        rgb.append(rgb_data)
-    rgb_array = np.array(rgb)
+    rgb_array = np.array(list(rgb_dict.values()))
     return rgb_array
 
 # ColourChecherSpectral
@@ -376,41 +420,85 @@ colour_checker_implemented= {
     "XRCCSG": "X-rite Digital SG"}
 
 def is_checker_implemented(checker_name, colour_checker_dict = colour_checker_implemented):
-    if checker_name in colour_checker_dict.keys():
-        return True
-    return False
+    return checker_name in colour_checker_dict
 
 def get_full_colourchecker_name(checker_name, colour_checker_dict = colour_checker_implemented):
-    if checker_name in colour_checker_dict.keys():
-        full_name = colour_checker_dict[checker_name]
-        return full_name
-    return None
+    return colour_checker_dict.get(checker_name)
+
+# reflectance of each checker as one read-only (n_patches, n_bands) float64 matrix, converted once
+# "patches" keeps the dict layout, each patch being a row view of the matrix
+@functools.lru_cache(maxsize=1)
+def _load_theoretical_colourcheckers():
+    chart_dict = _load_json_resource("coolpi.data.colourchecker.reflectance", "colour_checker_reflectance_data.json")
+    checkers = {}
+    for checker_name, checker_data in chart_dict.items():
+        if not isinstance(checker_data, dict):
+            continue
+        patches_id = list(checker_data["patches"].keys())
+        reflectance = np.array(list(checker_data["patches"].values()), dtype=np.float64)
+        reflectance.flags.writeable = False
+        patches = dict(zip(patches_id, reflectance))
+        checkers[checker_name] = dict(checker_data, patches=patches, patches_id=patches_id, reflectance=reflectance)
+    return checkers
+
+def load_colourchecker_matrix(checker_name):
+    '''
+    Function to load the reflectance data of a colour checker as a single array (one row per patch)
+    
+    Parameter:   
+        checker_name    str           Colour checker name
+
+    Returns:     
+        patches_id      list          Patches id (row order)
+        reflectance     np.darray     (n_patches, n_bands) read-only reflectance data
+        nm_range        list          lambda nm range
+        nm_interval     int           lambda nm interval
+
+    '''
+
+    checker_data = _load_theoretical_colourcheckers().get(checker_name)
+    if checker_data is None:
+        return None
+    return list(checker_data["patches_id"]), checker_data["reflectance"], list(checker_data["lambda_nm_range"]), checker_data["lambda_nm_interval"]
 
 def load_theoretical_colourchecker_using_resources(checker_name):
-    with resources.path("coolpi.data.colourchecker.reflectance", "colour_checker_reflectance_data.json") as json_path:
-        chart_json = open(json_path, "r")
-        chart_dict = json.loads(chart_json.read())  
-    return chart_dict[checker_name]
+    checker_data = _load_theoretical_colourcheckers().get(checker_name)
+    if checker_data is None:
+        return None
+    # new containers: the patches arrays are shared (read-only), the rest is copied
+    return {"Metadata": copy.deepcopy(checker_data["Metadata"]), "lambda_nm_interval": checker_data["lambda_nm_interval"],
+            "lambda_nm_range": list(checker_data["lambda_nm_range"]), "patches": dict(checker_data["patches"])}
+
+def load_colourchecker_patches_coordinates_using_resources(checker_name):
+    coordinates_dict = _load_json_resource("coolpi.data.colourchecker.coordinates", "patches_coordinates.json")
+    if checker_name in coordinates_dict.keys():
+        return copy.deepcopy(coordinates_dict[checker_name])
+    return None
 
 # JSON
 
 def load_colourchecker_from_json(path_json):
-    with open(path_json) as json_file:
-        measured_data = json.load(json_file)
+    with open(path_json, "rb") as json_file:
+        measured_data = _loads_json(json_file.read())
     return measured_data
 
+_COLOURCHECKER_REQUIRED_LABELS = frozenset(["nm_range", "nm_interval", "patches", "Illuminant", "Observer"])
+
 def is_valid_colourchecker_spectral_data_dict(data_as_dict):
-    required_label = set(["nm_range", "nm_interval", "patches", "Illuminant", "Observer"])
-    label_data = set(data_as_dict.keys())
-    set_intersect = required_label.intersection(label_data)
-    valid = True if len(set_intersect) == len(required_label) else False
-    return valid
+    return _COLOURCHECKER_REQUIRED_LABELS.issubset(data_as_dict)
 
 # ColourCheckerXYZ
 
 
 # XYZ, LAB, RGB data from CSV file
 
+def _read_csv_as_str_array(path_csv, head):
+    # one row per line (";" separated), parsed at once
+    try:
+        return np.genfromtxt(path_csv, delimiter=";", skip_header=1 if head else 0, dtype=str, comments=None, ndmin=2, encoding=None)
+    except FileNotFoundError:
+        raise PathError("File not found")
+
 # csv_cols={"label":col_pos, "X":col_pos, "Y":col_pos, "Z":col_pos}
 
 def load_coordinates_from_csv(path_csv, csv_cols, head=True, data_type="RGB"):
@@ -430,46 +518,19 @@ def load_coordinates_from_csv(path_csv, csv_cols, head=True, data_type="RGB"):
     
     data_type_valid = ["RGB", "XYZ", "LAB"]
     
-    if not os.path.exists(path_csv):
-        raise PathError("File not found")
-    
     if data_type not in data_type_valid:
         raise ClassTypeError(f"Coordinates data type not valid: {data_type_valid}")
 
-    patches_dict = {} # easy search 
-    coordinates = []
-    label_c1, label_c2, label_c3 = [label for label in list(data_type)]
-
-    with open(path_csv, "r") as f_rgb:
-        if head:
-            f_rgb.readline() # pass header
-
-        for linea in f_rgb:
-            data = linea.split(";")
-            # get data
-            patche_id = data[csv_cols["label"]]
-            c1 = float(data[csv_cols[label_c1]])
-            c2 = float(data[csv_cols[label_c2]])
-            c3 = float(data[csv_cols[label_c3]])
-            patches_dict[patche_id] = (c1,c2,c3) 
-            coordinates.append([c1,c2,c3]) # to get the rgb values as array
-
+    # parse the whole file at once, one row per patch
+    data = _read_csv_as_str_array(path_csv, head)
+    patches_id = data[:, csv_cols["label"]]
+    coordinates = data[:, [csv_cols[label] for label in data_type]].astype(np.float64)
+    patches_dict = dict(zip(patches_id.tolist(), map(tuple, coordinates.tolist()))) # easy search
     return patches_dict
 
 # not tested
 def load_reflectance_from_csv(path_csv, head=True):
-    if not os.path.exists(path_csv):
-        raise PathError("File not found")
-    
-    patches_reflectance_dict = {} # easy search 
-
-    with open(path_csv, "r") as f_reflectance:
-        if head:
-            f_reflectance.readline() # pass header
-        
-        for linea in f_reflectance:
-            data = linea.split(";")
-            sample_id = data[0]
-            reflectance = data[1:len(data)]
-            patches_reflectance_dict[sample_id] = reflectance
+    data = _read_csv_as_str_array(path_csv, head)
+    reflectance = data[:, 1:].astype(np.float64) # one row per sample
+    patches_reflectance_dict = dict(zip(data[:, 0].tolist(), reflectance)) # easy search
     return patches_reflectance_dict
\ No newline at end of file
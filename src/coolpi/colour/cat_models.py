@@ -1,21 +1,88 @@
 import numpy as np
 import math
+from functools import lru_cache
 
 import coolpi.auxiliary.common_operations as cop
 import coolpi.auxiliary.errors as exc
 
+try: # optional: JIT compiled kernels
+    from numba import njit, prange, types
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# M matrices (and inverses) computed once at import, not on every call
+_M_VON_KRIES = np.array([[0.4002, 0.7076, -0.0808], [-0.2263, 1.1653, 0.0457], [0.0, 0.0, 0.9182]]) # Von Kries Model D65
+_MI_VON_KRIES = cop.compute_inverse_array(_M_VON_KRIES)
+
+_M_BRADFORD = np.array([[0.8951, 0.2664, -0.1614], [-0.7502, 1.7135, 0.0367], [0.0389, -0.0685, 1.0296]]) # Mbfd matrix
+_MI_BRADFORD = cop.compute_inverse_array(_M_BRADFORD)
+
+_CAT_M ={
+    "von Kries": np.array([[0.3897, 0.6890, -0.0787], [-0.2298, 1.1834, 0.0464], [0.0, 0.0, 1.0]]),
+    "Bradford":  _M_BRADFORD,
+    "Sharp": np.array([[1.2694, 0.0988, -0.1706], [-0.8364, 1.8006, 0.0357], [0.0297, -0.0315, 1.0018]]),
+    "CMCCAT200": np.array([[0.7982, 0.3389, -0.1371], [-0.5918, 1.5512, 0.0406], [0.0008, 0.2390, 0.9753]]),
+    "CAT02": np.array([[0.7328, 0.4296, -0.1624], [-0.7036, 1.6975, 0.0061], [0.0030, 0.0136, 0.9834]]),
+    "BS": np.array([[0.8752, 0.2787, -0.1539], [-0.8904, 1.8709, 0.0195], [-0.0061, 0.0162, 0.9899]]),
+    "BSPC": np.array([[0.6489, 0.3915, -0.0404], [-0.3775, 1.3055, 0.0720], [-0.0271, 0.0888, 0.9383]])}
+
+_CAT_MI = {cat_model: cop.compute_inverse_array(M) for cat_model, M in _CAT_M.items()}
+
+if NUMBA_AVAILABLE:
+    # the cached CAT matrices are read-only arrays
+    _ARRAY_3X3 = types.Array(types.float64, 2, "C", readonly=True)
+    _XYZ = types.UniTuple(types.float64, 3)
+
+    @njit(_XYZ(types.float64, types.float64, types.float64, _ARRAY_3X3), cache=True)
+    def _apply_3x3_array(X, Y, Z, T):
+        # T·[X,Y,Z], unrolled
+        return (T[0,0]*X + T[0,1]*Y + T[0,2]*Z,
+                T[1,0]*X + T[1,1]*Y + T[1,2]*Z,
+                T[2,0]*X + T[2,1]*Y + T[2,2]*Z)
+
+    @njit(types.float64[:,::1](types.Array(types.float64, 2, "C", readonly=True), _ARRAY_3X3), cache=True, parallel=True)
+    def _apply_3x3_array_rows(XYZ_array, T):
+        XYZ_array_2 = np.empty((XYZ_array.shape[0], 3))
+        for k in prange(XYZ_array.shape[0]):
+            X, Y, Z = XYZ_array[k,0], XYZ_array[k,1], XYZ_array[k,2]
+            for i in range(3):
+                XYZ_array_2[k,i] = T[i,0]*X + T[i,1]*Y + T[i,2]*Z
+        return XYZ_array_2
+
+    @njit(_XYZ(types.float64, types.float64, types.float64, types.float64, types.float64, types.float64,
+               types.float64, types.float64, types.float64, _ARRAY_3X3, _ARRAY_3X3), cache=True)
+    def _von_Kries_transform(X, Y, Z, L1, M1, S1, L2, M2, S2, M, MI):
+        L, Ma, S = _apply_3x3_array(X, Y, Z, M)
+        return _apply_3x3_array(L2*(L/L1), M2*(Ma/M1), S2*(S/S1), MI)
+
+    @njit(_XYZ(types.float64, types.float64, types.float64, types.float64, types.float64, types.float64,
+               types.float64, types.float64, types.float64, _ARRAY_3X3, _ARRAY_3X3), cache=True)
+    def _Bradford_non_linear_transform(X, Y, Z, Xn1, Yn1, Zn1, Xn2, Yn2, Zn2, M, MI):
+        R, G, B = _apply_3x3_array(X/Y, 1.0, Z/Y, M)
+        Rw1, Gw1, Bw1 = _apply_3x3_array(Xn1/Yn1, 1.0, Zn1/Yn1, M)
+        Rw2, Gw2, Bw2 = _apply_3x3_array(Xn2/Yn2, 1.0, Zn2/Yn2, M)
+        p = math.pow((Bw1/Bw2),0.0834)
+        Bb = math.pow(Bw2*(B/Bw1),p) # NaN out of domain (math.pow raises in Python)
+        return _apply_3x3_array(Rw2*(R/Rw1)*Y, Gw2*(G/Gw1)*Y, Bb*Y, MI)
+
+for _M in (_M_VON_KRIES, _MI_VON_KRIES, _M_BRADFORD, _MI_BRADFORD, *_CAT_M.values(), *_CAT_MI.values()):
+    _M.setflags(write=False)
+
 def XYZ_to_LMS(X, Y, Z):
-    # LMS or CIE RGB
+    # LMS or CIE RGB
     # Ec. 2.7. Digital Imaging Color Handbook (2.6.4. von Kries Model) D65
     XYZ = np.array([X,Y,Z])
-    M = np.matrix("0.4002 0.7076 -0.0808;-0.2263 1.1653 0.0457; 0.0 0.0 0.9182") # Von Kries Model
-    LMS = np.transpose(np.dot(M, XYZ))
-    L, M, S = float(LMS[0]), float(LMS[1]), float(LMS[2])
+    L, M, S = (_M_VON_KRIES @ XYZ).tolist()
     return L, M, S
 
+def _is_same_white_point(Xn1, Yn1, Zn1, Xn2, Yn2, Zn2):
+    # the CATs only depend on the white point chromaticities: same ones -> identity
+    return math.isclose(Xn1/Yn1, Xn2/Yn2) and math.isclose(Zn1/Yn1, Zn2/Yn2)
+
 # CAT's (Chromatic Adaptation Transforms)
 # "LMSw WhiteRef en LMS, XYZ un objeto colour en coordenadas CIE XYZ"
-# LMS to XYZ
+# LMS to XYZ
 def apply_von_Kries_model(X, Y, Z, L, M, S):
 
     # gain control coefficients, described to be the inverse of the maximum LMS response in the scene (WhiteReference)
@@ -24,83 +91,73 @@ def apply_von_Kries_model(X, Y, Z, L, M, S):
     aM = 1/M
     aS = 1/S
     
-    # coefficients as matrix
-    C = np.matrix([[aL,0.,0.],[0.,aM,0.],[0.,0.,aS]])
+    # coefficients as a diagonal (element-wise product)
+    C = np.array([aL,aM,aS])
 
-    M = np.matrix("0.4002 0.7076 -0.0808;-0.2263 1.1653 0.0457; 0.0 0.0 0.9182") # M matrix D65
-    
-    MI = cop.compute_inverse_array(M)
-        
     # dot product
-    XYZ = np.matrix([[X],[Y],[Z]])
-    LMS = np.dot(M,XYZ)
-    LMSad = np.dot(C,LMS)
+    XYZ = np.array([X,Y,Z])
+    LMS = _M_VON_KRIES @ XYZ
+    LMSad = C*LMS
 
-    XYZad = np.dot(MI,LMSad)*100 # Escalar
+    XYZad = (_MI_VON_KRIES @ LMSad)*100 # Escalar
 
     # tristimulus values 
-    Xa, Ya, Za = float(XYZad[0]), float(XYZad[1]), float(XYZad[2])
+    Xa, Ya, Za = XYZad.tolist()
 
     return Xa, Ya, Za  # Que devuelva una matriz, o que devuelva un objeto de tipo colour?
 
 def apply_von_Kries_transform(X, Y, Z, L1, M1, S1, L2, M2, S2):
 
+    if NUMBA_AVAILABLE:
+        return _von_Kries_transform(X, Y, Z, L1, M1, S1, L2, M2, S2, _M_VON_KRIES, _MI_VON_KRIES)
+
     # gain control coefficients, described to be the inverse of the maximum LMS response in the scene (WhiteReference)
     # white point normalization
     aL = 1/L1
     aM = 1/M1
     aS = 1/S1
     
-    # coefficients as matrix
-    C1 = np.matrix([[aL,0.,0.],[0.,aM,0.],[0.,0.,aS]])
-    C2 = np.matrix([[L2,0.,0.],[0.,M2,0.],[0.,0.,S2]])
-
-    M = np.matrix("0.4002 0.7076 -0.0808;-0.2263 1.1653 0.0457; 0.0 0.0 0.9182") # M matrix
-    MI = cop.compute_inverse_array(M)
+    # coefficients as diagonals (element-wise products)
+    C1 = np.array([aL,aM,aS])
+    C2 = np.array([L2,M2,S2])
 
     # dot product
 
-    # XYZ as matrix
-    XYZm = np.matrix([[X],[Y],[Z]])
+    XYZ = np.array([X,Y,Z])
 
-    LMS     = np.dot(M,XYZm)
-    LMSad   = np.dot(C1,LMS)
-    LMS2    = np.dot(C2,LMSad)
+    LMS     = _M_VON_KRIES @ XYZ
+    LMSad   = C1*LMS
+    LMS2    = C2*LMSad
 
-    XYZad   = np.dot(MI,LMS2) # No hace falta escalar multiplicando por 100
+    XYZad   = _MI_VON_KRIES @ LMS2 # No hace falta escalar multiplicando por 100
 
-    Xa, Ya, Za = float(XYZad[0]),float(XYZad[1]),float(XYZad[2])
+    Xa, Ya, Za = XYZad.tolist()
 
     return Xa, Ya, Za 
 
 # La transformacion de Bradford sirve de base para la definicion del CIECAM97s
 def apply_Bradford_non_linear_transform(X, Y, Z, Xn1, Yn1, Zn1, Xn2, Yn2, Zn2):
 
-    # Step1. XYZ To RGB ("Spectral sharpening and the Bradford transformation. Finlayson.2000)
-    Mbfd = np.matrix("0.8951 0.2664 -0.1614;-0.7502 1.7135 0.0367; 0.0389 -0.0685 1.0296") # Mbfd matrix
-    XYZ = np.matrix([[X/Y],[Y/Y],[Z/Y]])
+    if _is_same_white_point(Xn1, Yn1, Zn1, Xn2, Yn2, Zn2):
+        return float(X), float(Y), float(Z)
+
+    if NUMBA_AVAILABLE:
+        X2, Y2, Z2 = _Bradford_non_linear_transform(X, Y, Z, Xn1, Yn1, Zn1, Xn2, Yn2, Zn2, _M_BRADFORD, _MI_BRADFORD)
+        if math.isnan(Z2) and not math.isnan(X + Y + Z + Xn1 + Yn1 + Zn1 + Xn2 + Yn2 + Zn2):
+            raise ValueError("math domain error")
+        return X2, Y2, Z2
 
-    RGBm = np.dot(Mbfd, XYZ) # RGB or LMS
+    # Step1. XYZ To RGB ("Spectral sharpening and the Bradford transformation. Finlayson.2000)
+    XYZ = np.array([X/Y,Y/Y,Z/Y])
 
-    R = float(RGBm[0])
-    G = float(RGBm[1])
-    B = float(RGBm[2])
+    R, G, B = (_M_BRADFORD @ XYZ).tolist() # RGB or LMS
 
     # Test illuminants
-    XYZw1 = np.matrix([[Xn1/Yn1],[Yn1/Yn1],[Zn1/Yn1]])
-    XYZw2 = np.matrix([[Xn2/Yn2],[Yn2/Yn2],[Zn2/Yn2]])
+    XYZw1 = np.array([Xn1/Yn1,Yn1/Yn1,Zn1/Yn1])
+    XYZw2 = np.array([Xn2/Yn2,Yn2/Yn2,Zn2/Yn2])
 
-    RGBw1 = np.dot(Mbfd, XYZw1)
-            
-    Rw1 = float(RGBw1[0])
-    Gw1 = float(RGBw1[1])
-    Bw1 = float(RGBw1[2])
-            
-    RGBw2 = np.dot(Mbfd, XYZw2)
-            
-    Rw2 = float(RGBw2[0])
-    Gw2 = float(RGBw2[1])
-    Bw2 = float(RGBw2[2])
+    Rw1, Gw1, Bw1 = (_M_BRADFORD @ XYZw1).tolist()
+    Rw2, Gw2, Bw2 = (_M_BRADFORD @ XYZw2).tolist()
 
     # Step2. RGB - R'G'B' (Notacion mia Rr Gg Bb)
     Rr = Rw2*(R/Rw1)
@@ -109,65 +166,20 @@ def apply_Bradford_non_linear_transform(X, Y, Z, Xn1, Yn1, Zn1, Xn2, Yn2, Zn2):
     Bb = math.pow(Bw2*(B/Bw1),p)
 
     # Step3. R'G'B' To X'Y'Z'
-    MbfdI = cop.compute_inverse_array(Mbfd)
-    RrGgBb = np.matrix([[Rr*Y],[Gg*Y],[Bb*Y]]) # En forma de matriz
-    XYZinw2 = np.dot(MbfdI,RrGgBb)
-
-    X2, Y2, Z2 = float(XYZinw2[0]),float(XYZinw2[1]),float(XYZinw2[2])
+    RrGgBb = np.array([Rr*Y,Gg*Y,Bb*Y])
+    X2, Y2, Z2 = (_MI_BRADFORD @ RrGgBb).tolist()
 
     return X2, Y2, Z2
 
 # No hay diferencias significativas entre el modelo no-lineal / lineal
 def apply_Bradford_linear_transform(X, Y, Z, Xn1, Yn1, Zn1, Xn2, Yn2, Zn2):
-    
-    Mbfd = np.matrix("0.8951 0.2664 -0.1614;-0.7502 1.7135 0.0367; 0.0389 -0.0685 1.0296") # Mbfd matrix
-    
-    MbfdI = cop.compute_inverse_array(Mbfd)
 
-    XYZm = np.matrix([[X],[Y],[Z]])
-
-    # Test illuminants
-    XYZw1 = np.matrix([[Xn1/Yn1],[Yn1/Yn1],[Zn1/Yn1]])
-    XYZw2 = np.matrix([[Xn2/Yn2],[Yn2/Yn2],[Zn2/Yn2]])
-    
-    RGBw1 = np.dot(Mbfd, XYZw1)
-            
-    Rw1 = float(RGBw1[0])
-    Gw1 = float(RGBw1[1])
-    Bw1 = float(RGBw1[2])
-            
-    RGBw2 = np.dot(Mbfd,XYZw2)
+    # MbfdI·D·Mbfd is the cached "Bradford" CAT matrix (apply_CATs_transform_batch for several colours)
+    return apply_CATs_transform(X, Y, Z, Xn1, Yn1, Zn1, Xn2, Yn2, Zn2, "Bradford")
             
-    Rw2 = float(RGBw2[0])
-    Gw2 = float(RGBw2[1])
-    Bw2 = float(RGBw2[2])
-
-    d1 = Rw2/Rw1
-    d2 = Gw2/Gw1
-    d3 = Bw2/Bw1
-
-    D = np.matrix([[d1,0,0],[0,d2,0],[0,0,d3]])
-
-    S1 = np.dot(Mbfd, XYZm)
-    S2 = np.dot(D, S1)
-    XYZinw2 = np.dot(MbfdI, S2)
-
-    X2, Y2, Z2 = float(XYZinw2[0]),float(XYZinw2[1]),float(XYZinw2[2])
-
-    return X2, Y2, Z2
-            
-# D array
+# D array
 def compute_degree_of_adaptation(Xn1, Yn1, Zn1, Xn2, Yn2, Zn2, cat_model):
 
-    dict_cat_M_array ={
-        "von Kries": np.matrix("0.3897 0.6890 -0.0787;-0.2298 1.1834 0.0464; 0.0 0.0 1.0"),
-        "Bradford":  np.matrix("0.8951 0.2664 -0.1614;-0.7502 1.7135 0.0367; 0.0389 -0.0685 1.0296"),
-        "Sharp": np.matrix("1.2694 0.0988 -0.1706;-0.8364 1.8006 0.0357; 0.0297 -0.0315 1.0018"),
-        "CMCCAT200": np.matrix("0.7982 0.3389 -0.1371;-0.5918 1.5512 0.0406; 0.0008  0.2390 0.9753"),
-        "CAT02": np.matrix("0.7328 0.4296 -0.1624;-0.7036 1.6975 0.0061; 0.0030  0.0136 0.9834"),
-        "BS": np.matrix("0.8752 0.2787 -0.1539;-0.8904 1.8709 0.0195;-0.0061  0.0162 0.9899"),
-        "BSPC": np.matrix("0.6489 0.3915 -0.0404;-0.3775 1.3055 0.0720;-0.0271  0.0888 0.9383")}
-
     '''
     CAT coefficient from Bianco and Schettini, 2010
     Bianco, S., and Schettini, R. 2010. Two new von Kries based chromatic adaptation transforms found by 
@@ -176,88 +188,120 @@ def compute_degree_of_adaptation(Xn1, Yn1, Zn1, Xn2, Yn2, Zn2, cat_model):
     
     '''
     
-    if cat_model not in dict_cat_M_array.keys():
-        raise exc.CatModelError(f"CAT model not implemented. Please, select : {dict_cat_M_array.keys()}")
+    return np.diag(_compute_cone_response_ratios(cat_model, Xn1/Yn1, Zn1/Yn1, Xn2/Yn2, Zn2/Yn2))
+
+@lru_cache(maxsize=128)
+def _compute_cone_response_ratios(cat_model, x1, z1, x2, z2):
+    # diagonal of D (RGBw2/RGBw1) for a pair of white points given as Xn/Yn, Zn/Yn (read-only, shared)
+    if cat_model not in _CAT_M.keys():
+        raise exc.CatModelError(f"CAT model not implemented. Please, select : {_CAT_M.keys()}")
     
-    M = dict_cat_M_array[cat_model]
-    MI = cop.compute_inverse_array(M)
-        
-    # Test illuminants
-    XYZw1 = np.matrix([[Xn1/Yn1],[Yn1/Yn1],[Zn1/Yn1]])
-    XYZw2 = np.matrix([[Xn2/Yn2],[Yn2/Yn2],[Zn2/Yn2]])
+    M = _CAT_M[cat_model]
             
     # en realidad es LMS, en otros libros lo llama RGB
-    RGBw1 = np.dot(M, XYZw1)
-            
-    Rw1 = float(RGBw1[0])
-    Gw1 = float(RGBw1[1])
-    Bw1 = float(RGBw1[2])
-            
-    RGBw2 = np.dot(M, XYZw2)
-            
-    Rw2 = float(RGBw2[0])
-    Gw2 = float(RGBw2[1])
-    Bw2 = float(RGBw2[2])
+    RGBw1 = M @ np.array([x1,1.,z1])
+    RGBw2 = M @ np.array([x2,1.,z2])
 
-    d1 = Rw2/Rw1
-    d2 = Gw2/Gw1
-    d3 = Bw2/Bw1
+    ratios = RGBw2/RGBw1
+    ratios.setflags(write=False)
+    return ratios
 
-    D = np.matrix([[d1,0,0],[0,d2,0],[0,0,d3]])
-    
-    return D
+@lru_cache(maxsize=64)
+def _build_CAT_matrix(cat_model, x1, z1, x2, z2):
+    '''
+    Function to compute the fused CAT matrix T = MI·D·M for a pair of white points
+
+    Parameters:    
+        cat_model      str          CAT model
+        x1, z1         float        Xn1/Yn1, Zn1/Yn1 of the source white point
+        x2, z2         float        Xn2/Yn2, Zn2/Yn2 of the destination white point
+    Returns:       
+        T              np.array     3x3 CAT matrix (read-only, shared between calls)
+
+    '''
+
+    ratios = _compute_cone_response_ratios(cat_model, x1, z1, x2, z2)
+
+    # MI·D·M with D diagonal
+    T = _CAT_MI[cat_model] @ (ratios[:, None]*_CAT_M[cat_model])
+    T.setflags(write=False)
+    return T
 
 # Funcion CATs. Aplica la transformacion deseada. Solo hay que especificar la matriz M
 # Model="von Kries" "Bradford" "Sharp" "CMCCAT200" "CAT02" "BS" "BSPC"
 
 def apply_CATs_transform(X, Y, Z, Xn1, Yn1, Zn1, Xn2, Yn2, Zn2, cat_model):
 
-    dict_cat_M_array ={
-        "von Kries": np.matrix("0.3897 0.6890 -0.0787;-0.2298 1.1834 0.0464; 0.0 0.0 1.0"),
-        "Bradford":  np.matrix("0.8951 0.2664 -0.1614;-0.7502 1.7135 0.0367; 0.0389 -0.0685 1.0296"),
-        "Sharp": np.matrix("1.2694 0.0988 -0.1706;-0.8364 1.8006 0.0357; 0.0297 -0.0315 1.0018"),
-        "CMCCAT200": np.matrix("0.7982 0.3389 -0.1371;-0.5918 1.5512 0.0406; 0.0008  0.2390 0.9753"),
-        "CAT02": np.matrix("0.7328 0.4296 -0.1624;-0.7036 1.6975 0.0061; 0.0030  0.0136 0.9834"),
-        "BS": np.matrix("0.8752 0.2787 -0.1539;-0.8904 1.8709 0.0195;-0.0061  0.0162 0.9899"),
-        "BSPC": np.matrix("0.6489 0.3915 -0.0404;-0.3775 1.3055 0.0720;-0.0271  0.0888 0.9383")}
-
-    if cat_model not in dict_cat_M_array.keys():
-        raise exc.CatModelError(f"CAT model not implemented. Please, select : {dict_cat_M_array.keys()}")
-    
-    M = dict_cat_M_array[cat_model]
-    
-    MI = cop.compute_inverse_array(M)
-        
+    if _is_same_white_point(Xn1, Yn1, Zn1, Xn2, Yn2, Zn2) and cat_model in _CAT_M:
+        return float(X), float(Y), float(Z)
+
+    T = _build_CAT_matrix(cat_model, Xn1/Yn1, Zn1/Yn1, Xn2/Yn2, Zn2/Yn2)
+
+    if NUMBA_AVAILABLE:
+        return _apply_3x3_array(X, Y, Z, T)
+
+    X2, Y2, Z2 = (T @ np.array([X,Y,Z])).tolist()
     
-    XYZm = np.matrix([[X],[Y],[Z]])
+    return X2, Y2, Z2 
 
-    # Test illuminants
-    XYZw1 = np.matrix([[Xn1/Yn1],[Yn1/Yn1],[Zn1/Yn1]])
-    XYZw2 = np.matrix([[Xn2/Yn2],[Yn2/Yn2],[Zn2/Yn2]])
-            
-    # en realidad es LMS, en otros libros lo llama RGB
-    RGBw1 = np.dot(M, XYZw1)
-            
-    Rw1 = float(RGBw1[0])
-    Gw1 = float(RGBw1[1])
-    Bw1 = float(RGBw1[2])
-            
-    RGBw2 = np.dot(M,XYZw2)
-            
-    Rw2 = float(RGBw2[0])
-    Gw2 = float(RGBw2[1])
-    Bw2 = float(RGBw2[2])
+def apply_CATs_transform_batch(XYZ_array, Xn1, Yn1, Zn1, Xn2, Yn2, Zn2, cat_model):
+    '''
+    Function to apply a CAT to several colours at once
 
-    d1 = Rw2/Rw1
-    d2 = Gw2/Gw1
-    d3 = Bw2/Bw1
+    Parameters:    
+        XYZ_array      np.array     CIE XYZ values (N,3), or an image (H,W,3)
+        Xn1, Yn1, Zn1  float        Source white point
+        Xn2, Yn2, Zn2  float        Destination white point
+        cat_model      str          "von Kries" "Bradford" "Sharp" "CMCCAT200" "CAT02" "BS" "BSPC"
+    Returns:       
+        XYZ_array_2    np.array     Adapted CIE XYZ values, same shape as XYZ_array
 
-    D = np.matrix([[d1,0,0],[0,d2,0],[0,0,d3]])
+    '''
 
-    S1 = np.dot(M,XYZm)
-    S2 = np.dot(D,S1)
-    XYZinw2 = np.dot(MI,S2)
+    T = _build_CAT_matrix(cat_model, Xn1/Yn1, Zn1/Yn1, Xn2/Yn2, Zn2/Yn2)
 
-    X2, Y2, Z2 = float(XYZinw2[0]),float(XYZinw2[1]),float(XYZinw2[2])
-    
-    return X2, Y2, Z2 
+    XYZ_array = np.asarray(XYZ_array, dtype=np.float64)
+    if XYZ_array.ndim < 2 or XYZ_array.shape[-1] != 3:
+        raise exc.ColourError("The XYZ array should have shape (..., 3)")
+
+    if _is_same_white_point(Xn1, Yn1, Zn1, Xn2, Yn2, Zn2) and cat_model in _CAT_M:
+        return XYZ_array.copy()
+
+    # (H,W,3) as (H*W,3): one matmul instead of one per image row
+    rows = XYZ_array.reshape(-1, 3)
+    if NUMBA_AVAILABLE:
+        rows_2 = _apply_3x3_array_rows(np.ascontiguousarray(rows), T)
+    else:
+        rows_2 = rows @ T.T
+    XYZ_array_2 = rows_2.reshape(XYZ_array.shape)
+
+    return XYZ_array_2
+
+def apply_CATs_transform_image(XYZ_image, Xn1, Yn1, Zn1, Xn2, Yn2, Zn2, cat_model, dtype=np.float32):
+    '''
+    Function to apply a CAT to an image in single precision (enough for 8/16-bit images)
+
+    Parameters:    
+        XYZ_image      np.array     CIE XYZ image (H,W,3) (or any (...,3) array)
+        Xn1, Yn1, Zn1  float        Source white point
+        Xn2, Yn2, Zn2  float        Destination white point
+        cat_model      str          "von Kries" "Bradford" "Sharp" "CMCCAT200" "CAT02" "BS" "BSPC"
+        dtype          np.dtype     Computation and output data type (default: np.float32)
+    Returns:       
+        XYZ_image_2    np.array     Adapted CIE XYZ image, same shape as XYZ_image
+
+    '''
+
+    T = _build_CAT_matrix(cat_model, Xn1/Yn1, Zn1/Yn1, Xn2/Yn2, Zn2/Yn2)
+
+    # C-contiguous (H*W,3) rows: a single SGEMM with half the memory traffic of float64
+    XYZ_image = np.ascontiguousarray(XYZ_image, dtype=dtype)
+    if XYZ_image.ndim < 2 or XYZ_image.shape[-1] != 3:
+        raise exc.ColourError("The XYZ array should have shape (..., 3)")
+
+    if _is_same_white_point(Xn1, Yn1, Zn1, Xn2, Yn2, Zn2):
+        return XYZ_image.copy()
+
+    XYZ_image_2 = XYZ_image.reshape(-1, 3) @ T.T.astype(dtype)
+
+    return XYZ_image_2.reshape(XYZ_image.shape)
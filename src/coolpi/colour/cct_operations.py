@@ -1,8 +1,17 @@
+from functools import lru_cache
 import math
 import numpy as np
 
+import coolpi.auxiliary.load_data as ld
+from coolpi.auxiliary.errors import CCTNotInValidRangeError
 import coolpi.colour.colour_space_conversion as csc
 
+try: # optional: JIT compiled kernels
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
 # CCT 
 # -------
 
@@ -13,6 +22,92 @@ import coolpi.colour.colour_space_conversion as csc
 # https://www.wiley.com/en-us/Colorimetry%3A+Fundamentals+and+Applications-p-9780470094723
 
 
+def _polyval(coefficients, t):
+    # Horner evaluation, highest degree first (as np.polyval, without its per-call overhead on scalars)
+    result = coefficients[0]
+    for k in coefficients[1:]:
+        result = result*t + k
+    return result
+
+def _where(condition, value_true, value_false):
+    # np.where for arrays, plain branch for a single colour
+    if isinstance(condition, np.ndarray):
+        return np.where(condition, value_true, value_false)
+    return value_true if condition else value_false
+
+# Polynomial coefficients, highest degree first
+
+# Ohno, Yoshi. 2014. Practical Use and Calculation of CCT and Duv, LEUKOS, 10:1, 47-55
+_DUV_K = (-0.00616793, 0.0893944, -0.5179722, 1.5317403, -2.4243787, 1.925865, -0.471106)
+
+_OHNO_K = (
+    (-3.7146e-3, 5.60614e-2, -3.307009e-1, 9.750013e-1, -1.5008606, 1.115559, -1.77348e-1),
+    (-3.23255e-5, 3.570016e-4, -1.589747e-3, 3.6196568e-3, -4.3534788e-3, 2.1595434e-3, 5.308409e-4),
+    (-2.6653835e-3, 4.17781315e-2, -2.73172022e-1, 9.53570888e-1, -1.873907584, 1.964980251, -8.58308927e-1),
+    (-2.352495e+1, 2.7183365e+2, -1.1785121e+3, 2.51170136e+3, -2.7966888e+3, 1.49284136e+3, -2.3275027e+2),
+    (-1.731364909e+6, 2.7482732935e+7, -1.81749963507e+8, 6.40976356945e+8, -1.27141290956e+9, 1.34488160614e+9, -5.926850606e+8),
+    (-9.4353083e+2, 2.10468274e+4, -1.9500061e+5, 9.60532935e+5, -2.65299138e+6, 3.89561742e+6, -2.3758158e+6),
+    (5.0857956e+2, -1.321007e+4, 1.4101538e+5, -7.93406005e+5, 2.48526954e+6, -4.11436958E+6, 2.8151771E+6))
+
+# Hernandez-Andres, J., Lee, R. L., & Romero, J. 1999. xe, ye, A0, ((Ai, 1/ti), ...)
+# CCT <= 50.000ºK (recalculate=False) and CCT > 50.000ºK (recalculate=True, A3 = 0: two terms)
+_HERNANDEZ_K = {
+    False: (0.3366, 0.1735, -949.86315, ((6253.80338, 1/0.92159), (28.70599, 1/0.20039), (0.00004, 1/0.07125))),
+    True: (0.3356, 0.1691, 36284.48953, ((0.00228, 1/0.07861), (5.4535e-36, 1/0.01543)))}
+
+# McCamy, C.S. 1992. Correlated color temperature as an explicit function of chromaticity coordinates
+_MCCAMY_K = (-449., 3525., -6823.3, 5520.33)
+
+def _compute_Ohno_a_terms(a):
+    # L_BB, T1 and the ATc1 coefficient (they only depend on the angle a). A single colour only
+    # evaluates its own a<2.54 / a>=2.54 branch
+    L_BB = _polyval(_OHNO_K[0], a)
+    if not isinstance(a, np.ndarray):
+        if a<2.54:
+            return L_BB, 1/_polyval(_OHNO_K[1], a), _polyval(_OHNO_K[3], a)
+        return L_BB, 1/_polyval(_OHNO_K[2], a), 1/_polyval(_OHNO_K[4], a)
+    low = a<2.54
+    return L_BB, 1/np.where(low, _polyval(_OHNO_K[1], a), _polyval(_OHNO_K[2], a)), np.where(low, _polyval(_OHNO_K[3], a), 1/_polyval(_OHNO_K[4], a))
+
+if NUMBA_AVAILABLE:
+    @njit("float64(UniTuple(float64, 7), float64)", cache=True)
+    def _polyval_7(coefficients, t):
+        result = coefficients[0]
+        for i in range(1, 7):
+            result = result*t + coefficients[i]
+        return result
+
+    @njit("float64(float64, float64)", cache=True)
+    def _xy_to_CCT_Ohno(x, y):
+        # same steps as xy_to_CCT_Ohno, for a single colour
+        inv_denominator = 1/(12*y-2*x+3)
+        u = 4*x*inv_denominator
+        v = 6*y*inv_denominator
+        L_FP = math.sqrt((u-0.292)**2 + (v-0.24)**2)
+        a = math.atan2(v-0.24, u-0.292)
+        if a<0:
+            a += math.pi
+        L_BB = _polyval_7(_OHNO_K[0], a)
+        if a<2.54:
+            T1 = 1/_polyval_7(_OHNO_K[1], a)
+            ATc1_k = _polyval_7(_OHNO_K[3], a)
+        else:
+            T1 = 1/_polyval_7(_OHNO_K[2], a)
+            ATc1_k = 1/_polyval_7(_OHNO_K[4], a)
+        Delta_uv = L_FP - L_BB
+        T2 = T1 - (ATc1_k*(L_BB+0.01)/L_FP)*(Delta_uv/0.01)
+        c = math.log(T2) # nan out of domain
+        if Delta_uv>=0:
+            return T2 - 1/_polyval_7(_OHNO_K[5], c)
+        return T2 - 1/_polyval_7(_OHNO_K[6], c)*(Delta_uv/0.03)**2
+
+    @njit("float64[::1](float64[::1], float64[::1])", parallel=True, cache=True)
+    def _xy_to_CCT_Ohno_array(x, y):
+        cct_K = np.empty(x.shape[0])
+        for i in prange(x.shape[0]):
+            cct_K[i] = _xy_to_CCT_Ohno(x[i], y[i])
+        return cct_K
+
 # Colour Space Conversion ---> Using CIE 1960 u,v chromaticity diagram
 
 def XYZ_to_uv_1960(X, Y, Z):
@@ -25,10 +120,17 @@ def XYZ_to_uv_1960(X, Y, Z):
     Ohta, N., and Robertson, A. 2005. Colorimetry: fundamentals and applications. John Wiley & Sons.
     https://www.wiley.com/en-us/Colorimetry%3A+Fundamentals+and+Applications-p-9780470094723
 
+    Parameters:
+        X, Y, Z        float    CIE XYZ tristimulus values (or arrays)
+    
+    Returns:
+        u, v           float    CIE 1960 uv chromaticity coordinates
+
     '''
 
-    u = 4*X/(X + 15*Y + 3*Z)
-    v = 6*Y/(X + 15*Y + 3*Z)
+    inv_denominator = 1/(X + 15*Y + 3*Z)
+    u = 4*X*inv_denominator
+    v = 6*Y*inv_denominator
     return u, v
 
 def uvY_1960_to_XYZ(u, v, Y):
@@ -45,13 +147,19 @@ def uvY_1960_to_XYZ(u, v, Y):
         
     '''
 
-    B = np.array([-15*u*Y, Y*(6-15*v)])
-    A = np.array([[u-4, 3*u], [v, 3*v]])
+    # A·[X,Z] = B, solved in closed form
+    B0, B1 = -15*u*Y, Y*(6-15*v)
+    a, b, c, d = u-4, 3*u, v, 3*v # A = [[a, b], [c, d]]
 
-    sol_equation = np.linalg.pinv(A).dot(B) if np.linalg.det(A)==0 else np.linalg.inv(A).dot(B)
-        
-    X = sol_equation[0]
-    Z = sol_equation[1]
+    det = a*d - b*c
+    if det != 0:
+        X = (d*B0 - b*B1)/det
+        Z = (a*B1 - c*B0)/det
+    else:
+        # singular A (v = 0): pseudo-inverse of the remaining row [a, b]
+        norm = a*a + b*b
+        X = a*B0/norm if norm else 0.
+        Z = b*B0/norm if norm else 0.
 
     return X, Y, Z
 
@@ -64,20 +172,34 @@ def xy_to_uv_1960(x,y):
     Eq.4.1. (pp.119)
     https://www.wiley.com/en-us/Colorimetry%3A+Fundamentals+and+Applications-p-9780470094723
 
+    Parameters:
+        x, y           float    CIE 1931 xy chromaticity coordinates (or arrays)
+    
+    Returns:
+        u, v           float    CIE 1960 uv chromaticity coordinates
+
     '''
 
-    u = 4*x/(12*y-2*x+3)
-    v = 6*y/(12*y-2*x+3)
+    inv_denominator = 1/(12*y-2*x+3)
+    u = 4*x*inv_denominator
+    v = 6*y*inv_denominator
     return u,v
 
 def uv_1960_to_xy(u,v):
     '''
     Funtion to transform CIE 1960 u,v chromaticity coordinates to CIE 1931 x,y chromaticity coordinates
+
+    Parameters:
+        u, v           float    CIE 1960 uv chromaticity coordinates (or arrays)
+    
+    Returns:
+        x, y           float    CIE 1931 xy chromaticity coordinates
     
     '''
     
-    x = 3*u/(2*u-8*v+4)
-    y = 2*v/(2*u-8*v+4)
+    inv_denominator = 1/(2*u-8*v+4)
+    x = 3*u*inv_denominator
+    y = 2*v*inv_denominator
     return x, y
 
 
@@ -91,17 +213,15 @@ def compute_Delta_uv(u,v):
     doi: 10.1080/15502724.2014.839020
 
     Parameters:    
-        u, v          float     u', v' coordinates
+        u, v          float     u', v' coordinates (or arrays)
     Returns:       
         Delta_uv      float     Duv 
 
     '''
 
-    k6, k5, k4, k3, k2, k1, k0 = -0.00616793, 0.0893944, -0.5179722, 1.5317403, -2.4243787, 1.925865, -0.471106
-    
-    L_FP = np.sqrt(math.pow((u-0.292),2) + math.pow((v-0.24), 2))
+    L_FP = np.sqrt((u-0.292)**2 + (v-0.24)**2)
     a = np.arccos((u-0.292)/L_FP)
-    L_BB = k6*math.pow(a, 6) + k5*math.pow(a, 5) + k4*math.pow(a, 4) + k3*math.pow(a, 3) + k2*math.pow(a, 2) + k1*a + k0 
+    L_BB = _polyval(_DUV_K, a)
     Delta_uv = L_FP - L_BB
     return Delta_uv 
 
@@ -121,7 +241,7 @@ def xy_to_CCT_McCamy(x,y):
     coordinates (Erratum), Color Res. Appl. 18, 150.
     
     Parameters:    
-        x,y           float     x,y chromaticity coordinates of illuminant
+        x,y           float     x,y chromaticity coordinates of illuminant (or arrays)
     Returns:       
         cct           float     CCT (º K)
     
@@ -132,7 +252,7 @@ def xy_to_CCT_McCamy(x,y):
     ye = 0.1858
     n = (x-xe)/(y-ye)
     # McCamy equation
-    cct = -449*(math.pow(n, 3)) + 3525*(math.pow(n, 2)) - 6823.3*n + 5520.33
+    cct = _polyval(_MCCAMY_K, n)
 
     return cct
 
@@ -145,7 +265,7 @@ def apply_Hernandez_exponential_equation(x, y, recalculate=False):
     https://opg.optica.org/ao/abstract.cfm?uri=ao-38-27-5703
 
     Parameters:    
-        x,y           float     x,y chromaticity coordinates of illuminant
+        x,y           float     x,y chromaticity coordinates of illuminant (or arrays)
         recalculate   Bool      If False, the use the parameters for the assumption CCT <= 50.000ºK. 
                                 If True, recalculate for CCT>50.000ºK.
                                 Default, False
@@ -154,13 +274,12 @@ def apply_Hernandez_exponential_equation(x, y, recalculate=False):
 
     '''
 
-    if recalculate:
-        xe, ye, A0, A1, t1, A2, t2, A3, t3 = 0.3356, 0.1691, 36284.48953, 0.00228, 0.07861, 5.4535e-36, 0.01543, 0, 0
-    else:
-        xe, ye, A0, A1, t1, A2, t2, A3, t3 = 0.3366, 0.1735, -949.86315, 6253.80338, 0.92159, 28.70599, 0.20039, 0.00004, 0.07125
+    xe, ye, A0, terms = _HERNANDEZ_K[recalculate]
 
     n = (x-xe)/(y-ye)
-    cct = A0 + A1*np.exp(-n/t1) + A2*np.exp(-n/t2) + A3*np.exp(-n/t3)
+    cct = A0
+    for Ai, inv_ti in terms:
+        cct = cct + Ai*np.exp(-n*inv_ti)
     return cct
 
 def xy_to_CCT_Hernandez(x,y):
@@ -173,7 +292,7 @@ def xy_to_CCT_Hernandez(x,y):
     https://opg.optica.org/ao/abstract.cfm?uri=ao-38-27-5703
 
     Parameters:    
-        x,y           float x,y chromaticity coordinates of illuminant
+        x,y           float x,y chromaticity coordinates of illuminant (or arrays)
     Returns:       
         cct           float CCT (º K)
     
@@ -181,7 +300,13 @@ def xy_to_CCT_Hernandez(x,y):
     
     # Assumption that CCT <= 50.000ºK    
     cct = apply_Hernandez_exponential_equation(x, y)   
-    # Recalculate if CCT>50.000ºK
+    # Recalculate if CCT>50.000ºK (only those colours, for arrays)
+    if isinstance(cct, np.ndarray):
+        high = cct>50000
+        if high.any():
+            x, y = np.broadcast_arrays(x, y)
+            cct[high] = apply_Hernandez_exponential_equation(x[high], y[high], recalculate=True)
+        return cct
     cct = apply_Hernandez_exponential_equation(x, y, recalculate =True) if cct>50000 else cct
 
     return cct
@@ -197,48 +322,42 @@ def xy_to_CCT_Ohno(x, y):
     https://www.tandfonline.com/doi/abs/10.1080/15502724.2014.839020
     
     Parameters:    
-        x, y          float     x,y chromaticity coordinates of illuminant
+        x, y          float     x,y chromaticity coordinates of illuminant (or arrays)
     Returns:       
         cct           float     CCT (º K)
     
     ''' 
+
+    if NUMBA_AVAILABLE:
+        if isinstance(x, np.ndarray) or isinstance(y, np.ndarray):
+            x, y = np.broadcast_arrays(np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64))
+            cct_K = _xy_to_CCT_Ohno_array(np.ascontiguousarray(x).ravel(), np.ascontiguousarray(y).ravel())
+            return cct_K.reshape(x.shape)
+        cct_K = _xy_to_CCT_Ohno(x, y)
+        if math.isnan(cct_K) and not math.isnan(x + y):
+            raise ValueError("math domain error")
+        return cct_K
     
     u, v = xy_to_uv_1960(x,y)
     
-    L_FP = np.sqrt(math.pow((u-0.292),2) + math.pow((v-0.24), 2))
-    a1 = np.arctan((v-0.24)/(u-0.292))
-    a = a1 if a1>=0 else (a1 + np.pi)
+    L_FP = np.sqrt((u-0.292)**2 + (v-0.24)**2)
+    # angle from (0.292, 0.24), in [0, π)
+    a1 = np.arctan2(v-0.24, u-0.292) if isinstance(u, np.ndarray) else math.atan2(v-0.24, u-0.292)
+    a = _where(a1>=0, a1, a1 + np.pi)
 
-    k06, k05, k04, k03, k02, k01, k00 = -3.7146e-3, 5.60614e-2, -3.307009e-1, 9.750013e-1, -1.5008606, 1.115559, -1.77348e-1
-    k16, k15, k14, k13, k12, k11, k10 = -3.23255e-5, 3.570016e-4, -1.589747e-3, 3.6196568e-3, -4.3534788e-3, 2.1595434e-3, 5.308409e-4
-    k26, k25, k24, k23, k22, k21, k20 = -2.6653835e-3, 4.17781315e-2, -2.73172022e-1, 9.53570888e-1, -1.873907584, 1.964980251, -8.58308927e-1
-    k36, k35, k34, k33, k32, k31, k30 = -2.352495e+1, 2.7183365e+2, -1.1785121e+3, 2.51170136e+3, -2.7966888e+3, 1.49284136e+3, -2.3275027e+2
-    k46, k45, k44, k43, k42, k41, k40 = -1.731364909e+6, 2.7482732935e+7, -1.81749963507e+8, 6.40976356945e+8, -1.27141290956e+9, 1.34488160614e+9, -5.926850606e+8
-    k56, k55, k54, k53, k52, k51, k50 = -9.4353083e+2, 2.10468274e+4, -1.9500061e+5, 9.60532935e+5, -2.65299138e+6, 3.89561742e+6, -2.3758158e+6
-    k66, k65, k64, k63, k62, k61, k60 = 5.0857956e+2, -1.321007e+4, 1.4101538e+5, -7.93406005e+5, 2.48526954e+6, -4.11436958E+6, 2.8151771E+6
+    L_BB, T1, ATc1_k = _compute_Ohno_a_terms(a)
+    Delta_uv = L_FP - L_BB # correct
 
-    L_BB = k06*math.pow(a, 6) + k05*math.pow(a, 5) + k04*math.pow(a, 4) + k03*math.pow(a, 3) + k02*math.pow(a, 2) + k01*a + k00
-    Delta_uv = L_FP - L_BB # correct
-    
-    if a<2.54:
-        T1 = 1/(k16*math.pow(a, 6) + k15*math.pow(a, 5) + k14*math.pow(a, 4) + k13*math.pow(a, 3) + k12*math.pow(a, 2) + k11*a + k10)
-        ATc1 = ((k36*math.pow(a, 6) + k35*math.pow(a, 5) + k34*math.pow(a, 4) + k33*math.pow(a, 3) + k32*math.pow(a, 2) + k31*a + k30)*(L_BB+0.01)/L_FP)*(Delta_uv/0.01) 
-    
-    elif a>=2.54:
-        T1 = 1/(k26*math.pow(a, 6) + k25*math.pow(a, 5) + k24*math.pow(a, 4) + k23*math.pow(a, 3) + k22*math.pow(a, 2) + k21*a + k20)
-        ATc1 = ((1/(k46*math.pow(a, 6) + k45*math.pow(a, 5) + k44*math.pow(a, 4) + k43*math.pow(a, 3) + k42*math.pow(a, 2) + k41*a + k40))*(L_BB+0.01)/L_FP)*(Delta_uv/0.01) 
+    ATc1 = (ATc1_k*(L_BB+0.01)/L_FP)*(Delta_uv/0.01)
     
     T2 = T1 - ATc1
 
-    c = math.log(T2)
+    c = np.log(T2) if isinstance(T2, np.ndarray) else math.log(T2) # math.log raises for a single colour out of domain
 
-    # I have changed the formula where I think there is mistake. Inverse (1/)
-    if Delta_uv>=0:
-        #ATc2 = (k56*math.pow(c, 6) + k55*math.pow(c, 5) + k54*math.pow(c, 4) + k53*math.pow(c, 3) + k52*math.pow(c, 2) + k51*c + k50) # original
-        ATc2 = 1/(k56*math.pow(c, 6) + k55*math.pow(c, 5) + k54*math.pow(c, 4) + k53*math.pow(c, 3) + k52*math.pow(c, 2) + k51*c + k50)
-    elif Delta_uv<0:
-        #ATc2 = (k66*math.pow(c, 6) + k65*math.pow(c, 5) + k64*math.pow(c, 4) + k63*math.pow(c, 3) + k62*math.pow(c, 2) + k61*c + k60)*math.pow((Delta_uv/0.03), 2) #original
-        ATc2 = 1/(k66*math.pow(c, 6) + k65*math.pow(c, 5) + k64*math.pow(c, 4) + k63*math.pow(c, 3) + k62*math.pow(c, 2) + k61*c + k60)*math.pow(Delta_uv/0.03, 2)
+    # I have changed the formula where I think there is mistake. Inverse (1/)
+    # Delta_uv>=0: ATc2 = (k56*c^6 + ... + k50) # original
+    # Delta_uv<0: ATc2 = (k66*c^6 + ... + k60)*(Delta_uv/0.03)^2 # original
+    ATc2 = _where(Delta_uv>=0, 1/_polyval(_OHNO_K[5], c), 1/_polyval(_OHNO_K[6], c)*(Delta_uv/0.03)**2)
 
     cct_K = T2 - ATc2
 
@@ -332,7 +451,7 @@ def compute_xy_from_CCT_cubic_spline_Kim(cct_k):
 
 # Ohno CCT, Duv --> xy
 
-# the results are no accurate, search for a better algorithm
+# not accurate (author's note), compute_xy_from_CCT_and_Duv_Ohno uses the tabulated Planckian locus
 def compute_uv_from_CCT_Krystek(cct_k):
 
     '''
@@ -347,28 +466,67 @@ def compute_uv_from_CCT_Krystek(cct_k):
     v = (0.317398726 + 4.22806245e-5*cct_k + 4.20481691e-8*math.pow(cct_k, 2))/(1 - 2.89741816e-5*cct_k + 1.61456053e-7*math.pow(cct_k, 2))
     return u, v
 
+_PLANCKIAN_CCT_GRID = (1000, 25000, 8192) # start, stop (º K), number of samples
 
-def compute_xy_from_CCT_and_Duv_Ohno(cct_k, Delta_uv, DT = 0.01):
+@lru_cache(maxsize=1)
+def _compute_Planckian_locus_uv():
     '''
-    
+    Function to tabulate the CIE 1960 uv coordinates of the Planckian radiator (CIE 1931 2º observer)
+    and their derivatives with respect to the CCT. Computed once, on first use
 
-    Steps:
-    - Calculate u0, v0 of the Plackian radiator at CCT
-    - Calculate u1, v1 of the Plackian radiator at CCT + AT = 0.01 ºK
+    Planck's law with c2 = 1.4388e-2 m·K (c1 cancels out in u,v)
+
+    Returns:       
+        locus         np.array  (4, N) u, v, du/dCCT, dv/dCCT of the Planckian radiator on the
+                                geometric CCT grid _PLANCKIAN_CCT_GRID
+
+    '''
+
+    x_cmf, y_cmf, z_cmf, nm_range, nm_interval = ld.load_cie_cmf_arrays(2)
+    wavelength = np.arange(nm_range[0], nm_range[1] + nm_interval, nm_interval)*1e-9 # m
 
+    cct_grid = np.geomspace(*_PLANCKIAN_CCT_GRID)
+    spd = 1/(wavelength**5*np.expm1(1.4388e-2/np.outer(cct_grid, wavelength)))
+
+    u, v = XYZ_to_uv_1960(spd @ x_cmf, spd @ y_cmf, spd @ z_cmf)
+    locus = np.stack([u, v, np.gradient(u, cct_grid), np.gradient(v, cct_grid)])
+    locus.setflags(write=False)
+    return locus
+
+def compute_xy_from_CCT_and_Duv_Ohno(cct_k, Delta_uv):
+    '''
+    Function to compute the x,y chromaticity coordinates from CCT and Duv
+
+    Steps:
+    - Interpolate u0, v0 of the Plackian radiator at CCT (tabulated locus, 1000-25000 ºK)
+    - Move Duv along the normal to the locus (Duv>0 above the locus)
 
     Ohno, Yoshi. 2014. Practical Use and Calculation of CCT and Duv, LEUKOS, 10:1, 47-55, 
     doi: 10.1080/15502724.2014.839020
+
+    Parameters:    
+        cct_k         float     CCT (º K) (or array)
+        Delta_uv      float     Duv (or array)
+    Returns:       
+        x, y          float     x,y chromaticity coordinates
     
     '''
 
-    u0, v0 = compute_uv_from_CCT_Krystek(cct_k) # Ohno uses other, but I don't know what is
-    u1, v1 = compute_uv_from_CCT_Krystek((cct_k + DT))
-    du = u1 - u0
-    dv = v1 - v0
-
-    u = u0 + Delta_uv*dv/(np.sqrt(math.pow(du, 2) + math.pow(dv, 2)))
-    v = v0 + Delta_uv*du/(np.sqrt(math.pow(du, 2) + math.pow(dv, 2)))
+    cct_start, cct_stop, n = _PLANCKIAN_CCT_GRID
+    if np.any(np.less(cct_k, cct_start)) or np.any(np.greater(cct_k, cct_stop)):
+        raise CCTNotInValidRangeError("CCT out of range [1000-25000] ºK.")
+
+    # linear interpolation on the geometric grid (the sample index is a logarithm)
+    t = np.log(np.divide(cct_k, cct_start))*((n-1)/math.log(cct_stop/cct_start))
+    i = np.minimum(np.asarray(t, dtype=np.intp), n-2)
+    f = t - i
+    locus = _compute_Planckian_locus_uv()
+    u0, v0, du, dv = locus[:, i]*(1-f) + locus[:, i+1]*f
+    norm = np.sqrt(du*du + dv*dv)
+
+    # normal (dv, -du): u decreases with the CCT, so it points to higher v
+    u = u0 + Delta_uv*dv/norm
+    v = v0 - Delta_uv*du/norm
 
     u_ = u  # u', v' CIE 1976 colour space
     v_ = 1.5*v
@@ -1,9 +1,9 @@
 from abc import ABC
 from abc import abstractmethod
-from importlib import resources
-import json
+import warnings
 
 import numpy as np
+from scipy import sparse
 
 from coolpi.auxiliary.errors import CCTNotInValidRangeError, CIEIlluminantError, CIEObserverError, ClassTypeError, ColourError, ColourConversionError, ClassMethodError, DictLabelError, SpectralRangeError, FileExtensionError
 import coolpi.auxiliary.common_operations as cop
@@ -24,6 +24,7 @@ class CIE(ABC):
 
     '''
 
+    __slots__ = ()
     __type = "CIE Object"
 
     @property
@@ -43,23 +44,23 @@ class Spectral(ABC):
         type             str     "Spectral object".
         nm_range         list    lambda nm range [min, max].
         nm_interval      int     lambda nm interval.
-        lambda_values    list    spectral lambda values.
+        lambda_values    ndarray spectral lambda values.
 
     Methods:
         .as_diagonal_array()
+        .as_diagonal_operator()
         .get_visible_lambda_values(nm_range, nm_interval, lambda_values, visible_nm_range, visible_nm_interval)
         .set_into_visible_range_spectrum(visible_nm_range, visible_nm_interval)
         .get_lambda_values_interpolate(nm_range, nm_interval, lambda_values, new_nm_range, new_nm_interval, method)
+        .interpolate_lambda_values(new_nm_range, new_nm_interval, method)
         .set_lambda_values_interpolate(new_nm_range, new_nm_interval, method)
         .get_lambda_values_extrapolate(nm_range, nm_interval, lambda_values, new_nm_range, new_nm_interval, method)
         .set_lambda_values_extrapolate(new_nm_range, new_nm_interval, method)
 
     '''
 
+    __slots__ = ("__nm_range", "__nm_interval", "__lambda_values", "__interpolators") # interpolators: interpolants of the current data, by (range, interval, method)
     __type = "Spectral Object"
-    __nm_range = None 
-    __nm_interval = None
-    __lambda_values = None
         
     @property
     def type(self):
@@ -72,6 +73,7 @@ class Spectral(ABC):
     @nm_range.setter   
     def nm_range(self, nm_range):
         self.__nm_range = nm_range
+        self.__interpolators = {}
     
     @property
     def nm_interval(self):
@@ -84,6 +86,7 @@ class Spectral(ABC):
         except:
             raise ClassTypeError("The input lambda nm interval is not a valid type argument.")
         self.__nm_interval = nm_interval
+        self.__interpolators = {}
     
     @property
     def lambda_values(self):
@@ -91,7 +94,14 @@ class Spectral(ABC):
 
     @lambda_values.setter
     def lambda_values(self, lambda_values):
+        # stored once as a contiguous float64 array (own read-only copy: the interpolants are cached)
+        try:
+            lambda_values = np.array(lambda_values, dtype=np.float64)
+        except (TypeError, ValueError):
+            raise ClassTypeError("The input lambda values are not a valid type argument.")
+        lambda_values.flags.writeable = False
         self.__lambda_values = lambda_values
+        self.__interpolators = {}
 
     @abstractmethod
     def __init__(self):
@@ -102,6 +112,14 @@ class Spectral(ABC):
         self.nm_interval = nm_interval
         self.lambda_values = lambda_values
 
+    def _set_unchecked(self, nm_range, nm_interval, lambda_values):
+        # internal updates (data already computed from valid attributes): skip the setters validation
+        self.__nm_range = nm_range
+        self.__nm_interval = int(nm_interval)
+        self.__lambda_values = np.array(lambda_values, dtype=np.float64)
+        self.__lambda_values.flags.writeable = False
+        self.__interpolators = {}
+
     def as_diagonal_array(self):
         '''
         Method to get the spectral data as a numpy diagonal array.
@@ -113,6 +131,22 @@ class Spectral(ABC):
         as_diag = np.diag(self.lambda_values)
         return as_diag
 
+    def as_diagonal_operator(self):
+        '''
+        Method to get the spectral data as a sparse diagonal matrix (N values instead of the
+        N×N dense array).
+
+        For products with other spectra, multiplying the lambda values element-wise gives the 
+        same result without any matrix.
+
+        Returns:
+            as_diag   scipy.sparse.dia_matrix    spectral data as a sparse diagonal matrix.
+        
+        '''
+        lambda_values = np.asarray(self.lambda_values, dtype=np.float64)
+        as_diag = sparse.dia_matrix((lambda_values[None,:], [0]), shape=(lambda_values.shape[0], lambda_values.shape[0]))
+        return as_diag
+
     @staticmethod
     def get_visible_lambda_values(nm_range, nm_interval, lambda_values, visible_nm_range = [400,700], visible_nm_interval = 10):
         '''
@@ -152,10 +186,10 @@ class Spectral(ABC):
         if self.nm_range == visible_nm_range and self.nm_interval == visible_nm_interval:
             raise SpectralRangeError("The implemented spectral is already in the spectral visible range.")
         lambda_values_visible = self.get_visible_lambda_values(self.nm_range, self.nm_interval, self.lambda_values)
-        self.__update__(visible_nm_range, visible_nm_interval, lambda_values_visible)
+        self._set_unchecked(visible_nm_range, visible_nm_interval, lambda_values_visible)
 
     @staticmethod
-    def get_lambda_values_interpolate(nm_range, nm_interval, lambda_values, new_nm_range, new_nm_interval, method = "Akima"):
+    def get_lambda_values_interpolate(nm_range, nm_interval, lambda_values, new_nm_range, new_nm_interval, method = "Akima", interpolator = None):
         '''
         Static method to interpolate the spectral data into the new range and interval.
         
@@ -166,6 +200,7 @@ class Spectral(ABC):
             new_nm_range                 list    new lambda range in nm [max, min].
             new_nm_interval              int     new interval in nm.
             method                       str     Interpolation method. Default: “Akima”.
+            interpolator                 callable    Interpolant of the spectral data, if already built. Default: None.
         
         Returns:
             lambda_values_interpolate    list    Interpolated data.
@@ -173,12 +208,36 @@ class Spectral(ABC):
         '''
 
         wavelength_spd = lo.create_wavelength_space(nm_range[0], nm_range[1], nm_interval)
-        spd = np.array(lambda_values)
+        spd = np.asarray(lambda_values)
 
         wavelength_interpolate = lo.create_wavelength_space(new_nm_range[0], new_nm_range[1], new_nm_interval)
-        lambda_values_interpolate = lo.lambda_interpolation(wavelength_spd, spd , wavelength_interpolate, method)        
+        lambda_values_interpolate = lo.lambda_interpolation(wavelength_spd, spd , wavelength_interpolate, method, interpolator)        
         
         return lambda_values_interpolate
+
+    def interpolate_lambda_values(self, new_nm_range, new_nm_interval, method = "Akima"):
+        '''
+        Method to get the spectral data interpolated into the new range and interval, without
+        modifying the instance. The interpolant is built once per range, interval and method, and
+        reused until the spectral data are set again.
+
+        Parameters:
+            new_nm_range                 list    new lambda range in nm [max, min].
+            new_nm_interval              int     new interval in nm.
+            method                       str     Interpolation method. Default: “Akima”.
+        
+        Returns:
+            lambda_values_interpolate    list    Interpolated data.
+
+        '''
+
+        key = (tuple(self.nm_range), self.nm_interval, method)
+        interpolator = self.__interpolators.get(key)
+        if interpolator is None:
+            wavelength_spd = lo.create_wavelength_space(self.nm_range[0], self.nm_range[1], self.nm_interval)
+            interpolator = lo.create_interpolator(wavelength_spd, self.lambda_values, method)
+            self.__interpolators[key] = interpolator
+        return self.get_lambda_values_interpolate(self.nm_range, self.nm_interval, self.lambda_values, new_nm_range, new_nm_interval, method, interpolator)
     
     def set_lambda_values_interpolate(self, new_nm_range, new_nm_interval, method = "Akima"):
         '''
@@ -194,8 +253,8 @@ class Spectral(ABC):
         
         '''
 
-        lambda_values_interpolate = self.get_lambda_values_interpolate(self.nm_range, self.nm_interval, self.lambda_values, new_nm_range, new_nm_interval, method)
-        self.__update__(new_nm_range, new_nm_interval, lambda_values_interpolate)
+        lambda_values_interpolate = self.interpolate_lambda_values(new_nm_range, new_nm_interval, method)
+        self._set_unchecked(new_nm_range, new_nm_interval, lambda_values_interpolate)
 
     @staticmethod
     def get_lambda_values_extrapolate(nm_range, nm_interval, lambda_values, new_nm_range, new_nm_interval, method = "Spline"):
@@ -219,9 +278,9 @@ class Spectral(ABC):
 
         '''
 
-        print("!!!Alert Message to users: Extrapolation of measured data may cause errors and shold be used only if it can be demostrated that the resulting errors are insignificant for the porpoue of the user (CIE, 2018. pf.24, 7.2.3).")
+        warnings.warn("Extrapolation of measured data may cause errors and shold be used only if it can be demostrated that the resulting errors are insignificant for the porpoue of the user (CIE, 2018. pf.24, 7.2.3).", stacklevel=2)
         wavelength_spd = lo.create_wavelength_space(nm_range[0], nm_range[1], nm_interval)
-        spd = np.array(lambda_values)
+        spd = np.asarray(lambda_values)
 
         wavelength_extrapolate = lo.create_wavelength_space(new_nm_range[0], new_nm_range[1], new_nm_interval)
         lambda_values_extrapolate = lo.lambda_extrapolation(wavelength_spd, spd , wavelength_extrapolate, method)      
@@ -247,7 +306,7 @@ class Spectral(ABC):
         '''
 
         lambda_values_extrapolate = self.get_lambda_values_extrapolate(self.nm_range, self.nm_interval, self.lambda_values, new_nm_range, new_nm_interval, method)
-        self.__update__(new_nm_range, new_nm_interval, lambda_values_extrapolate)
+        self._set_unchecked(new_nm_range, new_nm_interval, lambda_values_extrapolate)
 
 class Observer(CIE):
     ''' 
@@ -266,8 +325,8 @@ class Observer(CIE):
         
     '''
     
+    __slots__ = ("__observer",)
     __subtype = "CIE Observer"
-    __observer = None
     
     @property
     def subtype(self):
@@ -319,12 +378,12 @@ class Component(CIE, Spectral):
         name_id          str     Description.
         nm_range         list    lambda nm range [min, max].
         nm_interval      int     lambda nm interval.
-        lambda_values    list    spectral lambda values.
+        lambda_values    ndarray spectral lambda values.
 
     '''
     
+    __slots__ = ("__name_id",) # name_id: Descriptor
     __subtype = "CIE Component"
-    __name_id = None # Descriptor
 
     @property
     def subtype(self):
@@ -368,16 +427,13 @@ class SComponents(CIE):
         .get_S_components()
         .get_S_components_lambda_values()
         .CCT_to_SPD(cct_K)
+        .CCT_to_SPD_batch(cct_K_array)
         .plot(show_figure, save_figure, output_path)
         
     '''
     
+    __slots__ = ("__nm_range", "__nm_interval", "__S0", "__S1", "__S2")
     __subtype = "CIE S Components"
-    __nm_range = None
-    __nm_interval = None
-    __S0 = None
-    __S1 = None
-    __S2 = None
     
     @property
     def subtype(self):
@@ -492,7 +548,7 @@ class SComponents(CIE):
         '''
 
         if 4000<cct_K<25000:
-            spd = lo.compute_SPD_from_CCT(cct_K, self.S0.lambda_values, self.S1.lambda_values, self.S2.lambda_values) # using CIE
+            spd = lo.compute_SPD_from_CCT(cct_K, self.S0.lambda_values, self.S1.lambda_values, self.S2.lambda_values) # using CIE
             return self.nm_range, self.nm_interval, spd
 
         # alternative method for CCT out of range
@@ -500,6 +556,31 @@ class SComponents(CIE):
         else:
             raise Exception(f"CCT {cct_K}ºK out of range: The valid range is 4000ºK -25000ºK.")
 
+    def CCT_to_SPD_batch(self, cct_K_array):
+        '''
+        Method to obtain the SPDs of several illuminants from their correlated colour temperatures 
+        in º Kelvin, in a single vectorised computation.
+        
+        CIE015:2018. 4.1.2 Other D illuminants. Eq. 4.7 to 4.11 (p. 12); Note 6 (p. 13).
+        https://cie.co.at/publications/colorimetry-4th-edition/
+
+        Parameters:
+            cct_K_array     array      CCTs (º Kelvin) into the range (4000-25000).
+        
+        Returns:
+            nm_range        list       Range for the spectral values.
+            nm_interval     int        Interval.
+            spd             ndarray    Computed SPDs, one row per CCT.
+            
+        '''
+
+        cct_K_array = np.asarray(cct_K_array, dtype=np.float64)
+        out_of_range = (cct_K_array<=4000) | (cct_K_array>=25000)
+        if np.any(out_of_range):
+            raise Exception(f"CCT {cct_K_array[out_of_range].ravel()[0]}ºK out of range: The valid range is 4000ºK -25000ºK.")
+        spd = lo.compute_SPD_from_CCT_array(cct_K_array, self.S0.lambda_values, self.S1.lambda_values, self.S2.lambda_values) # using CIE
+        return self.nm_range, self.nm_interval, spd
+
     def plot(self, show_figure = True, save_figure = False, output_path = None):
         '''
         Method to create and display the plot of the S0, S1 and S2 components using matplotlib.
@@ -516,6 +597,16 @@ class SComponents(CIE):
         return "CIE S0, S1 and S2 components"
 
 
+def _interpolate_components(components, new_nm_range, new_nm_interval, method):
+    # CMF components share their wavelength space: interpolate them with a single call
+    nm_range, nm_interval = components[0].nm_range, components[0].nm_interval
+    wavelength = lo.create_wavelength_space(nm_range[0], nm_range[1], nm_interval)
+    wavelength_interpolate = lo.create_wavelength_space(new_nm_range[0], new_nm_range[1], new_nm_interval)
+    lambda_values = np.array([component.lambda_values for component in components])
+    lambda_values_interpolate = lo.lambda_interpolation_components(wavelength, lambda_values, wavelength_interpolate, method)
+    for component, values in zip(components, lambda_values_interpolate):
+        component._set_unchecked(new_nm_range, new_nm_interval, values)
+
 class CMF(CIE): 
     ''' 
     CMF class.
@@ -549,13 +640,8 @@ class CMF(CIE):
         
     '''
 
+    __slots__ = ("__nm_range", "__nm_interval", "__observer", "__x_cmf", "__y_cmf", "__z_cmf")
     __subtype = "CIE colour-matching-functions"
-    __nm_range = None
-    __nm_interval = None
-    __observer = None
-    __x_cmf = None
-    __y_cmf = None
-    __z_cmf = None
 
     @property
     def subtype(self):
@@ -681,9 +767,7 @@ class CMF(CIE):
         
         '''
         
-        self.x_cmf.set_lambda_values_interpolate(new_nm_range, new_nm_interval, method)
-        self.y_cmf.set_lambda_values_interpolate(new_nm_range, new_nm_interval, method)
-        self.z_cmf.set_lambda_values_interpolate(new_nm_range, new_nm_interval, method)
+        _interpolate_components(self.get_colour_matching_functions(), new_nm_range, new_nm_interval, method)
         # update
         self.nm_range = new_nm_range
         self.nm_interval = new_nm_interval        
@@ -761,13 +845,8 @@ class CFB(CIE):
         
     '''
 
+    __slots__ = ("__nm_range", "__nm_interval", "__observer", "__xf_cmf", "__yf_cmf", "__zf_cmf")
     __subtype = "CIE cone-fundamental-based"
-    __nm_range = None
-    __nm_interval = None
-    __observer = None
-    __xf_cmf  = None
-    __yf_cmf  = None
-    __zf_cmf  = None
 
     @property
     def subtype(self):
@@ -891,9 +970,7 @@ class CFB(CIE):
             method             str     Interpolation method. Default: “Akima”.
         
         '''
-        self.xf_cmf.set_lambda_values_interpolate(new_nm_range, new_nm_interval, method)
-        self.yf_cmf.set_lambda_values_interpolate(new_nm_range, new_nm_interval, method)
-        self.zf_cmf.set_lambda_values_interpolate(new_nm_range, new_nm_interval, method)
+        _interpolate_components(self.get_colour_matching_functions(), new_nm_range, new_nm_interval, method)
         # update
         self.nm_range = new_nm_range
         self.nm_interval = new_nm_interval
@@ -971,13 +1048,8 @@ class RGBCMF(CIE):
         
     '''
 
+    __slots__ = ("__nm_range", "__nm_interval", "__observer", "__r_cmf", "__g_cmf", "__b_cmf")
     __subtype = "CIE RGB colour-matching-functions"
-    __nm_range = None
-    __nm_interval = None
-    __observer = None
-    __r_cmf = None
-    __g_cmf = None
-    __b_cmf = None
 
     @property
     def subtype(self):
@@ -1102,9 +1174,7 @@ class RGBCMF(CIE):
         
         '''
 
-        self.r_cmf.set_lambda_values_interpolate(new_nm_range, new_nm_interval, method)
-        self.g_cmf.set_lambda_values_interpolate(new_nm_range, new_nm_interval, method)
-        self.b_cmf.set_lambda_values_interpolate(new_nm_range, new_nm_interval, method)
+        _interpolate_components(self.get_colour_matching_functions(), new_nm_range, new_nm_interval, method)
         # update
         self.nm_range = new_nm_range
         self.nm_interval = new_nm_interval
@@ -2665,10 +2735,11 @@ class Illuminant(Spectral, CIE):
         normalised            bool         True for SPD normalised data.
         nm_range              list         lambda nm range [min, max].
         nm_interval           int          lambda nm interval.
-        lambda_values         list         SPD data.
+        lambda_values         ndarray      SPD data.
 
     Methods:
         .as_diagonal_array()
+        .as_diagonal_operator()
         .set_into_visible_range_spectrum(visible_nm_range, visible_nm_interval)
         .normalise_lambda_values()
         .get_theoretical_white_point_XYZ(observer)
@@ -2735,7 +2806,7 @@ class Illuminant(Spectral, CIE):
             raise CIEIlluminantError("The CIE illuminant implemented is already normalised.")
         
         spd = self.lambda_values
-        spd_normalised = list(lo.normalise_spectral_data(spd))
+        spd_normalised = lo.normalise_spectral_data(spd)
         self.lambda_values = spd_normalised
         self.normalised = True
     
@@ -2961,10 +3032,11 @@ class IlluminantFromCCT(Spectral):
         normalised            bool         True for SPD normalised data.
         nm_range              list         lambda nm range [min, max]
         nm_interval           int          lambda nm interval
-        lambda_values         list         SPD data
+        lambda_values         ndarray      SPD data
 
     Methods:
         .as_diagonal_array()
+        .as_diagonal_operator()
         .set_into_visible_range_spectrum(visible_nm_range, visible_nm_interval)
         .normalise_lambda_values()
         .compute_white_point_XYZ(observer)
@@ -3045,7 +3117,7 @@ class IlluminantFromCCT(Spectral):
             raise Exception("The CCT illuminant implemented is already normalised.")
         
         spd = self.lambda_values
-        spd_normalised = list(lo.normalise_spectral_data(spd))
+        spd_normalised = lo.normalise_spectral_data(spd)
         self.lambda_values = spd_normalised
         self.normalised = True
 
@@ -3201,6 +3273,7 @@ class MeasuredIlluminant(Spectral):
         illuminant_name       str          Illuminant name or description.
         data                  dict         Measured data as dict. Default: None.
                                            Required keys: nm_range, nm_interval, lambda_values .
+                              np.ndarray   Or preloaded SPD as (N,2) array: [nm, value] per row (fast path).
         path_file             os           CSV for Sekonic. JSON for any instrument. Default: None.
                                            Required keys: nm_range, nm_interval, lambda_values.
         metadata              dict         Instrument measurement information as dict. Default: {}.
@@ -3211,7 +3284,7 @@ class MeasuredIlluminant(Spectral):
         illuminant_name       str          Illuminant name.
         nm_range              list         lambda nm range [min, max].
         nm_interval           int          lambda nm interval.
-        lambda_values         list         SPD data.
+        lambda_values         ndarray      SPD data.
         normalised            bool         True for SPD normalised data.
         measured_data         dict         Illuminant data provided by the instrument.
         metadata              dict         Information about measurement conditions.
@@ -3219,6 +3292,7 @@ class MeasuredIlluminant(Spectral):
     Methods:
         .set_instrument_measurement_as_metadata(metadata)
         .as_diagonal_array()
+        .as_diagonal_operator()
         .set_into_visible_range_spectrum(visible_nm_range, visible_nm_interval)
         .normalise_lambda_values()
         .get_theoretical_white_point_XYZ(observer)
@@ -3295,6 +3369,15 @@ class MeasuredIlluminant(Spectral):
         else:
             raise DictLabelError("Error in the dict or file with measurement data: Incomplete data or wrong labels.")
 
+    def __update_from_array__(self, data_as_array):
+        # preloaded (N,2) array: [nm, value] (equally spaced wavelengths)
+        data_as_array = np.asarray(data_as_array, dtype=np.double)
+        nm_values, spd_lambda_values = data_as_array[:,0], data_as_array[:,1]
+        nm_range = [int(nm) if nm.is_integer() else nm for nm in (nm_values[0].item(), nm_values[-1].item())]
+        nm_interval = (nm_range[1]-nm_range[0])/(len(spd_lambda_values)-1)
+        self.measured_data = {"nm_range": nm_range, "nm_interval": nm_interval, "lambda_values": spd_lambda_values}
+        self.__update__(nm_range, nm_interval, spd_lambda_values)
+
     def __update_from_sekonic_csv__(self, path_csv_sekonic):
         self.measured_data = ld.load_metadata_sekonic_from_csv(path_csv_sekonic)
         nm_range = self.measured_data["nm_range"]
@@ -3306,7 +3389,9 @@ class MeasuredIlluminant(Spectral):
         self.illuminant_name = illuminant_name
         self.metadata = metadata
         # update
-        if data!= None:
+        if isinstance(data, np.ndarray):
+            self.__update_from_array__(data)
+        elif data!= None:
             self.__update_from_dict__(data)
         elif path_file!=None:
             # get extension
@@ -3332,7 +3417,7 @@ class MeasuredIlluminant(Spectral):
             raise Exception("The CCT illuminant implemented is already normalised.")
         
         spd = self.lambda_values
-        spd_normalised = list(lo.normalise_spectral_data(spd))
+        spd_normalised = lo.normalise_spectral_data(spd)
         self.lambda_values = spd_normalised
         self.normalised = True
 
@@ -3530,11 +3615,12 @@ class SpectralColour(Spectral, CIE):
         observer              Observer               CIE Observer
         nm_range              list                   lambda nm range [min, max]
         nm_interval           int                    lambda nm interval
-        lambda_values         list                   spectral data
+        lambda_values         ndarray                spectral data
         scaled                bool                   If True, spectral data in range (0,1)
 
     Methods:
         .as_diagonal_array()
+        .as_diagonal_operator()
         .scale_lambda_values()
         .to_XYZ(visible)
         .plot(show_figure, save_figure, output_path)
@@ -3612,8 +3698,7 @@ class SpectralColour(Spectral, CIE):
         
         '''
 
-        lambda_values = np.array(self.lambda_values)/100. # range [0,1]
-        self.lambda_values = list(lambda_values) # update
+        self.lambda_values = self.lambda_values/100. # range [0,1]
         self.scaled = True
 
     def to_XYZ(self, visible = False):
@@ -3719,12 +3804,13 @@ class Reflectance(Spectral):
         observer              Observer               CIE Observer
         nm_range              list                   lambda nm range [min, max]
         nm_interval           int                    lambda nm interval
-        lambda_values         list                   spectral data
+        lambda_values         ndarray                spectral data
         scaled                bool                   True for spectral data in range (0,1)
         metadata              dict                   Measurement details as dict
 
     Methods:
         .as_diagonal_array()
+        .as_diagonal_operator()
         .scale_lambda_values()
         .to_XYZ(visible)
         .plot(show_figure, save_figure, output_path)
@@ -3813,8 +3899,7 @@ class Reflectance(Spectral):
         For some practical computations
         
         '''
-        lambda_values = np.array(self.lambda_values)/100. # range [0,1]
-        self.lambda_values = list(lambda_values) # update
+        self.lambda_values = self.lambda_values/100. # range [0,1]
         self.scaled = True
     
     def to_XYZ(self, visible = False):     
@@ -3,6 +3,29 @@ import numpy as np
 
 import coolpi.colour.lambda_operations as lo
 
+try: # optional: JIT compiled kernels
+    from numba import njit, types
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+if NUMBA_AVAILABLE:
+    # spectral data usually come from the (read-only) lambda values
+    _READONLY_ARRAY = types.Array(types.float64, 1, "C", readonly=True)
+
+    @njit(types.UniTuple(types.float64, 4)(_READONLY_ARRAY, _READONLY_ARRAY, _READONLY_ARRAY, _READONLY_ARRAY, _READONLY_ARRAY), cache=True)
+    def _spectral_summations(reflectance, spd, x_cmf, y_cmf, z_cmf):
+        # same accumulation order as compute_k_value / compute_summation_integral
+        suma_k = 0.0
+        for i in range(spd.shape[0]):
+            suma_k += spd[i] * y_cmf[i]
+        suma_x, suma_y, suma_z = 0.0, 0.0, 0.0
+        for i in range(reflectance.shape[0]):
+            suma_x += reflectance[i] * spd[i] * x_cmf[i]
+            suma_y += reflectance[i] * spd[i] * y_cmf[i]
+            suma_z += reflectance[i] * spd[i] * z_cmf[i]
+        return suma_k, suma_x, suma_y, suma_z
+
 # CSC Colour space transform functions
 # -----------------------------------------------------------------------------------------------
 
@@ -620,11 +643,20 @@ def spectral_to_XYZ(reflectance, spd, x_cmf, y_cmf, z_cmf):
 
     reflectance = lo.scale_reflectance(reflectance) # some instruments [0,1] scale to [1-100]
     
-    k = compute_k_value(spd, y_cmf) # Eq. 7.3-7.4, pg. 22
+    if NUMBA_AVAILABLE:
+        arrays = [np.ascontiguousarray(values, dtype=np.float64) for values in (reflectance, spd, x_cmf, y_cmf, z_cmf)]
+        # the kernel does not check bounds: only for 1d data of the same length (otherwise, the loops below)
+        same_length = arrays[0].ndim == 1 and all(array.shape == arrays[0].shape for array in arrays)
+
+    if NUMBA_AVAILABLE and same_length:
+        suma_k, suma_x, suma_y, suma_z = _spectral_summations(*arrays)
+        k = 100/suma_k # Eq. 7.3-7.4, pg. 22
+    else:
+        k = compute_k_value(spd, y_cmf) # Eq. 7.3-7.4, pg. 22
 
-    suma_x = compute_summation_integral(reflectance, spd, x_cmf) # Eq. 7.1-7.2, pg. 21
-    suma_y = compute_summation_integral(reflectance, spd, y_cmf)
-    suma_z = compute_summation_integral(reflectance, spd, z_cmf)
+        suma_x = compute_summation_integral(reflectance, spd, x_cmf) # Eq. 7.1-7.2, pg. 21
+        suma_y = compute_summation_integral(reflectance, spd, y_cmf)
+        suma_z = compute_summation_integral(reflectance, spd, z_cmf)
 
     X = k * suma_x / 100
     Y = k * suma_y / 100
@@ -654,20 +686,19 @@ def spectral_to_XYZ_using_arrays(reflectance, spd, x_cmf, y_cmf, z_cmf):
         X, Y, Z                float    CIE XYZ tristimulus values
     '''
 
-    reflectance = lo.scale_reflectance(reflectance) # some instruments [0,1] scale to [1-100]
-    # as diagonal array
-    reflectance = np.diag(reflectance)
-    spd = np.diag(spd)
-    x_cmf = np.diag(x_cmf)
-    y_cmf = np.diag(y_cmf)
-    z_cmf = np.diag(z_cmf)
+    reflectance = np.asarray(lo.scale_reflectance(reflectance)) # some instruments [0,1] scale to [1-100]
+    # products of diagonal arrays as element-wise products (no N×N arrays)
+    spd = np.asarray(spd)
+    x_cmf = np.asarray(x_cmf)
+    y_cmf = np.asarray(y_cmf)
+    z_cmf = np.asarray(z_cmf)
 
-    k = 100/np.sum(np.dot(spd, y_cmf))
+    k = 100/np.sum(spd*y_cmf)
 
     # compute tristimulus values
-    X = k*np.sum(np.dot(reflectance, np.dot(spd, x_cmf)))/100
-    Y = k*np.sum(np.dot(reflectance, np.dot(spd, y_cmf)))/100
-    Z = k*np.sum(np.dot(reflectance, np.dot(spd, z_cmf)))/100
+    X = k*np.sum(reflectance*spd*x_cmf)/100
+    Y = k*np.sum(reflectance*spd*y_cmf)/100
+    Z = k*np.sum(reflectance*spd*z_cmf)/100
 
     return X, Y, Z
 
@@ -675,29 +706,15 @@ def spectral_to_XYZ_using_arrays(reflectance, spd, x_cmf, y_cmf, z_cmf):
 
 # refeclectance as nx31 array 
 def convert_image_spectral_data_to_XYZ(reflectance, spd, x_cmf, y_cmf, z_cmf):
-    # as diagonal array
-    spd = np.diag(spd)
-    x_cmf = np.diag(x_cmf)
-    y_cmf = np.diag(y_cmf)
-    z_cmf = np.diag(z_cmf)
-
-    k = 100/np.sum(np.dot(spd, y_cmf)) 
-
-    spd_x = np.dot(spd, x_cmf).reshape(x_cmf.shape[0],1) # avoid error
-    spd_y = np.dot(spd, y_cmf).reshape(y_cmf.shape[0],1)
-    spd_z = np.dot(spd, z_cmf).reshape(z_cmf.shape[0],1)
-
-    X_values = (k/100)*np.sum(np.dot(reflectance, spd_x), axis = 1)
-    Y_values = (k/100)*np.sum(np.dot(reflectance, spd_y), axis = 1)
-    Z_values = (k/100)*np.sum(np.dot(reflectance, spd_z), axis = 1)
+    # products of diagonal arrays as element-wise products (no N×N arrays)
+    spd = np.asarray(spd)
 
-    n_samples = reflectance.shape[0]
+    k = 100/np.sum(spd*np.asarray(y_cmf)) 
 
-    XYZ = np.zeros((n_samples, 3))
+    # one (n_samples, N)·(N, 3) product for X, Y, Z
+    spd_xyz = spd[:, None]*np.column_stack((x_cmf, y_cmf, z_cmf))
 
-    XYZ[:,0] = X_values
-    XYZ[:,1] = Y_values
-    XYZ[:,2] = Z_values
+    XYZ = (k/100)*np.dot(reflectance, spd_xyz)
 
     return XYZ
 
@@ -1,3 +1,4 @@
+from functools import lru_cache
 import math
 import numpy as np
 
@@ -7,6 +8,107 @@ from coolpi.auxiliary.errors import ExtrapolationError, InterpolationError
 import coolpi.colour.cct_operations as cct
 import coolpi.colour.colour_space_conversion as csc
 
+try: # optional: JIT compiled kernels
+    from numba import njit, types
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+if NUMBA_AVAILABLE:
+    # Same slopes and piecewise cubic evaluation as scipy Akima1DInterpolator / PchipInterpolator,
+    # without building the PPoly object on every call
+
+    @njit("float64[::1](float64[::1], float64[::1])", cache=True)
+    def _akima_derivatives(x, y):
+        n = x.shape[0]
+        t = np.empty(n)
+        if n == 2:
+            t[:] = (y[1]-y[0])/(x[1]-x[0])
+            return t
+        m = np.empty(n+3)
+        for i in range(n-1):
+            m[i+2] = (y[i+1]-y[i])/(x[i+1]-x[i])
+        # two additional points on each side
+        m[1] = 2.*m[2] - m[3]
+        m[0] = 2.*m[1] - m[2]
+        m[n+1] = 2.*m[n] - m[n-1]
+        m[n+2] = 2.*m[n+1] - m[n]
+        f12 = np.empty(n)
+        f12_max = -np.inf
+        for i in range(n):
+            f12[i] = abs(m[i+3]-m[i+2]) + abs(m[i+1]-m[i])
+            if f12[i] > f12_max or np.isnan(f12[i]):
+                f12_max = f12[i]
+        for i in range(n):
+            if f12[i] > 1.e-9*f12_max:
+                t[i] = m[i+1] + (abs(m[i+1]-m[i])/f12[i])*(m[i+2]-m[i+1])
+            else: # slope not defined at the breakpoint
+                t[i] = .5*(m[i+3] + m[i])
+        return t
+
+    @njit("float64(float64, float64, float64, float64)", cache=True)
+    def _pchip_edge_derivative(h0, h1, m0, m1):
+        d = ((2*h0 + h1)*m0 - h0*m1)/(h0 + h1)
+        if np.sign(d) != np.sign(m0):
+            return 0.
+        if np.sign(m0) != np.sign(m1) and abs(d) > 3.*abs(m0):
+            return 3.*m0
+        return d
+
+    @njit("float64[::1](float64[::1], float64[::1])", cache=True)
+    def _pchip_derivatives(x, y):
+        n = x.shape[0]
+        h = np.empty(n-1)
+        mk = np.empty(n-1)
+        for i in range(n-1):
+            h[i] = x[i+1] - x[i]
+            mk[i] = (y[i+1]-y[i])/h[i]
+        t = np.zeros(n)
+        if n == 2:
+            t[:] = mk[0]
+            return t
+        for k in range(1, n-1):
+            h0, h1, m0, m1 = h[k-1], h[k], mk[k-1], mk[k]
+            if np.sign(m1) != np.sign(m0) or m1 == 0 or m0 == 0:
+                continue
+            w1 = 2*h1 + h0
+            w2 = h1 + 2*h0
+            t[k] = 1.0/((w1/m0 + w2/m1)/(w1 + w2)) # weighted harmonic mean
+        t[0] = _pchip_edge_derivative(h[0], h[1], mk[0], mk[1])
+        t[n-1] = _pchip_edge_derivative(h[n-2], h[n-3], mk[n-2], mk[n-3])
+        return t
+
+    @njit("float64[::1](float64[::1], float64[::1], float64[::1], float64[::1])", cache=True)
+    def _evaluate_cubic_hermite(x, y, t, xn):
+        n = x.shape[0]
+        yn = np.empty(xn.shape[0])
+        for j in range(xn.shape[0]):
+            xv = xn[j]
+            if not (x[0] <= xv <= x[n-1]): # no extrapolation
+                yn[j] = np.nan
+                continue
+            i = min(np.searchsorted(x, xv, side="right") - 1, n-2)
+            dx = x[i+1] - x[i]
+            slope = (y[i+1]-y[i])/dx
+            c = (t[i] + t[i+1] - 2*slope)/dx
+            s = xv - x[i]
+            z = s
+            value = y[i] + t[i]*z
+            z *= s
+            value += ((slope - t[i])/dx - c)*z
+            z *= s
+            value += (c/dx)*z
+            yn[j] = value
+        return yn
+
+    # SD = S0+M1*S1+M2*S2 in a single pass, written into out (S components: read-only lambda values)
+    _READONLY_ARRAY = types.Array(types.float64, 1, "C", readonly=True)
+
+    @njit(types.void(types.float64, types.float64, _READONLY_ARRAY, _READONLY_ARRAY, _READONLY_ARRAY, types.float64[::1]), cache=True)
+    def _spd_from_M_coefficients(M1, M2, S0, S1, S2, out):
+        for i in range(out.shape[0]):
+            out[i] = S0[i] + M1*S1[i] + M2*S2[i]
+
 # esta no me parece util con estos parametros
 def find_common_range(lista_range):
     
@@ -28,24 +130,25 @@ def range_is_valid(nm_range_original, nm_interval_original, nm_range_output, nm_
         return False
     return True
     
-def extract_nm_range(lambda_values, nm_range_original, nm_interval_original, nm_range_output, nm_interval_output):
+@lru_cache(maxsize=128)
+def _nm_range_slice(nm_range_original, nm_interval_original, nm_range_output, nm_interval_output):
+    # index slice of the output range into the original lambda values (computed once per pair of grids)
     ini = int((nm_range_output[0]-nm_range_original[0])/nm_interval_original)
     end = int((nm_range_original[1]-nm_range_output[1])/nm_interval_original)
     step = int(nm_interval_output/nm_interval_original)
-    if ini == 0:
-        if end == 0:
-            slice = lambda_values[:len(lambda_values):step]
-        else:
-            slice = lambda_values[:-end:step]
-    elif end == 0:
-        slice = lambda_values[ini:len(lambda_values):step]
-    else:
-        slice = lambda_values[ini:-end:step]
-    return slice
+    return slice(ini, -end if end != 0 else None, step)
 
+def extract_nm_range(lambda_values, nm_range_original, nm_interval_original, nm_range_output, nm_interval_output):
+    nm_slice = _nm_range_slice(tuple(nm_range_original), nm_interval_original, tuple(nm_range_output), nm_interval_output)
+    return lambda_values[nm_slice]
+
+@lru_cache(maxsize=256)
 def create_wavelength_space(nm_ini, nm_end, nm_interval):
+    # the same few grids are requested over and over: build each once, shared read-only
     num = ((nm_end-nm_ini)/nm_interval) + 1
-    return np.linspace(nm_ini, nm_end, int(num))
+    wavelength = np.linspace(nm_ini, nm_end, int(num))
+    wavelength.flags.writeable = False
+    return wavelength
 
 # for spd illuminant
 
@@ -90,11 +193,51 @@ def compute_SPD_from_CCT(cct_K, S0, S1, S2):
     xD, yD, M1, M2 = m_coefficients_cct(cct_K)
     #print("Chromaticity coordinates: ", xD, yD)
     #print("M coefficients: ", M1, M2)
-    spd = []        
-    for i in range(0,len(S0)):
-        S = S0[i] + M1*S1[i] + M2*S2[i]
-        spd.append(S)
+    if NUMBA_AVAILABLE:
+        S0, S1, S2 = (np.ascontiguousarray(S, dtype=np.float64) for S in (S0, S1, S2))
+        if S0.ndim == 1 and S0.shape == S1.shape == S2.shape:
+            spd = np.empty(S0.shape[0])
+            _spd_from_M_coefficients(float(M1), float(M2), S0, S1, S2, spd)
+            return spd.tolist()
+    spd = np.asarray(S0) + M1*np.asarray(S1) + M2*np.asarray(S2)
     #print("SPD: ", spd)    
+    return spd.tolist()
+
+def compute_SPD_from_CCT_array(cct_K_array, S0, S1, S2):
+    '''
+    Function to compute the SPDs of several CIE D illuminants at once (same steps as 
+    m_coefficients_cct and compute_SPD_from_CCT for each CCT)
+
+    CIE 015:2018. 4.1.2. Other D illuminants. Eq. 4.7 to 4.11 (pp.12-13)
+
+    Parameters:
+        cct_K_array     array    CCTs in ºK, into the range (4000, 25000)
+        S0, S1, S2      list     S components
+
+    Returns:
+        spd             array    (number of CCTs, number of lambda values) SPDs, one per row
+
+    '''
+
+    cct_K_array = np.asarray(cct_K_array, dtype=np.float64).ravel()
+
+    # cct.compute_xy_from_CCT_CIE_D_illuminants: integer CCT, corrected for the D illuminants (c2 = 1.4388e-2)
+    ratio = np.where(np.isin(cct_K_array, (5000, 5500, 6500, 7500)), 1.4388/1.4380, 1.)
+    cct_K = np.trunc(cct_K_array)*ratio
+    if np.any((cct_K<=4000) | (cct_K>=25000)):
+        raise Exception("CTT not in valid range 4000-25000 ºK. Please use the m coefficients interpolation function")
+
+    xD = np.where(cct_K<=7000,
+                  -4.6070e9/cct_K**3 + 2.9678e6/cct_K**2 + 0.09911e3/cct_K + 0.244063,
+                  -2.0064e9/cct_K**3 + 1.9018e6/cct_K**2 + 0.24748e3/cct_K + 0.237040)
+    yD = -3.000*xD**2 + 2.870*xD - 0.275
+
+    # M coefficients
+    M1 = (-1.3515-1.7703*xD+5.9114*yD)/(0.0241+0.2562*xD-0.7341*yD)
+    M2 = (0.0300 -31.4424*xD+30.0717*yD)/(0.0241+0.2562*xD-0.7341*yD)
+
+    # SD = S0+M1*S1+M2*S2 for every CCT
+    spd = np.asarray(S0)[None,:] + np.outer(M1, S1) + np.outer(M2, S2)
     return spd
 
 # does not work. search for an alternative method
@@ -203,35 +346,38 @@ def sprague_interpolation(x, y, xn):
     return y_inter
 
 
-def lambda_interpolation(x, y, xn, method = "Akima"):
+def create_interpolator(x, y, method = "Akima"):
     '''
-    Function to interpolate the spectral data (illuminant / reflectance)
+    Function to build the interpolant of the spectral data (illuminant / reflectance), so it can
+    be evaluated on several wavelength spaces
 
     Parameters:
         x           wavelengh linspace with original interval
         y           values
-        xn          wavelengh linspace with new interval
         method      str: Linear, Spline, CubicHermite, Fifth, Sprague. Default "Akima"
 
     Returns:
-        yn          list    values interpolated 
+        f           callable    f(xn) returns the values interpolated at xn
 
     '''
 
-    implemented_methods = ["Linear", "Spline", "CubicHermite", "Fifth", "Sprague", "Akima"]
-
-    if method not in implemented_methods:        
-        raise InterpolationError("Interpolation method not implemented")
-
-    if x[0]!=xn[0] or x[-1]!=xn[-1]:
-        raise InterpolationError("The methods implemented are for iterpolate data nor for extrapolation")
-
     if method == "Sprague": # Method recommended by the CIE (CIE 2018, pg.25)
                             # CIE, 2005. Recommended practice for tabulating spectral data for use in colour computations.
                             # However, this method produce peaks at the edges. Spline interpolation gives better results, and fits better.
             
-        yn = sprague_interpolation(x, y, xn)
-        return yn
+        return lambda xn: sprague_interpolation(x, y, xn)
+
+    if NUMBA_AVAILABLE and method in ("CubicHermite", "Akima"):
+        # writable copies: the kernels signatures do not take the cached (read-only) wavelength spaces
+        x_array = np.array(x, dtype=np.float64)
+        y_array = np.array(y, dtype=np.float64)
+        if x_array.ndim == 1 and x_array.shape == y_array.shape and x_array.shape[0] > 1 and np.all(x_array[1:] > x_array[:-1]):
+            t = _akima_derivatives(x_array, y_array) if method == "Akima" else _pchip_derivatives(x_array, y_array)
+            def f(xn):
+                xn = np.array(xn, dtype=np.float64)
+                return _evaluate_cubic_hermite(x_array, y_array, t, xn.reshape(-1)).reshape(xn.shape)
+            return f
+        # anything else (e.g. not sorted wavelengths) is left to scipy, which also reports it
 
     if method == "Linear":
         f = interpolate.interp1d(x, y, kind='linear')
@@ -256,12 +402,81 @@ def lambda_interpolation(x, y, xn, method = "Akima"):
         '''
 
         f = interpolate.Akima1DInterpolator(x, y)
+
+    else:
+        raise InterpolationError("Interpolation method not implemented")
+
+    return f
+
+def lambda_interpolation(x, y, xn, method = "Akima", interpolator = None):
+    '''
+    Function to interpolate the spectral data (illuminant / reflectance)
+
+    Parameters:
+        x             wavelengh linspace with original interval
+        y             values
+        xn            wavelengh linspace with new interval
+        method        str: Linear, Spline, CubicHermite, Fifth, Sprague. Default "Akima"
+        interpolator  callable: interpolant of x, y already built with create_interpolator. Default None
+
+    Returns:
+        yn          list    values interpolated 
+
+    '''
+
+    implemented_methods = ["Linear", "Spline", "CubicHermite", "Fifth", "Sprague", "Akima"]
+
+    if method not in implemented_methods:        
+        raise InterpolationError("Interpolation method not implemented")
+
+    if x[0]!=xn[0] or x[-1]!=xn[-1]:
+        raise InterpolationError("The methods implemented are for iterpolate data nor for extrapolation")
+
+    f = interpolator if interpolator is not None else create_interpolator(x, y, method)
     
     yn = f(xn)
 
+    if method == "Sprague":
+        return yn
+
     return list(yn) # not numpy
 
 
+def lambda_interpolation_components(x, ys, xn, method = "Akima"):
+    '''
+    Function to interpolate several spectral data sampled on the same wavelength space at once
+    (e.g. the x, y, z CMFs)
+
+    Parameters:
+        x           wavelengh linspace with original interval
+        ys          array (n, N), one row per spectral data
+        xn          wavelengh linspace with new interval
+        method      str: Linear, Spline, CubicHermite, Fifth, Sprague. Default "Akima"
+
+    Returns:
+        yns         list    list of values interpolated, one per row of ys 
+
+    '''
+
+    ys = np.asarray(ys)
+
+    # the scipy univariate splines and the Sprague method only work row by row (and so do the
+    # compiled Akima / CubicHermite kernels)
+    if method not in ("Linear", "CubicHermite", "Akima") or (NUMBA_AVAILABLE and method != "Linear"):
+        return [lambda_interpolation(x, y, xn, method) for y in ys]
+
+    if x[0]!=xn[0] or x[-1]!=xn[-1]:
+        raise InterpolationError("The methods implemented are for iterpolate data nor for extrapolation")
+
+    if method == "Linear":
+        f = interpolate.interp1d(x, ys, kind='linear', axis=1)
+    elif method == "CubicHermite":
+        f = interpolate.PchipInterpolator(x, ys, axis=1)
+    else:
+        f = interpolate.Akima1DInterpolator(x, ys, axis=1)
+
+    return [list(yn) for yn in f(xn)] # not numpy
+
 # SEARCH FOR BETTER ALGORIMTHS
 
 # be careful with the method used for extrapolation data, maybe provide incoherent result
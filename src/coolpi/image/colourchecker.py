@@ -1,7 +1,5 @@
 from abc import ABC
 from abc import abstractmethod
-from importlib import resources
-import json
 
 import numpy as np
 import pandas as pd
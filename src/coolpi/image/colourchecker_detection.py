@@ -124,16 +124,19 @@ def draw_border(img, M, corners, colour = (0,0,255), thickness = 3, show_image=F
         plt.show()
         plt.close()
 
-def colourchecker_patch_detection(rgb_array, opencv_descriptor = "SIFT", checker_name = "XRCCPP_24", show_image=False):
-    coolpi_dir = get_abs_path_coolpi()
-    valid_colour_checker = ["CCC", "CCDSG", "CCPP2_24", "CCPP2_26", "CCPPV_24", "CCPPV_3", "SCK100_48", "XRCCPP_24", "XRCCPP_26"]
-    valid_opencv_descriptor = ["SIFT", "SURF", "ORB"]
+def get_colourchecker_template(checker_name):
+    '''
+    Function to get the reference image and corners of a colour checker template
 
-    if checker_name not in valid_colour_checker:
-        raise ColourCheckerError("Colour checker not implemented")
-    if opencv_descriptor not in valid_opencv_descriptor:
-        raise ClassMethodError("OpenCv descriptor not implemented")
+    Parameter:
+        checker_name      str     Colour checker name
+
+    Returns:
+        path_checker      os      Path to the reference image of the colour checker
+        corners           dict    Corner coordinates in the reference image
 
+    '''
+    coolpi_dir = get_abs_path_coolpi()
     if checker_name == "CCC":
         path_checker = os.path.join(coolpi_dir, *["data", "colourchecker", "img", "CCC.jpg"])
         corners = {"TopLeft":[22.41,37.19], "TopRight":[936.35,36.11], "BottomRight":[936.93,634.95], "BottomLeft":[22.09,633.28]}
@@ -161,15 +164,56 @@ def colourchecker_patch_detection(rgb_array, opencv_descriptor = "SIFT", checker
     elif checker_name == "XRCCPP_26":
         path_checker = os.path.join(coolpi_dir, *["data", "colourchecker", "img", "XRCCPP.jpg"])
         corners = {"TopLeft":[124.19, 1056.03], "TopRight":[129.88, 124.85], "BottomRight":[634.35,125.85], "BottomLeft":[634.55,1058.24]} 
-        
     else:
-        return None
-    
+        return None, None
+    return path_checker, corners
+
+def check_colourchecker_detection_options(checker_name, opencv_descriptor):
+    valid_colour_checker = ["CCC", "CCDSG", "CCPP2_24", "CCPP2_26", "CCPPV_24", "CCPPV_3", "SCK100_48", "XRCCPP_24", "XRCCPP_26"]
+    valid_opencv_descriptor = ["SIFT", "SURF", "ORB"]
+
+    if checker_name not in valid_colour_checker:
+        raise ColourCheckerError("Colour checker not implemented")
+    if opencv_descriptor not in valid_opencv_descriptor:
+        raise ClassMethodError("OpenCv descriptor not implemented")
+
+def build_checker_descriptors(checker_name, opencv_descriptor = "SIFT"):
+    '''
+    Function to compute the keypoints and descriptors of the colour checker template image
+
+    The template is the same for every image, so the result can be computed once and reused
+    for the detection of the colour checker in several images.
+
+    Parameters:
+        checker_name         str       Colour checker name
+        opencv_descriptor    str       OpenCV descriptor. Default: "SIFT"
+
+    Returns:
+        kp                   tuple     Keypoints of the template
+        des                  np.array  Descriptors of the template
+
+    '''
+    check_colourchecker_detection_options(checker_name, opencv_descriptor)
+    path_checker, _ = get_colourchecker_template(checker_name)
     checker_bgr_img = cv2.imread(path_checker, -1) # bgr
+    algorithm = cv2.SIFT_create()
+    kp, des = algorithm.detectAndCompute(checker_bgr_img, None)
+    return kp, des
+
+def colourchecker_patch_detection(rgb_array, opencv_descriptor = "SIFT", checker_name = "XRCCPP_24", show_image=False, template_descriptors=None):
+    check_colourchecker_detection_options(checker_name, opencv_descriptor)
+    path_checker, corners = get_colourchecker_template(checker_name)
+    if corners is None:
+        return None
+
+    # template keypoints and descriptors (computed if not provided)
+    kp1, des1 = build_checker_descriptors(checker_name, opencv_descriptor) if template_descriptors is None else template_descriptors
+
     r,g,b = np.dsplit(rgb_array, 3) # rwo.split_img_channels(rgb_array)
     bgr_img = np.dstack([b,g,r]) # rwo.merge_img_channels(b,g,r)
 
-    kp1, des1, kp2, des2 = feature_detection_sift_opencv(checker_bgr_img, bgr_img)
+    algorithm = cv2.SIFT_create()
+    kp2, des2 = algorithm.detectAndCompute(bgr_img, None)
     matches = find_matches_FlannBasedMatcher_opencv(kp1, des1, kp2, des2)
     good = extract_good_matches(matches)
 
@@ -186,4 +230,4 @@ def colourchecker_patch_detection(rgb_array, opencv_descriptor = "SIFT", checker
             m_corners[key] = dst
         return m_corners
     else:
-        return None
\ No newline at end of file
+        return None
@@ -60,6 +60,7 @@ class Image(ABC):
     __observer = None 
     __colourchecker_RGB = {} # dict objects only property, not setter
     __patch_size = {}
+    __patch_slices = {}
 
     @property
     def type(self):
@@ -177,6 +178,12 @@ class Image(ABC):
     def __init__(self):
         pass
 
+    # per-instance colour checker data (the class attributes are shared between instances)
+    def __reset_colourchecker_data__(self):
+        self.__colourchecker_RGB = {}
+        self.__patch_size = {}
+        self.__patch_slices = {}
+
     # Patch extraction
     def extract_rgb_patch_data_from_image(self, center, size):
         '''
@@ -212,6 +219,7 @@ class Image(ABC):
             checker_name = checker_name.split("_")[0] if "_" in checker_name else checker_name
             self.__patch_size[checker_name] = {}
             self.__patch_size[checker_name]["size_rect"] = size_rect
+            self.__patch_slices.pop(checker_name, None) # geometry changed
 
             # update            
             current_colourchecker_rgb = self.colourchecker_RGB.keys()
@@ -230,6 +238,29 @@ class Image(ABC):
         else:
             raise ColourCheckerError("ColourChecker not implemented")
 
+    def compute_patch_slices(self, checker_name):
+        '''
+        Method to compute the pixel window of each patch of an extracted colour checker.
+        The geometry only depends on the detection, so it is computed once and reused.
+
+        Parameters:
+            checker_name    str     Colour checker name.
+
+        Returns:
+            patch_slices    dict    Patch windows as {patch_id: (row_start, row_end, col_start, col_end)}.
+
+        '''
+
+        if checker_name not in self.colourchecker_RGB.keys():
+            raise ColourCheckerError("ColourChecker not implemented")
+        if checker_name not in self.__patch_slices.keys():
+            size_rect = self.patch_size[checker_name]["size_rect"]
+            patch_slices = {}
+            for coordinates in self.colourchecker_RGB[checker_name]["draw"]:
+                patch_slices.update(pte.compute_patch_slices(coordinates[1], size_rect)) # coordinates[1]: patches centers
+            self.__patch_slices[checker_name] = patch_slices
+        return self.__patch_slices[checker_name]
+
     # Histogram
     def plot_rgb_histogram(self, show_figure = True, save_figure = False, output_path = None, split_per_channel = False):
         '''
@@ -367,16 +398,15 @@ class ProcessedImage(Image):
             self.rgb_data = rgb_data 
         self.observer = metadata["Observer"] if "Observer" in metadata.keys() else 2 # default 2 observer
         self.illuminant = metadata["Illuminant"] if "Illuminant" in metadata.keys() else None
-        self.colourchecker_RGB.clear() # reset
-        self.patch_size.clear()
+        self.__reset_colourchecker_data__() # reset
 
     # automatic colourchecker detection
-    def automatic_colourchecker_extraction(self, checker_name="XRCCPP_24", opencv_descriptor="SIFT"):  
+    def automatic_colourchecker_extraction(self, checker_name="XRCCPP_24", opencv_descriptor="SIFT", template_descriptors=None):  
         bits_image = rwo.get_bits_image(self.rgb_data)
         image_rgb = self.rgb_data/(math.pow(2,bits_image)-1) if bits_image>0 else self.rgb_data # range [0,1]
         image_rgb = np.clip(image_rgb*(math.pow(2,8)-1), 0, (math.pow(2, 8)-1)) # 8bits
         image_rgb = np.uint8(image_rgb) # format conversion to avoid error using openCV 
-        corners = ccd.colourchecker_patch_detection(image_rgb, opencv_descriptor, checker_name)   
+        corners = ccd.colourchecker_patch_detection(image_rgb, opencv_descriptor, checker_name, template_descriptors=template_descriptors)   
         if corners is not None:
             has_colourchecker = True          
             size_rect = ccd.compute_size_rect(corners, checker_name)                    
@@ -406,6 +436,8 @@ class RawImage(Image):
         path_raw                 os                     Image path.
         metadata                 dict                   Image information as metadata.
         method                   str                    Method to get the RAW RGB demosaiced data. Default: "postprocess".
+        use_memmap               bool                   If True, the image arrays are backed by temporary files (np.memmap),
+                                                        the OS can page them out (large images, several workers). Default: False.
 
     Attributes:
         subtype                   str                    "RAW Image object"   
@@ -432,12 +464,13 @@ class RawImage(Image):
 
         .automatic_image_processing(show_image, save_image, output_path, method, **krawargs)
         
-        .automatic_colourchecker_extraction(checker_name, opencv_descriptor="SIFT")
+        .automatic_colourchecker_extraction(checker_name, opencv_descriptor="SIFT", template_descriptors=None)
         
         .get_camera_whitebalance()
         .get_daylight_whitebalance()
 
         .compute_wb_multipliers(**params)
+        .compute_wb_multipliers_batch(checker_name, patch_ids)
         .estimate_wb_multipliers(method, **params)
         .set_whitebalance_multipliers(wb_multipliers)
         .get_whitebalance_multipliers()
@@ -451,6 +484,7 @@ class RawImage(Image):
         .compute_image_colour_quality_assessment(colourchecker_name)
         .show(data, method)
         .save(output_path, data, bits)
+        .save_async(executor, output_path, data, bits)
 
     '''
 
@@ -463,6 +497,9 @@ class RawImage(Image):
     __xyz_data = None # D65
     __sRGB_data = None
     __computed_matrix = False # default
+    __colour_transform = None # WB independent transform matrices (cached)
+    __colour_correction_inputs = None # inputs of the last colour correction
+    __use_memmap = False
 
     @property
     def subtype(self):
@@ -517,6 +554,8 @@ class RawImage(Image):
 
     @RGB_to_XYZ_matrix.setter
     def RGB_to_XYZ_matrix(self, rgb_to_xyz):
+        self.__colour_transform = None # reset cached transforms
+        self.__colour_correction_inputs = None
         if isinstance(rgb_to_xyz, str):
             if rgb_to_xyz == "camera":
                 XYZ_to_CAM = self.get_camera_embedded_XYZ_to_CAM_matrix()
@@ -616,18 +655,26 @@ class RawImage(Image):
         return  self.sRGB_data
 
     # metadata = {"Camera": "Nikon D5600", "image_size":[4008, 6008], "Date": [[2022, 6, 19], [8, 29, 00]], "ColorChecker": "XRCCPP", "Illuminant": illuminant, "Observer": obs}
-    def __init__(self, path_raw, metadata={}, method="postprocess"):
+    def __init__(self, path_raw, metadata={}, method="postprocess", use_memmap=False):
         self.path = path_raw
         self.metadata = metadata
+        self.__use_memmap = use_memmap
 
         self.observer = metadata["Observer"] if "Observer" in metadata.keys() else 2 # default 2 observer
         self.illuminant = metadata["Illuminant"] if "Illuminant" in metadata.keys() else None
 
         self.__get_raw_attributes__() # [0]
         self.__load_rgb_data__(method) # [1]
+        if self.__use_memmap:
+            rgb_data = self.__new_image_array__(self.rgb_data.shape)
+            rgb_data[...] = self.rgb_data
+            self.rgb_data = rgb_data
         
-        self.colourchecker_RGB.clear() # reset
-        self.patch_size.clear()
+        self.__reset_colourchecker_data__() # reset
+
+    def __new_image_array__(self, shape):
+        # a new array for every result: the previous ones can still be in use (e.g. background saves)
+        return cop.create_memmap_array(shape) if self.__use_memmap else np.empty(shape, dtype=np.double)
 
     # load RGB data
     def __load_rgb_data__(self, method):
@@ -709,6 +756,23 @@ class RawImage(Image):
             wb_multipliers = wb.compute_wb_multipliers(r,g,b)
         return wb_multipliers
 
+    def compute_wb_multipliers_batch(self, checker_name, patch_ids):
+        '''
+        Method to compute the raw wb multipliers from several patches of a ColourCheckerRGB extracted from image.
+
+        Parameter:
+            checker_name      str      Colour checker name.
+            patch_ids         list     Patch ids (e.g. ["D2", "D3", "D4"]).
+
+        Returns:
+            wb_multipliers    np.array (N,4) Computed wb multipliers (one row per patch).
+        
+        '''
+
+        rgb_grey = np.array([self.get_patch_from_colourchecker(checker_name, patch_id) for patch_id in patch_ids])
+        wb_multipliers = wb.compute_wb_multipliers_array(rgb_grey)
+        return wb_multipliers
+
     def __compute_white_balance_multipliers_from_grey_patch__(self, colourchecker_name, patch_id):
         r_grey, g_grey, b_grey = self.get_patch_from_colourchecker(colourchecker_name, patch_id)
         computed_wb_multipliers = wb.compute_wb_multipliers(r_grey, g_grey, b_grey)
@@ -804,10 +868,11 @@ class RawImage(Image):
         if self.whitebalance_multipliers!= None:
             # define a function
             rgb_data_wb = wb.apply_wb_multipliers_to_rgb_image(self.rgb_data, wb_list_gain_factors=self.whitebalance_multipliers)    
-            rgb_data_wb = np.array(rgb_data_wb, dtype=np.int16) # to int16
+            rgb_data_wb = rgb_data_wb.astype(np.int16) # to int16
             min_max = np.min([rgb_data_wb[:,:,0].max(),rgb_data_wb[:,:,1].max(),rgb_data_wb[:,:,2].max()])
-            rgb_data_wb_clip = np.clip(rgb_data_wb, 0, min_max)
-            rgb_data_wb_scaled_norm = rgb_data_wb_clip/rgb_data_wb_clip.max()
+            rgb_data_wb_clip = np.clip(rgb_data_wb, 0, min_max, out=rgb_data_wb) # in place (int16 copy)
+            max_clip = min_max if min_max > 0 else rgb_data_wb_clip.max() # clipped max = min_max
+            rgb_data_wb_scaled_norm = np.divide(rgb_data_wb_clip, max_clip, out=self.__new_image_array__(rgb_data_wb_clip.shape))
 
             if show_image:
                 rwo.show_rgb_as_bgr_image(rgb_data_wb_scaled_norm, method)
@@ -835,48 +900,83 @@ class RawImage(Image):
             bits           int     Output image bits. Default: 16.
             
         '''
+        if self.whitebalance_multipliers is None:
+            raise Exception("Please set fist the whitebalance multipliers: .set_whitebalance_multipliers(wb_multipliers)")
+
+        # same wb multipliers and transform as the last run: the result is already computed
+        colour_correction_inputs = tuple(self.whitebalance_multipliers)
+        if self.sRGB_data is None or colour_correction_inputs != self.__colour_correction_inputs:
+            self.__compute_colour_correction__()
+            self.__colour_correction_inputs = colour_correction_inputs
+
+        if show_image:
+            rwo.show_rgb_as_bgr_image(self.sRGB_data, method)
+
+        if save_image:
+            rwo.save_rgb_array_as_image(self.sRGB_data, output_path, bits)
+
+    def __get_colour_transform__(self):
+        # WB independent matrices: computed once and reused for every wb multipliers
+        if self.__colour_transform is None:
+            if self.__computed_matrix:
+                # optimised RGB to XYZ array to D65
+                XYZd65 = [0.9504, 1.00, 1.0888]
+                RGB_to_XYZ = rcc.apply_non_linear_optimization(rcc.compute_model_residuals, self.RGB_to_XYZ_matrix, XYZd65)
+                self.__colour_transform = {"RGB_to_XYZ": RGB_to_XYZ}
+            else:
+                # provisional
+                n_colours = self.raw_attributes["num_colours"]
+                XYZ_to_cam = np.array(self.raw_attributes["xyz_cam_matrix"][0:n_colours, :], dtype=np.double)
+                sRGB_to_XYZ = rcc.D65_M_sRGB_to_xyz
+                sRGB_to_cam = np.dot(XYZ_to_cam, sRGB_to_XYZ)
+                sRGB_to_cam = cop.apply_norm_to_matrix(sRGB_to_cam)
+                cam_to_sRGB = cop.compute_inverse_array(sRGB_to_cam)
+                # cam to xyz d65 in a single transform (cam -> sRGB linear -> xyz)
+                self.__colour_transform = {"cam_to_sRGB": cam_to_sRGB, "cam_to_XYZ": np.dot(sRGB_to_XYZ, cam_to_sRGB)}
+        return self.__colour_transform
+
+    def __compute_colour_correction__(self):
         self.apply_white_balance() 
 
         rgb_data_wb_scaled_norm = self.raw_rgb_wb
+        colour_transform = self.__get_colour_transform__()
 
         if self.__computed_matrix:
-            # optimised RGB to XYZ array to D65
-            XYZd65 = [0.9504, 1.00, 1.0888]
-            RGB_to_XYZ = rcc.apply_non_linear_optimization(rcc.compute_model_residuals, self.RGB_to_XYZ_matrix, XYZd65)
+            RGB_to_XYZ = colour_transform["RGB_to_XYZ"]
             # raw rgb to xyz d65
-            self.__set_xyz_data__(rcc.apply_RGB_to_XYZ_transform_matrix(RGB_to_XYZ, rgb_data_wb_scaled_norm))
-            # xyz d65 to sRGB
+            self.__set_xyz_data__(rcc.colour_correct_tiled(rgb_data_wb_scaled_norm, RGB_to_XYZ, encode_sRGB=False, out=self.__new_image_array__(rgb_data_wb_scaled_norm.shape)))
+            # xyz d65 to sRGB (linear + non linear, by tiles)
             #sRGB_linear = rcc.apply_xyz_d65_to_rgb_linear(self.XYZ_D65_data, rgb_space="sRGB") # einsum
-            sRGB_linear = rcc.apply_xyz_d65_to_rgb_linear_using_dot_product(self.xyz_data, rgb_space="sRGB") # dot
+            #sRGB_linear = rcc.apply_xyz_d65_to_rgb_linear_using_dot_product(self.xyz_data, rgb_space="sRGB") # dot
+            sRGB_non_linear = rcc.colour_correct_tiled(self.xyz_data, rcc.D65_M_xyz_to_sRGB, out=self.__new_image_array__(self.xyz_data.shape))
 
         else:
-            
-            # provisional
-            n_colours = self.raw_attributes["num_colours"]
-            XYZ_to_cam = np.array(self.raw_attributes["xyz_cam_matrix"][0:n_colours, :], dtype=np.double)
-            sRGB_to_XYZ = np.array([[0.4124, 0.3576, 0.1805], [0.2126, 0.7152, 0.0722], [0.0193, 0.1192, 0.9505]], dtype=np.double)
-            sRGB_to_cam = np.dot(XYZ_to_cam, sRGB_to_XYZ)
-            norm = np.tile(np.sum(sRGB_to_cam, 1), (3, 1)).transpose()
-            sRGB_to_cam = sRGB_to_cam / norm
-            cam_to_sRGB = cop.compute_inverse_array(sRGB_to_cam)
-            sRGB_linear = np.einsum('ij,...j', cam_to_sRGB, rgb_data_wb_scaled_norm) 
-            self.__set_xyz_data__(rcc.apply_rgb_linear_to_xyz_d65(sRGB_linear, rgb_space="sRGB"))
-
-        sRGB_non_linear = rcc.compute_nonlinear_sRGB(sRGB_linear)
-        self.__set_sRGB_data__(sRGB_non_linear)
-
-        if show_image:
-            rwo.show_rgb_as_bgr_image(self.sRGB_data, method)
+            self.__set_xyz_data__(rcc.colour_correct_tiled(rgb_data_wb_scaled_norm, colour_transform["cam_to_XYZ"], encode_sRGB=False, out=self.__new_image_array__(rgb_data_wb_scaled_norm.shape)))
+            sRGB_non_linear = rcc.colour_correct_tiled(rgb_data_wb_scaled_norm, colour_transform["cam_to_sRGB"], out=self.__new_image_array__(rgb_data_wb_scaled_norm.shape))
 
-        if save_image:
-            rwo.save_rgb_array_as_image(self.sRGB_data, output_path, bits)
+        self.__set_sRGB_data__(sRGB_non_linear)
 
     # [5] Colour Quality Assessment
 
     # automatic colourchecker detection
-    def automatic_colourchecker_extraction(self, checker_name, opencv_descriptor="SIFT"):
+    def automatic_colourchecker_extraction(self, checker_name, opencv_descriptor="SIFT", template_descriptors=None):
+        '''
+        Method to detect a colour checker on the image and extract its RGB patches.
+
+        Parameters:
+            checker_name            str      Colour checker name.
+            opencv_descriptor       str      OpenCV descriptor. Default: "SIFT".
+            template_descriptors    tuple    Precomputed keypoints and descriptors of the colour checker template
+                                             (see colourchecker_detection.build_checker_descriptors). Default: None.
+
+        Returns:
+            has_colourchecker       bool     True if the colour checker has been detected.
+            corners                 dict     Corner coordinates of the colour checker.
+            size_rect               int      Patch size in px.
+
+        '''
         rgb_processed = rwp.automatic_raw_image_processing(self.path)  # 8bits
-        corners = ccd.colourchecker_patch_detection(rgb_processed, opencv_descriptor, checker_name)   
+        corners = ccd.colourchecker_patch_detection(rgb_processed, opencv_descriptor, checker_name, template_descriptors=template_descriptors)   
         if corners is not None:
             has_colourchecker = True          
             size_rect = ccd.compute_size_rect(corners, checker_name)                    
@@ -885,19 +985,20 @@ class RawImage(Image):
         return False, None, None
     
     # AE00 
-    def compute_image_colour_quality_assessment(self, checker_name, data=None):
+    def compute_image_colour_quality_assessment(self, checker_name, data=None, patch_slices=None):
         '''
         Method to perform the quality assessment of the colour-corrected image obtained.
 
         Parameters:
             checker_name             str                 Colour checker name.
             data                     ColourCheckerXYZ    Reference XYZ data. Default: None
+            patch_slices             dict                Precomputed patch windows (see compute_patch_slices). Default: None
         
         Returns:
             colourchecker_metrics    DataFrame           CIE XYZ residuals and colour-difference metrics.
 
         '''
-        colourchecker = self.__extract_colourchecker_xyz_patches__(checker_name)
+        colourchecker = self.__extract_colourchecker_xyz_patches__(checker_name, patch_slices)
         image_colourchecker = colourchecker.as_pandas_dataframe()
         # rename col
         image_colourchecker.rename(columns = {"X": "X'", "Y": "Y'", "Z": "Z'"}, inplace = True)
@@ -913,29 +1014,20 @@ class RawImage(Image):
         colourchecker_metrics = rwa.compute_colour_differences(colourchecker_xyz)
         return colourchecker_metrics
 
-    def __extract_colourchecker_xyz_patches__(self, checker_name):
+    def __extract_colourchecker_xyz_patches__(self, checker_name, patch_slices=None):
         if checker_name in self.colourchecker_RGB.keys():
-            size_rect = self.patch_size[checker_name]["size_rect"]
-            coordinates_list = self.colourchecker_RGB[checker_name]["draw"]
+            if patch_slices is None:
+                patch_slices = self.compute_patch_slices(checker_name)
+            xyz_patches = pte.get_patches_mean_from_slices(self.xyz_data, patch_slices)
             xyz_data_as_dict = {}
-            for coordinates in coordinates_list:
-                #corners_image = coordinates[0] # not required
-                patches_coordinates = coordinates[1] # dict
-                for patch in patches_coordinates.keys():
-                    name_id = patch
-                    center = patches_coordinates[name_id]
-                    x,y,z = self.__extract_xyz_patch_data_from_image(center, size_rect)
-                    xyz_data_as_dict[name_id] = [x*100,y*100,z*100]
+            for name_id, xyz in xyz_patches.items():
+                x,y,z = xyz
+                xyz_data_as_dict[name_id] = [x*100,y*100,z*100]
             colourchecker = ColourCheckerXYZ(checker_name=checker_name, illuminant=self.illuminant, observer=self.observer, data=xyz_data_as_dict, metadata=self.metadata)
             return colourchecker
         else:
             raise ColourCheckerError("ColourChecker not implemented")
 
-    def __extract_xyz_patch_data_from_image(self, center, size):
-        crop_patch = pte.crop_patch_image(self.xyz_data, center, size)
-        x,y,z = np.average(crop_patch[:,:,0]), np.average(crop_patch[:,:,1]), np.average(crop_patch[:,:,2])
-        return x,y,z
-
     def show(self, data = "raw", method="OpenCV"):
         ''' 
         Method to display the RAW RGB Image ("raw"), the white balanced image ("wb") or the final sRGB image ("sRGB").
@@ -965,14 +1057,39 @@ class RawImage(Image):
             bits           int    Output image bits. Default: 16.
 
         '''
+        data_to_save = self.__get_data_to_save__(data)
+        rwo.save_rgb_array_as_image(data_to_save, output_path, bits)
+
+    def save_async(self, executor, output_path, data = "sRGB", bits=16):
+        ''' 
+        Method to save the RAW RGB Image ("raw"), the white balanced image ("wb") or the final sRGB image ("sRGB")
+        in the background using an executor (e.g. concurrent.futures.ThreadPoolExecutor).
+
+        The data is taken when the method is called: a later colour correction of the image does not change the 
+        saved file (the arrays are replaced, not modified in place).
+
+        Parameter:
+            executor       Executor   Executor used to write the image.
+            output_path    os         Output path
+            data           str        Data to save. Default: "sRGB".
+            bits           int        Output image bits. Default: 16.
+
+        Returns:
+            future         Future     Future of the write (use .result() to wait and to get the errors).
+
+        '''
+        data_to_save = self.__get_data_to_save__(data)
+        future = executor.submit(rwo.save_rgb_array_as_image, data_to_save, output_path, bits)
+        return future
+
+    def __get_data_to_save__(self, data):
         if data=="raw":
             data_to_save = self.rgb_data
         elif data=="wb":
             data_to_save = self.raw_rgb_wb
         elif data == "sRGB":
             data_to_save = self.sRGB_data
-
-        rwo.save_rgb_array_as_image(data_to_save, output_path, bits)
+        return data_to_save
 
     def __str__(self):
         return f"RawImage object from path: {self.path}"
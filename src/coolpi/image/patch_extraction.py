@@ -1,10 +1,10 @@
-from importlib import resources
-import json
 import os
 
 import numpy as np
 import cv2
 
+from coolpi.auxiliary import load_data as ld
+
 # RGB/XYZ data extraction of a coluorchecker from an image
 
 def is_colourchecker_implemented(colourchecker_name):
@@ -14,11 +14,7 @@ def is_colourchecker_implemented(colourchecker_name):
     Parameters:    colourchecker_name    str    colourchecker name
     Returns:       bool
     '''
-    with resources.path("coolpi.data.colourchecker.coordinates", "patches_coordinates.json") as json_path:
-        chart_json = open(json_path, "r")
-        colour_checker_coordinates = json.loads(chart_json.read())  
-
-    if colourchecker_name in colour_checker_coordinates.keys():
+    if ld.load_colourchecker_patches_coordinates_using_resources(colourchecker_name) is not None:
         return True
     else:
         return False
@@ -105,15 +101,23 @@ def crop_patch_image(input_image, patch_xy, size_rect = 40):
     crop = input_image[rectng[0][1]:rectng[1][1], rectng[0][0]:rectng[1][0],:] # esto es correcto
     return crop
 
+# patch_id: (row_start, row_end, col_start, col_end), same window as crop_patch_image
+def compute_patch_slices(patches_xy, size_rect = 40):
+    half_size = int(size_rect/2)
+    patch_slices = {}
+    for patch_id, patch_xy in patches_xy.items():
+        col, row = int(patch_xy[0]), int(patch_xy[1])
+        patch_slices[patch_id] = (row-half_size, row+half_size, col-half_size, col+half_size)
+    return patch_slices
+
+def get_patches_mean_from_slices(input_image, patch_slices):
+    patches_mean = {}
+    for patch_id, (y0, y1, x0, x1) in patch_slices.items():
+        patches_mean[patch_id] = input_image[y0:y1, x0:x1, :].mean(axis=(0,1))
+    return patches_mean
+
 def get_colourchecker_patches_coordinates_as_dict(colourchecker_name):
-    with resources.path("coolpi.data.colourchecker.coordinates", "patches_coordinates.json") as json_path:
-        chart_json = open(json_path, "r")
-        colour_checker_coordinates = json.loads(chart_json.read())  
-        
-    if colourchecker_name in colour_checker_coordinates.keys():
-        return colour_checker_coordinates[colourchecker_name]
-    else:
-        return None
+    return ld.load_colourchecker_patches_coordinates_using_resources(colourchecker_name)
 
 def compute_patches_image_coordinates(M, patches_src_xy):
     patches_dst_xy = {}
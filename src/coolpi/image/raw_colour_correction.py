@@ -3,6 +3,7 @@ import numpy as np
 from scipy.optimize import least_squares
 
 import coolpi.auxiliary.common_operations as cop
+import coolpi.colour.cat_models as cat
 
 # RGB to XYZ Optimization for XYZspd
 
@@ -131,6 +132,42 @@ def compute_nonlinear_sRGB(sRGB_linear):
     sRGB_nonlinear = np.clip(sRGB_nonlinear, 0, 1) 
     return sRGB_nonlinear
 
+# Tiled colour transform (matrix product fused with the sRGB encoding)
+
+D65_M_xyz_to_sRGB = np.array([[3.2406, -1.5372, -0.4986],[-0.9689, 1.8758, 0.0415], [0.0557, -0.2040,  1.0570]], dtype=np.double)
+D65_M_sRGB_to_xyz = np.array([[0.4124, 0.3576, 0.1805], [0.2126, 0.7152, 0.0722], [0.0193, 0.1192, 0.9505]], dtype=np.double)
+
+def colour_correct_tiled(img, M, tile_rows=None, encode_sRGB=True, tile_pixels=65536, out=None):
+    '''
+    Function to apply a 3x3 colour transform to an image by row tiles
+
+    Each tile is transformed and (optionally) sRGB encoded while it is still in cache, 
+    instead of running every step over the full image.
+
+    Parameters:
+        img            np.array    (H,W,3) image data
+        M              np.array    3x3 colour transform matrix
+        tile_rows      int         Rows per tile. Default: None (computed from tile_pixels)
+        encode_sRGB    bool        If True, clip to [0,1] and apply the sRGB non-linear encoding. Default: True
+        tile_pixels    int         Approximate number of pixels per tile (if tile_rows is None). Default: 65536
+        out            np.array    Output buffer (e.g. np.memmap). Default: None (new array)
+    
+    Returns:
+        out            np.array    (H,W,3) transformed image data
+
+    '''
+
+    M = np.asarray(M, dtype=np.double)
+    H, W = img.shape[0], img.shape[1]
+    if tile_rows is None:
+        tile_rows = max(1, tile_pixels // max(W, 1))
+    if out is None:
+        out = np.empty(img.shape[:-1] + (M.shape[0],), dtype=np.double)
+    for y0 in range(0, H, tile_rows):
+        tile = np.einsum('ij,...j', M, img[y0:y0+tile_rows])
+        out[y0:y0+tile_rows] = compute_nonlinear_sRGB(tile) if encode_sRGB else tile
+    return out
+
 # Gamma correction (2.2)
 
 def apply_gamma_correction(sRGB_data, gamma=2.2):
@@ -243,66 +280,9 @@ def apply_RGB_to_XYZ_transform_matrix_(RGB_to_XYZ, rgb_data):
 # Xn2, Yn2, Zn2 D65 WhitePoint 0.9504, 1.00, 1.0888
 def apply_CAT_XYZ_to_D65(XYZ_data, Xn1, Yn1, Zn1, Xn2=0.9504, Yn2=1.00, Zn2=1.0888, cat_model = "von Kries"):
     
-    # reshape
-    col, row, channels = XYZ_data.shape[0], XYZ_data.shape[1], XYZ_data.shape[2]
-    XYZ_data = np.reshape(XYZ_data, (col*row, channels))
-    
-    dict_cat_M_array ={
-        "von Kries": np.matrix("0.3897 0.6890 -0.0787;-0.2298 1.1834 0.0464; 0.0 0.0 1.0"),
-        "Bradford":  np.matrix("0.8951 0.2664 -0.1614;-0.7502 1.7135 0.0367; 0.0389 -0.0685 1.0296"),
-        "Sharp": np.matrix("1.2694 0.0988 -0.1706;-0.8364 1.8006 0.0357; 0.0297 -0.0315 1.0018"),
-        "CMCCAT200": np.matrix("0.7982 0.3389 -0.1371;-0.5918 1.5512 0.0406; 0.0008  0.2390 0.9753"),
-        "CAT02": np.matrix("0.7328 0.4296 -0.1624;-0.7036 1.6975 0.0061; 0.0030  0.0136 0.9834"),
-        "BS": np.matrix("0.8752 0.2787 -0.1539;-0.8904 1.8709 0.0195;-0.0061  0.0162 0.9899"),
-        "BSPC": np.matrix("0.6489 0.3915 -0.0404;-0.3775 1.3055 0.0720;-0.0271  0.0888 0.9383")}
-
-    if cat_model not in dict_cat_M_array.keys():
-        raise Exception(f"CAT model not implemented. Please, select : {dict_cat_M_array.keys()}")
-
-    M = dict_cat_M_array[cat_model] # CATs model array
-    
-    MI = cop.compute_inverse_array(M)
-    
-    # Test illuminants
-    XYZw1 = np.matrix([[Xn1/Yn1],[Yn1/Yn1],[Zn1/Yn1]])
-    XYZw2 = np.matrix([[Xn2/Yn2],[Yn2/Yn2],[Zn2/Yn2]])
-            
-    # en realidad es LMS, en otros libros lo llama RGB
-    RGBw1 = np.dot(M, XYZw1)
-            
-    Rw1 = float(RGBw1[0])
-    Gw1 = float(RGBw1[1])
-    Bw1 = float(RGBw1[2])
-            
-    RGBw2 = np.dot(M, XYZw2)
-            
-    Rw2 = float(RGBw2[0])
-    Gw2 = float(RGBw2[1])
-    Bw2 = float(RGBw2[2])
-
-    d1 = Rw2/Rw1
-    d2 = Gw2/Gw1
-    d3 = Bw2/Bw1
-
-    D = np.diag([d1,d2,d3])
-    #print(D)
-    #D2 = np.matrix([[d1,0,0],[0,d2,0],[0,0,d3]])
-    #print(D2)
-
-    S1 = np.dot(M, XYZ_data.T)
-    #print(S1.shape)
-    S2 = np.dot(D, S1)
-    #print(S2.shape)
-    XYZ_D65_data = np.dot(MI, S2)
-    #print(XYZ_D65_data.T.shape)
-
-    # reshape
-    #XYZ_D65_data = np.reshape(XYZ_D65_data.T, (col,row,channels))
-    XYZ_D65_data = np.array(XYZ_D65_data.T).reshape(col,row,channels)
-
-    #S1 = np.einsum('ij,...j', M, XYZ_data) 
-    #S2 = np.einsum('ij,...j', D, S1) 
-    #XYZ_D65_data = np.einsum('ij,...j', MI, S2) 
+    # MI·D·M with the precomputed CAT matrices of cat_models (fused and cached per white point pair),
+    # applied to the (col,row,channels) data in one matmul
+    XYZ_D65_data = cat.apply_CATs_transform_batch(XYZ_data, Xn1, Yn1, Zn1, Xn2, Yn2, Zn2, cat_model)
 
     return XYZ_D65_data
 
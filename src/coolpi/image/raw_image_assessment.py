@@ -1,5 +1,7 @@
+import numpy as np
 import pandas as pd
 
+import coolpi.auxiliary.common_operations as cop
 from coolpi.colour.cie_colour_spectral import CIEXYZ, CIELAB
 from coolpi.image.colourchecker import ColourCheckerSpectral
 
@@ -79,7 +81,10 @@ def compute_colour_differences(colourchecker_xyz):
     dataframe_assesment_model["resZ"] = dataframe_assesment_model.apply(lambda x: compute_res(x["Z"], x["Z'"]), axis=1) 
     dataframe_assesment_model["LAB(D65)"] = dataframe_assesment_model.apply(lambda x: compute_LAB_d65(x["X"],x["Y"],x["Z"]), axis=1)
     dataframe_assesment_model["LAB'(D65)"] = dataframe_assesment_model.apply(lambda x: compute_LAB_d65(x["X'"],x["Y'"],x["Z'"]), axis=1)
-    dataframe_assesment_model["DeltaE"] = dataframe_assesment_model.apply(lambda x: compute_delta_e(x["LAB(D65)"],x["LAB'(D65)"]), axis=1)
+    # CIE76 for all the patches at once
+    LAB = np.array(dataframe_assesment_model["LAB(D65)"].tolist(), dtype=np.double)
+    LAB_pred = np.array(dataframe_assesment_model["LAB'(D65)"].tolist(), dtype=np.double)
+    dataframe_assesment_model["DeltaE"] = cop.euclidean_distance_vec(LAB_pred - LAB)
     dataframe_assesment_model["CIEDE2000"] = dataframe_assesment_model.apply(lambda x: compute_ciede2000(x["LAB(D65)"],x["LAB'(D65)"]), axis=1)
     return dataframe_assesment_model
 
@@ -97,6 +97,24 @@ def compute_wb_multipliers(r_grey, g_grey, b_grey):
     wb_multipliers = [r_mult, g_mult, b_mult, g_mult]
     return wb_multipliers
 
+def compute_wb_multipliers_array(rgb_grey):
+    '''
+    Funtion to compute the white balance multipliers for several grey/white patches at once
+
+    Parameters:
+        rgb_grey                  np.array    (N,3) RGB data of the grey/white patches.
+    
+    Returns:
+        wb_multipliers            np.array    (N,4) Computed wb multipliers as [r, g, b, g] per row
+
+    '''
+
+    rgb_grey = np.asarray(rgb_grey, dtype=np.double)
+    g_grey = rgb_grey[:,1:2]
+    wb_multipliers = np.ones((rgb_grey.shape[0], 4))
+    wb_multipliers[:,[0,2]] = g_grey / rgb_grey[:,[0,2]] # (1/r)/(1/g), (1/b)/(1/g)
+    return wb_multipliers
+
 # Estimation of white balance multipliers using different algorithms
 def estimate_white_balance_multipliers(rgb_data, algorithm="GreyWorld"):
     if algorithm=="Average":
@@ -402,9 +420,9 @@ def apply_wb_multipliers_to_rgb_image(rgb_data, wb_list_gain_factors):
         rgb_data_wb            np.array     RGB white balance data
         
     '''
-    # using arrays
-    Krgb = np.diag(wb_list_gain_factors)[0:rgb_data.shape[2],0:rgb_data.shape[2]]
-    rgb_data_wb = np.einsum('ij,...j', Krgb, rgb_data) 
+    # using arrays: diagonal gains as a broadcast product (same result as einsum with np.diag, one pass)
+    Krgb = np.asarray(wb_list_gain_factors[0:rgb_data.shape[2]], dtype=np.double)
+    rgb_data_wb = rgb_data * Krgb
 
     return rgb_data_wb
 
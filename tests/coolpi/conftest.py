@@ -0,0 +1,21 @@
+import pytest
+
+import coolpi.auxiliary.common_operations as cop
+import coolpi.colour.cat_models as cat
+import coolpi.colour.cct_operations as cct
+import coolpi.colour.colour_space_conversion as csc
+import coolpi.colour.lambda_operations as lo
+
+# modules with optional numba kernels
+NUMBA_MODULES = (cop, cat, cct, csc, lo)
+
+@pytest.fixture(params=["numba", "python"])
+def numba_mode(request, monkeypatch):
+    # run the test with the numba kernels and with the pure numpy fallback
+    if request.param == "numba":
+        if not all(module.NUMBA_AVAILABLE for module in NUMBA_MODULES):
+            pytest.skip("numba is not installed")
+    else:
+        for module in NUMBA_MODULES:
+            monkeypatch.setattr(module, "NUMBA_AVAILABLE", False)
+    return request.param
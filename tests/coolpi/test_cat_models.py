@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+import coolpi.colour.cat_models as cat
+
+D65 = (0.95047, 1.0, 1.08883)
+D50 = (0.96422, 1.0, 0.82521)
+XYZ_COLOURS = ((0.2, 0.3, 0.4), (0.5, 0.45, 0.1), (0.05, 0.04, 0.3))
+
+# values returned by the original (np.matrix) implementation, D65 -> D50
+CAT_D65_TO_D50 = {
+    "von Kries": ((0.1989309743183503, 0.2993935340771479, 0.30315476245143874), (0.527683803773006, 0.45091677322972346, 0.07578869061285969), (0.03737132652146701, 0.03975820107565798, 0.22736607183857901)),
+    "Bradford": ((0.1963774390892226, 0.29623416245366213, 0.30351884128323015), (0.5291918953502246, 0.458784271153089, 0.0773655462428803), (0.03826793349174062, 0.03598176736545785, 0.22577951082795625)),
+    "Sharp": ((0.19683370281320317, 0.2961307977840742, 0.3038354105100463), (0.5251312983631189, 0.4577685686052852, 0.07508926028220546), (0.04119399902162576, 0.036894616606415465, 0.2273692243118387)),
+    "CMCCAT200": ((0.19799814881855937, 0.29739705031594743, 0.30708314845314655), (0.5237995764877655, 0.4554279466630336, 0.057038241131467854), (0.041309409220573155, 0.037746654585698765, 0.2393623074927762)),
+    "CAT02": ((0.19663912477986858, 0.2965721052689684, 0.3035584416884306), (0.5298274375745539, 0.4598071688388641, 0.07408486183806794), (0.03753285506942653, 0.034867913111042856, 0.22841729397233326)),
+    "BS": ((0.1968113301380003, 0.29601753869239483, 0.3032131170246583), (0.5274010679544068, 0.4597595707299581, 0.07499409504722529), (0.03936484565968437, 0.03536801041171817, 0.22796438748862233)),
+    "BSPC": ((0.2015109858048094, 0.29952478879151306, 0.30356959772930725), (0.5146577543824764, 0.4484896196357911, 0.07129951294634938), (0.045829188964490744, 0.04162489708108899, 0.23067549938498447))}
+
+BRADFORD_NON_LINEAR_D65_TO_D50 = ((0.1963768604908103, 0.2962339841631294, 0.3035153381851088), (0.5287043080954237, 0.4586340249899997, 0.07441347109034396), (0.03987010302257496, 0.036475463257334244, 0.23547977435116374))
+VON_KRIES_LMS = ((0.9, 1.0, 1.1), (1.0, 0.95, 0.8))
+VON_KRIES_TRANSFORM = ((0.24992772280068282, 0.300131810019093, 0.29090909090909095), (0.6234702311690288, 0.45720623611938116, 0.07272727272727274), (0.041223133053412665, 0.039401472512724786, 0.21818181818181817))
+
+@pytest.mark.parametrize("cat_model", sorted(CAT_D65_TO_D50))
+def test_apply_CATs_transform(numba_mode, cat_model):
+    for XYZ, XYZ_2 in zip(XYZ_COLOURS, CAT_D65_TO_D50[cat_model]):
+        assert cat.apply_CATs_transform(*XYZ, *D65, *D50, cat_model) == pytest.approx(XYZ_2, rel=1e-12)
+
+@pytest.mark.parametrize("cat_model", sorted(CAT_D65_TO_D50))
+def test_apply_CATs_transform_batch(numba_mode, cat_model):
+    XYZ_image = np.random.default_rng(0).uniform(0.01, 1.0, (5, 7, 3))
+    XYZ_image_2 = cat.apply_CATs_transform_batch(XYZ_image, *D65, *D50, cat_model)
+    assert XYZ_image_2.shape == XYZ_image.shape
+    expected = [cat.apply_CATs_transform(*XYZ, *D65, *D50, cat_model) for XYZ in XYZ_image.reshape(-1, 3)]
+    assert np.allclose(XYZ_image_2.reshape(-1, 3), expected, rtol=1e-12, atol=0)
+    assert np.allclose(cat.apply_CATs_transform_batch(XYZ_COLOURS, *D65, *D50, cat_model), CAT_D65_TO_D50[cat_model], rtol=1e-12, atol=0)
+
+@pytest.mark.parametrize("cat_model", sorted(CAT_D65_TO_D50))
+def test_apply_CATs_transform_image(cat_model):
+    XYZ_image = np.random.default_rng(1).uniform(0.01, 1.0, (6, 4, 3))
+    XYZ_image_2 = cat.apply_CATs_transform_image(XYZ_image, *D65, *D50, cat_model)
+    assert XYZ_image_2.dtype == np.float32 and XYZ_image_2.shape == XYZ_image.shape
+    expected = cat.apply_CATs_transform_batch(XYZ_image, *D65, *D50, cat_model)
+    assert np.allclose(XYZ_image_2, expected, rtol=1e-5, atol=1e-6)
+    XYZ_image_2 = cat.apply_CATs_transform_image(XYZ_image, *D65, *D50, cat_model, dtype=np.float64)
+    assert np.allclose(XYZ_image_2, expected, rtol=1e-12, atol=0)
+
+def test_apply_CATs_transform_same_white_point(numba_mode):
+    XYZ_image = np.random.default_rng(2).uniform(0.01, 1.0, (4, 3))
+    assert cat.apply_CATs_transform(*XYZ_COLOURS[0], *D65, *D65, "CAT02") == XYZ_COLOURS[0]
+    assert np.array_equal(cat.apply_CATs_transform_batch(XYZ_image, *D65, *D65, "CAT02"), XYZ_image)
+
+def test_apply_Bradford_non_linear_transform(numba_mode):
+    for XYZ, XYZ_2 in zip(XYZ_COLOURS, BRADFORD_NON_LINEAR_D65_TO_D50):
+        assert cat.apply_Bradford_non_linear_transform(*XYZ, *D65, *D50) == pytest.approx(XYZ_2, rel=1e-12)
+
+def test_apply_von_Kries_transform(numba_mode):
+    for XYZ, XYZ_2 in zip(XYZ_COLOURS, VON_KRIES_TRANSFORM):
+        assert cat.apply_von_Kries_transform(*XYZ, *VON_KRIES_LMS[0], *VON_KRIES_LMS[1]) == pytest.approx(XYZ_2, rel=1e-12)
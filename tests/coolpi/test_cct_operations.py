@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+import coolpi.auxiliary.errors as exc
+import coolpi.auxiliary.load_data as ld
+import coolpi.colour.cct_operations as cct
+
+# x, y: CCT (º K) returned by the original implementation
+OHNO_CCT = {
+    (0.31271, 0.32902): 6503.538435313473,
+    (0.44757, 0.40745): 2855.6530552911163,
+    (0.34567, 0.35850): 5001.800311435047,
+    (0.28, 0.29): 9983.040715784548,
+    (0.38, 0.37): 3960.9147329859866,
+    (0.25, 0.25): 28773.127297256753}
+
+def compute_Planckian_uv(cct_k):
+    # u, v CIE 1960 of the Planckian radiator, straight from Planck's law
+    x_cmf, y_cmf, z_cmf, nm_range, nm_interval = ld.load_cie_cmf_arrays(2)
+    wavelength = np.arange(nm_range[0], nm_range[1] + nm_interval, nm_interval)*1e-9
+    spd = 1/(wavelength**5*np.expm1(1.4388e-2/(cct_k*wavelength)))
+    return cct.XYZ_to_uv_1960(spd @ x_cmf, spd @ y_cmf, spd @ z_cmf)
+
+@pytest.mark.parametrize("xy", sorted(OHNO_CCT))
+def test_xy_to_CCT_Ohno(numba_mode, xy):
+    assert cct.xy_to_CCT_Ohno(*xy) == pytest.approx(OHNO_CCT[xy], rel=1e-10)
+
+def test_xy_to_CCT_Ohno_array(numba_mode):
+    x, y = np.array(sorted(OHNO_CCT)).T
+    cct_K = cct.xy_to_CCT_Ohno(x, y)
+    assert isinstance(cct_K, np.ndarray) and cct_K.shape == x.shape
+    assert np.allclose(cct_K, [OHNO_CCT[xy] for xy in sorted(OHNO_CCT)], rtol=1e-10, atol=0)
+    assert np.allclose(cct.xy_to_CCT_Ohno(x.reshape(2, 3), y.reshape(2, 3)), cct_K.reshape(2, 3), rtol=1e-12, atol=0)
+
+def test_xy_to_CCT_Ohno_out_of_domain(numba_mode):
+    # T2 <= 0: log out of domain
+    with pytest.raises(ValueError):
+        cct.xy_to_CCT_Ohno(0.6, 0.1)
+
+def test_compute_Planckian_locus_uv():
+    locus = cct._compute_Planckian_locus_uv()
+    assert locus.shape == (4, cct._PLANCKIAN_CCT_GRID[2]) and not locus.flags.writeable
+    assert cct._compute_Planckian_locus_uv() is locus
+    cct_grid = np.geomspace(*cct._PLANCKIAN_CCT_GRID)
+    for i in (0, 1000, 4095, 8191):
+        assert locus[:2, i] == pytest.approx(compute_Planckian_uv(cct_grid[i]), rel=1e-12)
+        h = cct_grid[i]*1e-6
+        du_dT = (np.array(compute_Planckian_uv(cct_grid[i] + h)) - np.array(compute_Planckian_uv(cct_grid[i] - h)))/(2*h)
+        # np.gradient is one-sided (first order) at both ends of the grid
+        assert locus[2:, i] == pytest.approx(du_dT, rel=1e-3 if i in (0, 8191) else 1e-6)
+
+@pytest.mark.parametrize("cct_k", [1000, 1234.5, 2856, 4000, 6504, 10000, 17777.7, 25000])
+def test_compute_xy_from_CCT_and_Duv_Ohno_on_the_locus(cct_k):
+    x, y = cct.compute_xy_from_CCT_and_Duv_Ohno(cct_k, 0)
+    # linear interpolation of the tabulated locus
+    assert cct.xy_to_uv_1960(x, y) == pytest.approx(compute_Planckian_uv(cct_k), abs=1e-8)
+
+@pytest.mark.parametrize("cct_k", [2856, 4000, 5000, 6504])
+@pytest.mark.parametrize("Delta_uv", [-0.02, -0.005, 0.01])
+def test_compute_xy_from_CCT_and_Duv_Ohno_round_trip(numba_mode, cct_k, Delta_uv):
+    x, y = cct.compute_xy_from_CCT_and_Duv_Ohno(cct_k, Delta_uv)
+    u, v = cct.xy_to_uv_1960(x, y)
+    u0, v0 = compute_Planckian_uv(cct_k)
+    # Duv>0 above the locus
+    assert np.hypot(u - u0, v - v0) == pytest.approx(abs(Delta_uv), rel=1e-6)
+    assert np.sign(v - v0) == np.sign(Delta_uv)
+    assert cct.compute_Delta_uv(u, v) == pytest.approx(Delta_uv, abs=5e-5)
+    assert cct.xy_to_CCT_Ohno(x, y) == pytest.approx(cct_k, rel=1e-3)
+
+def test_compute_xy_from_CCT_and_Duv_Ohno_array():
+    cct_k = np.array([1500, 2856, 6504, 20000])
+    Delta_uv = np.array([0.0, 0.01, -0.01, 0.005])
+    x, y = cct.compute_xy_from_CCT_and_Duv_Ohno(cct_k, Delta_uv)
+    assert x.shape == y.shape == cct_k.shape
+    for i in range(len(cct_k)):
+        assert (x[i], y[i]) == pytest.approx(cct.compute_xy_from_CCT_and_Duv_Ohno(cct_k[i], Delta_uv[i]), rel=1e-14)
+
+@pytest.mark.parametrize("cct_k", [999, 25001, [2856, 30000]])
+def test_compute_xy_from_CCT_and_Duv_Ohno_out_of_range(cct_k):
+    with pytest.raises(exc.CCTNotInValidRangeError):
+        cct.compute_xy_from_CCT_and_Duv_Ohno(cct_k, 0)
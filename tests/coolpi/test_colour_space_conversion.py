@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+import coolpi.auxiliary.load_data as ld
+import coolpi.colour.colour_space_conversion as csc
+
+CMF = ld.load_cie_cmf(2) # [380, 780], 5 nm
+SPD_D65 = list(ld.load_cie_illuminant("D65")["lambda_values"])[16:] # [300, 780] to [380, 780]
+REFLECTANCE = list(20 + 60*np.sin(np.arange(380, 785, 5)/40.0)**2)
+
+# values returned by the original implementation (D65, CIE 1931 2º)
+XYZ_REFLECTANCE = (51.6220971229883, 53.00107497159699, 68.22083812031306)
+XYZ_WHITE = (0.9504296621098931, 1.0, 1.0888005680506738)
+
+def compute_XYZ_with_loops(reflectance, spd, x_cmf, y_cmf, z_cmf):
+    # scalar path: Eq. 7.1-7.4 (CIE015:2018)
+    k = csc.compute_k_value(spd, y_cmf)
+    return tuple(k*csc.compute_summation_integral(reflectance, spd, cmf)/100 for cmf in (x_cmf, y_cmf, z_cmf))
+
+@pytest.mark.parametrize("as_array", [False, True])
+def test_spectral_to_XYZ(numba_mode, as_array):
+    cmf = [CMF[key] if as_array else list(CMF[key]) for key in ("x_cmf", "y_cmf", "z_cmf")]
+    spd = np.array(SPD_D65) if as_array else SPD_D65
+    XYZ = csc.spectral_to_XYZ(REFLECTANCE, spd, *cmf)
+    assert XYZ == pytest.approx(XYZ_REFLECTANCE, rel=1e-13)
+    assert XYZ == pytest.approx(compute_XYZ_with_loops(REFLECTANCE, spd, *cmf), rel=1e-13)
+    # reflectance in [0, 1]
+    assert csc.spectral_to_XYZ([1]*81, spd, *cmf) == pytest.approx(XYZ_WHITE, rel=1e-13)
+
+def test_spectral_to_XYZ_different_lengths(numba_mode):
+    cmf = [CMF[key] for key in ("x_cmf", "y_cmf", "z_cmf")]
+    # shorter reflectance: summation over the reflectance values only
+    XYZ = csc.spectral_to_XYZ(REFLECTANCE[:60], SPD_D65, *cmf)
+    assert XYZ == pytest.approx(compute_XYZ_with_loops(REFLECTANCE[:60], SPD_D65, *cmf), rel=1e-13)
+    with pytest.raises(IndexError):
+        csc.spectral_to_XYZ(REFLECTANCE + [50.0], SPD_D65, *cmf)
@@ -0,0 +1,54 @@
+import os
+
+import numpy as np
+import pytest
+
+from coolpi.image.image_objects import RawImage
+
+PATH_NEF = os.path.join(os.path.dirname(__file__), "..", "coolpi-gui-test", "data", "img", "INDIGO_2022-06-19_NikonD5600_0003.NEF")
+
+@pytest.fixture(scope="module")
+def raw_image():
+    raw_image = RawImage(PATH_NEF)
+    raw_image.rgb_data = raw_image.rgb_data[1000:1400, 2000:2600].copy() # crop: faster colour correction
+    return raw_image
+
+def test_apply_colour_correction_without_whitebalance(raw_image):
+    with pytest.raises(Exception, match="whitebalance multipliers"):
+        raw_image.apply_colour_correction()
+
+def test_apply_colour_correction_cache(raw_image):
+    raw_image.set_whitebalance_multipliers("camera")
+    raw_image.apply_colour_correction()
+    sRGB_camera_wb = raw_image.sRGB_data
+    xyz_camera_wb = raw_image.xyz_data
+    assert sRGB_camera_wb.shape == raw_image.rgb_data.shape
+
+    # same wb multipliers: the previous result is reused
+    raw_image.set_whitebalance_multipliers("camera")
+    raw_image.apply_colour_correction()
+    assert raw_image.sRGB_data is sRGB_camera_wb and raw_image.xyz_data is xyz_camera_wb
+
+    # new wb multipliers: the result is computed again
+    raw_image.set_whitebalance_multipliers("daylight")
+    raw_image.apply_colour_correction()
+    sRGB_daylight_wb = raw_image.sRGB_data
+    assert sRGB_daylight_wb is not sRGB_camera_wb
+    assert not np.allclose(sRGB_daylight_wb, sRGB_camera_wb)
+    raw_image.__compute_colour_correction__() # without cache
+    assert np.array_equal(raw_image.sRGB_data, sRGB_daylight_wb)
+
+    # back to the first wb multipliers
+    raw_image.set_whitebalance_multipliers("camera")
+    raw_image.apply_colour_correction()
+    assert raw_image.sRGB_data is not sRGB_camera_wb
+    assert np.array_equal(raw_image.sRGB_data, sRGB_camera_wb)
+
+def test_apply_colour_correction_cache_reset_by_transform_matrix(raw_image):
+    raw_image.set_whitebalance_multipliers([2.0, 1.0, 1.5, 1.0])
+    raw_image.apply_colour_correction()
+    sRGB_data = raw_image.sRGB_data
+    raw_image.set_RGB_to_XYZ_matrix("camera")
+    raw_image.apply_colour_correction()
+    assert raw_image.sRGB_data is not sRGB_data
+    assert np.array_equal(raw_image.sRGB_data, sRGB_data)
@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+from scipy import interpolate
+
+import coolpi.auxiliary.load_data as ld
+import coolpi.colour.cie_colour_spectral as cie
+import coolpi.colour.lambda_operations as lo
+
+S0, S1, S2 = (S["lambda_values"] for S in ld.load_cie_s_ctt_components())
+
+# CCT: SPD at 300 nm, SPD at 500 nm, sum of the SPD, returned by the original implementation
+SPD_FROM_CCT = {
+    4500: (0.014276813683870342, 90.31187240239457, 8058.6826003835595),
+    5000: (0.01922660863398046, 95.72956418927124, 7926.938125271341),
+    6504.5: (0.03411059824438884, 109.36340488492048, 8194.972724699412),
+    10000: (0.060053761249309286, 129.89682714513654, 9469.731034427816),
+    24000: (0.09701857822506577, 156.91069777567373, 11846.715853411715)}
+
+SCIPY_INTERPOLATORS = {"Akima": interpolate.Akima1DInterpolator, "CubicHermite": interpolate.PchipInterpolator}
+
+@pytest.mark.parametrize("method", sorted(SCIPY_INTERPOLATORS))
+def test_create_interpolator(numba_mode, method):
+    x = np.arange(380, 785, 5)
+    xn = np.arange(380, 781, 1)
+    cmf = ld.load_cie_cmf(2)
+    for y in (cmf["x_cmf"], cmf["z_cmf"], np.sin(x/30.0)):
+        f = lo.create_interpolator(x, y, method)
+        assert np.allclose(f(xn), SCIPY_INTERPOLATORS[method](x, y)(xn), rtol=1e-12, atol=1e-15)
+        assert np.allclose(f(xn[::7].reshape(-1, 1)).ravel(), f(xn[::7]), rtol=0, atol=0)
+        assert np.allclose(lo.lambda_interpolation(x, y, xn, method, interpolator=f), f(xn), rtol=0, atol=0)
+
+UNEVEN_SPECTRAL_DATA = (
+    # flat segments and a plateau (Akima weights and Pchip slopes equal to 0)
+    ([380., 384., 391., 400., 402., 415., 433., 450., 470., 471., 500.], [1., 2., 2., 2., 5., 3., 3., 8., 8., 1., 0.5]),
+    # short edge intervals followed by a change of sign (Pchip edge derivative limited to 3 times the slope)
+    ([380., 381., 391., 400., 410., 411.], [0., 1., -249., 400., 150., 151.]))
+
+@pytest.mark.parametrize("method", sorted(SCIPY_INTERPOLATORS))
+@pytest.mark.parametrize("x, y", UNEVEN_SPECTRAL_DATA)
+def test_create_interpolator_uneven_wavelengths(numba_mode, method, x, y):
+    xn = np.linspace(x[0], x[-1], 241)
+    assert np.allclose(lo.create_interpolator(x, y, method)(xn), SCIPY_INTERPOLATORS[method](x, y)(xn), rtol=1e-12, atol=1e-12)
+
+@pytest.mark.parametrize("method", ["Linear", "CubicHermite", "Akima"])
+def test_lambda_interpolation_components(numba_mode, method):
+    x = np.arange(380, 785, 5)
+    xn = np.arange(380, 781, 1)
+    cmf = ld.load_cie_cmf(2)
+    ys = np.array([cmf["x_cmf"], cmf["y_cmf"], cmf["z_cmf"]])
+    yns = lo.lambda_interpolation_components(x, ys, xn, method)
+    assert len(yns) == 3
+    for y, yn in zip(ys, yns):
+        assert np.allclose(yn, lo.lambda_interpolation(x, y, xn, method), rtol=1e-12, atol=1e-15)
+
+@pytest.mark.parametrize("cct_K", sorted(SPD_FROM_CCT))
+def test_compute_SPD_from_CCT(numba_mode, cct_K):
+    spd_300, spd_500, spd_sum = SPD_FROM_CCT[cct_K]
+    spd = lo.compute_SPD_from_CCT(cct_K, S0, S1, S2)
+    assert isinstance(spd, list) and len(spd) == len(S0)
+    assert spd[0] == pytest.approx(spd_300, rel=1e-13)
+    assert spd[40] == pytest.approx(spd_500, rel=1e-13)
+    assert sum(spd) == pytest.approx(spd_sum, rel=1e-13)
+
+def test_compute_SPD_from_CCT_array(numba_mode):
+    cct_K_array = sorted(SPD_FROM_CCT)
+    spd = lo.compute_SPD_from_CCT_array(cct_K_array, S0, S1, S2)
+    assert spd.shape == (len(cct_K_array), len(S0))
+    for cct_K, spd_row in zip(cct_K_array, spd):
+        assert np.allclose(spd_row, lo.compute_SPD_from_CCT(cct_K, S0, S1, S2), rtol=1e-13, atol=1e-13)
+    with pytest.raises(Exception):
+        lo.compute_SPD_from_CCT_array([5000, 3000], S0, S1, S2)
+
+def test_SComponents_CCT_to_SPD_batch(numba_mode):
+    s_components = cie.SComponents()
+    cct_K_array = np.array([[4500, 5000], [6504.5, 10000]])
+    nm_range, nm_interval, spd = s_components.CCT_to_SPD_batch(cct_K_array)
+    assert spd.shape == (4, len(S0))
+    for cct_K, spd_row in zip(cct_K_array.ravel(), spd):
+        nm_range_2, nm_interval_2, spd_2 = s_components.CCT_to_SPD(cct_K)
+        assert nm_range == nm_range_2 and nm_interval == nm_interval_2
+        assert np.allclose(spd_row, spd_2, rtol=1e-13, atol=1e-13)
+    with pytest.raises(Exception):
+        s_components.CCT_to_SPD_batch([5000, 25000])
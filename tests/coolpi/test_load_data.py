@@ -0,0 +1,39 @@
+import os
+
+import numpy as np
+import pytest
+
+import coolpi.auxiliary.load_data as ld
+
+PATH_SPD = os.path.join(os.path.dirname(__file__), "..", "..", "wpp_data", "res", "spd")
+
+# values returned by the original (line by line) Sekonic parser
+# file: (CCT, Illuminance [lx], XYZ, SPD 380 nm, SPD 580 nm, sum of the 5 nm SPD)
+SEKONIC_FILES = {
+    "INDIGO-C7000-A_029_02°_3066K.csv": (3066, 706.0, (75.35429, 70.63268, 27.37205), 0.000130328801, 0.012535877526, 0.436645007641),
+    "INDIGO-C7000-A_030_02°_5027K.csv": (5027, 69.7, (6.52087, 6.96676, 5.36169), 4.6122816e-05, 0.000964217703, 0.059933490615),
+    "INDIGO-C7000-A_038_02°_5557K.csv": (5557, 96600.0, (9309.62586, 9656.41975, 9146.63712), 0.514802634716, 1.321803450584, 93.777410447597),
+    "SPD_JNA_015_02°_2681K.csv": (2681, 884.0, (99.08709, 88.38136, 26.97796), 0.000866228831, 0.013875701465, 1.197780033106),
+    "SPD_JND50_017_02°_4963K.csv": (4963, 2530.0, (250.57287, 252.76654, 221.23172), 0.007971235551, 0.033403813839, 1.923965269584),
+    "SPD_JND65_014_02°_6658K.csv": (6658, 2280.0, (219.66199, 227.65255, 259.00522), 0.011407298036, 0.029700824991, 1.768314101326),
+    "SPD_JNF_016_02°_3872K.csv": (3872, 744.0, (74.13603, 74.35603, 41.949), 0.001176179736, 0.007163316477, 0.43290807624)}
+
+@pytest.mark.parametrize("file_name", sorted(SEKONIC_FILES))
+def test_load_metadata_sekonic_from_csv(file_name):
+    cct_K, illuminance, XYZ, spd_380, spd_580, spd_sum = SEKONIC_FILES[file_name]
+    measured_data = ld.load_metadata_sekonic_from_csv(os.path.join(PATH_SPD, file_name))
+    assert measured_data["CCT"] == cct_K
+    assert measured_data["Illuminance [lx]"] == illuminance
+    assert measured_data["XYZ"] == pytest.approx(XYZ, rel=1e-12)
+    assert measured_data["Viewing Angle [º]"] == 2
+    spd = measured_data["lambda_values_5nm"]
+    assert spd.shape == (81,) and measured_data["lambda_values_1nm"].shape == (401,)
+    assert spd[0] == spd_380 and spd[40] == spd_580
+    assert spd.sum() == pytest.approx(spd_sum, rel=1e-12)
+
+@pytest.mark.parametrize("file_name", sorted(SEKONIC_FILES))
+def test_load_spd_array_from_sekonic_csv(file_name):
+    path_file = os.path.join(PATH_SPD, file_name)
+    spd_array = ld.load_spd_array_from_sekonic_csv(path_file)
+    assert np.array_equal(spd_array[:,0], np.arange(380, 785, 5))
+    assert np.array_equal(spd_array[:,1], ld.load_metadata_sekonic_from_csv(path_file)["lambda_values_5nm"])
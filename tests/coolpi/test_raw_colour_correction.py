@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+
+import coolpi.image.raw_colour_correction as rcc
+
+@pytest.fixture
+def image_data():
+    # out of [0,1] values on purpose (clipped by the sRGB encoding)
+    return np.random.default_rng(0).uniform(-0.2, 1.3, (37, 23, 3))
+
+@pytest.mark.parametrize("tile_rows", [None, 1, 5, 36, 37, 100])
+@pytest.mark.parametrize("encode_sRGB", [False, True])
+def test_colour_correct_tiled(image_data, tile_rows, encode_sRGB):
+    expected = np.einsum('ij,...j', rcc.D65_M_xyz_to_sRGB, image_data)
+    if encode_sRGB:
+        expected = rcc.compute_nonlinear_sRGB(expected)
+    out = rcc.colour_correct_tiled(image_data, rcc.D65_M_xyz_to_sRGB, tile_rows=tile_rows, encode_sRGB=encode_sRGB)
+    assert out.shape == image_data.shape and out.dtype == np.double
+    assert np.allclose(out, expected, rtol=1e-14, atol=1e-15)
+
+def test_colour_correct_tiled_tile_pixels(image_data):
+    expected = rcc.colour_correct_tiled(image_data, rcc.D65_M_xyz_to_sRGB, tile_rows=len(image_data))
+    # 23 px rows: 2 rows per tile
+    assert np.array_equal(rcc.colour_correct_tiled(image_data, rcc.D65_M_xyz_to_sRGB, tile_pixels=50), expected)
+
+def test_colour_correct_tiled_out(image_data):
+    out = np.full(image_data.shape, np.nan)
+    result = rcc.colour_correct_tiled(image_data, rcc.D65_M_sRGB_to_xyz, tile_rows=4, encode_sRGB=False, out=out)
+    assert result is out
+    assert np.allclose(out, image_data @ rcc.D65_M_sRGB_to_xyz.T, rtol=1e-14, atol=1e-15)